@@ -0,0 +1,71 @@
+"""
+Benchmark StreamJSONDetector on long streamed responses.
+
+Feeds a response of prose with embedded tool-call JSON to the detector in
+small chunks, the way LLM tokens arrive, and reports the throughput. The scan
+is linear, so doubling the response size should roughly double the time.
+
+Usage:
+    uv run scripts/benchmark_json_detector.py --size 100000 --chunk-size 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add project root to path to enable imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.open_llm_vtuber.mcpp.json_detector import StreamJSONDetector  # noqa: E402
+
+
+def build_response(size: int) -> str:
+    """Build a response of `size` characters with a tool call every ~2 KB."""
+    tool_call = json.dumps(
+        {
+            "mcp_server": "ddg-search",
+            "tool": "search",
+            "arguments": {"query": "weather {today}", "options": {"limit": 5}},
+        }
+    )
+    prose = "This is a sentence the character would say out loud. " * 36
+    block = f"{prose}{tool_call} "
+    return (block * (size // len(block) + 1))[:size]
+
+
+def run(text: str, chunk_size: int) -> tuple[float, int]:
+    chunks = [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+    detector = StreamJSONDetector()
+    start = time.perf_counter()
+    found = 0
+    for chunk in chunks:
+        found += len(detector.process_chunk(chunk))
+    return time.perf_counter() - start, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", type=int, default=100_000, help="Characters")
+    parser.add_argument("--chunk-size", type=int, default=4, help="Chars per chunk")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in (args.size // 2, args.size, args.size * 2):
+        text = build_response(size)
+        timings = []
+        for _ in range(args.repeat):
+            elapsed, found = run(text, args.chunk_size)
+            timings.append(elapsed)
+        best = min(timings)
+        print(
+            f"{size:>9} chars in {args.chunk_size}-char chunks: "
+            f"{best * 1000:8.2f} ms, {size / best / 1e6:6.2f} MB/s, "
+            f"{found} objects"
+        )
+
+
+if __name__ == "__main__":
+    main()
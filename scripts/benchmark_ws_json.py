@@ -0,0 +1,133 @@
+"""
+Benchmark the JSON backends of the websocket messages.
+
+Encodes and decodes a mix of the messages a conversation turn produces:
+TTS audio payloads (a base64 WAV and a volume list), microphone frames from
+the client, full-text and control messages, and a history page. Every
+installed backend of `json_codec` is measured, and the stdlib one always is.
+
+Usage:
+    uv run scripts/benchmark_ws_json.py --repeat 200
+    uv pip install orjson && uv run scripts/benchmark_ws_json.py
+"""
+
+import argparse
+import base64
+import os
+import random
+import sys
+import time
+
+# Add project root to path to enable imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from loguru import logger  # noqa: E402
+
+from src.open_llm_vtuber.utils import json_codec  # noqa: E402
+
+
+def audio_payload(seconds: float) -> dict:
+    """An "audio" message of a TTS sentence, 16 kHz 16-bit mono."""
+    wav = os.urandom(int(seconds * 16000 * 2) + 44)
+    return {
+        "type": "audio",
+        "audio": base64.b64encode(wav).decode("utf-8"),
+        "volumes": [random.random() for _ in range(int(seconds * 1000 / 20))],
+        "slice_length": 20,
+        "display_text": {"text": "今日はいい天気ですね。Let's go out!", "name": "Mao"},
+        "actions": {"expressions": [3]},
+        "forwarded": False,
+    }
+
+
+def mic_frame(samples: int) -> dict:
+    """A "mic-audio-data" frame of float samples from the client."""
+    return {
+        "type": "mic-audio-data",
+        "audio": [random.uniform(-1, 1) for _ in range(samples)],
+    }
+
+
+def history_page(messages: int) -> dict:
+    return {
+        "type": "history-page",
+        "history_uid": "2025-01-01_12-00-00_0123456789abcdef",
+        "messages": [
+            {
+                "role": "human" if i % 2 == 0 else "ai",
+                "timestamp": "2025-01-01T12:00:00",
+                "content": "你好，今天过得怎么样？" * 4 + f" message {i}",
+            }
+            for i in range(messages)
+        ],
+        "cursor": 123456,
+        "has_more": True,
+    }
+
+
+def build_mix() -> list[tuple[str, dict, int]]:
+    """(name, message, occurrences per turn) of a typical voice turn."""
+    return [
+        ("audio 3s", audio_payload(3.0), 6),
+        ("mic frame 4096", mic_frame(4096), 40),
+        ("full-text", {"type": "full-text", "text": "Thinking..."}, 2),
+        ("control", {"type": "control", "text": "conversation-chain-end"}, 3),
+        ("history page 50", history_page(50), 1),
+    ]
+
+
+def measure(func, arg, repeat: int) -> float:
+    """Best time of one call out of `repeat`, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    logger.disable("src.open_llm_vtuber")
+    random.seed(0)
+    mix = build_mix()
+    backends = []
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            json_codec.use_json_backend(name)
+        except ImportError:
+            print(f"{name}: not installed, skipped")
+            continue
+        backends.append(name)
+
+    print(f"{'message':<18}{'bytes':>10}" + "".join(f"{b:>22}" for b in backends))
+    print(f"{'':<28}" + "".join(f"{'dumps / loads µs':>22}" for _ in backends))
+    turn = {name: 0.0 for name in backends}
+    for label, message, count in mix:
+        size = len(json_codec.dumps(message).encode("utf-8"))
+        row = f"{label:<18}{size:>10}"
+        for name in backends:
+            json_codec.use_json_backend(name)
+            text = json_codec.dumps(message)
+            encode = measure(json_codec.dumps, message, args.repeat)
+            decode = measure(json_codec.loads, text, args.repeat)
+            turn[name] += (encode + decode) * count
+            row += f"{encode * 1e6:>12.1f} /{decode * 1e6:>8.1f}"
+        print(row)
+
+    print()
+    baseline = turn["json"]
+    for name in backends:
+        print(
+            f"{name:<8} one turn of the mix: {turn[name] * 1000:7.2f} ms "
+            f"({baseline / turn[name]:.1f}x stdlib)"
+        )
+    json_codec.use_json_backend()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+"""
+Stand-in LLM server for load tests and benchmarks.
+
+Speaks enough of three streaming protocols to drive the LLM backends end to
+end without a paid provider or a GPU:
+
+- OpenAI chat completions (POST /v1/chat/completions), for openai_compatible_llm,
+  ollama_llm and the other OpenAI-compatible providers. POST /api/chat answers
+  the model preload/unload calls of ollama_llm.
+- Anthropic messages (POST /v1/messages), for claude_llm.
+- llama.cpp server completions (POST /completion), for stateless_llm_with_template.
+
+Time to first token, generation speed, tool calls and failures are set on the
+command line. GET /stats reports request counters.
+
+Usage:
+    uv run scripts/mock_llm_server.py --port 8099 --ttft 0.3 --tokens-per-second 40
+
+Then point the backend at the server:
+    openai_compatible_llm.base_url: 'http://localhost:8099/v1'
+    claude_llm.base_url: 'http://localhost:8099'
+    stateless_llm_with_template.base_url: 'http://localhost:8099/completion'
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from loguru import logger
+
+REPLY_TEXT = (
+    "Hello! This is a reply from the mock LLM server. "
+    "It streams words at a fixed pace, so you can measure the pipeline "
+    "without a real model. Every sentence ends with punctuation, which lets "
+    "the sentence divider hand complete sentences to text to speech. "
+)
+
+
+@dataclass
+class MockSettings:
+    """Behaviour of the mock server."""
+
+    ttft: float = 0.2
+    ttft_jitter: float = 0.0
+    tokens_per_second: float = 50.0
+    response_tokens: int = 60
+    tool_call_rate: float = 0.0
+    failure_rate: float = 0.0
+    failure_status: int = 500
+    disconnect_rate: float = 0.0
+
+
+class _InjectedDisconnect(Exception):
+    """Raised inside a stream to drop the connection halfway."""
+
+
+class MockLLM:
+    """Generates paced token streams in the wire format of each provider."""
+
+    def __init__(self, settings: MockSettings, seed: int | None = None):
+        self.settings = settings
+        self._random = random.Random(seed)
+        self.stats = {
+            "requests": 0,
+            "active_streams": 0,
+            "completed": 0,
+            "failures_injected": 0,
+            "disconnects_injected": 0,
+            "tool_calls": 0,
+        }
+
+    def reply_tokens(self) -> List[str]:
+        words = REPLY_TEXT.split()
+        count = max(self.settings.response_tokens, 1)
+        tokens = [words[i % len(words)] for i in range(count)]
+        if not tokens[-1].endswith((".", "!", "?")):
+            tokens[-1] += "."
+        return [tokens[0]] + [" " + token for token in tokens[1:]]
+
+    def should_fail(self) -> bool:
+        if self._random.random() < self.settings.failure_rate:
+            self.stats["failures_injected"] += 1
+            return True
+        return False
+
+    def should_call_tool(self, tools: List[Dict[str, Any]] | None, answered: bool):
+        # Never call a tool right after a tool result, so agent loops end
+        if not tools or answered:
+            return False
+        return self._random.random() < self.settings.tool_call_rate
+
+    async def paced(self, tokens: List[str]) -> AsyncIterator[str]:
+        """Yield tokens after the first-token delay, at the configured speed."""
+        settings = self.settings
+        ttft = settings.ttft + self._random.uniform(0, settings.ttft_jitter)
+        interval = 1 / settings.tokens_per_second if settings.tokens_per_second else 0
+        disconnect_at = (
+            len(tokens) // 2
+            if self._random.random() < settings.disconnect_rate
+            else None
+        )
+        start = time.monotonic()
+        self.stats["active_streams"] += 1
+        try:
+            for i, token in enumerate(tokens):
+                if i == disconnect_at:
+                    self.stats["disconnects_injected"] += 1
+                    raise _InjectedDisconnect()
+                # Schedule against the start time so that slow event loop
+                # iterations do not add up to a lower token rate
+                delay = start + ttft + i * interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                yield token
+            self.stats["completed"] += 1
+        finally:
+            self.stats["active_streams"] -= 1
+
+
+def _tool_arguments(tool_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Build placeholder arguments for the required parameters of a tool."""
+    properties = tool_schema.get("properties", {})
+    arguments = {}
+    for name in tool_schema.get("required", []):
+        kind = properties.get(name, {}).get("type")
+        arguments[name] = {"integer": 1, "number": 1.0, "boolean": True}.get(
+            kind, "mock"
+        )
+    return arguments
+
+
+def _estimate_tokens(payload: Any) -> int:
+    return max(len(json.dumps(payload, ensure_ascii=False)) // 4, 1)
+
+
+def _sse(data: Dict[str, Any], event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def create_app(mock: MockLLM) -> FastAPI:
+    app = FastAPI(title="Mock LLM server")
+
+    @app.middleware("http")
+    async def count_requests(request: Request, call_next):
+        mock.stats["requests"] += 1
+        return await call_next(request)
+
+    @app.get("/stats")
+    async def stats():
+        return mock.stats
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "mock", "object": "model"}]}
+
+    @app.post("/api/chat")
+    async def ollama_chat(request: Request):
+        body = await request.json()
+        return {"model": body.get("model", "mock"), "done": True}
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat(request: Request):
+        body = await request.json()
+        if mock.should_fail():
+            return JSONResponse(
+                {"error": {"message": "Injected failure", "type": "server_error"}},
+                status_code=mock.settings.failure_status,
+            )
+
+        model = body.get("model", "mock")
+        messages = body.get("messages", [])
+        tools = body.get("tools")
+        answered = bool(messages) and messages[-1].get("role") == "tool"
+        call_tool = mock.should_call_tool(tools, answered)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        tokens = mock.reply_tokens()
+        prompt_tokens = _estimate_tokens(messages)
+
+        if not body.get("stream"):
+            text = "".join([token async for token in mock.paced(tokens)])
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens),
+                },
+            }
+
+        def chunk(delta: Dict[str, Any], finish_reason: str | None = None) -> str:
+            return _sse(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                    ],
+                }
+            )
+
+        async def stream():
+            if call_tool:
+                function = tools[0]["function"]
+                arguments = json.dumps(_tool_arguments(function.get("parameters", {})))
+                mock.stats["tool_calls"] += 1
+                first = True
+                # Stream the arguments in a few pieces, like real providers do
+                pieces = [arguments[i : i + 8] for i in range(0, len(arguments), 8)]
+                async for piece in mock.paced(pieces):
+                    call = {"index": 0, "function": {"arguments": piece}}
+                    if first:
+                        call.update(
+                            id=f"call_{uuid.uuid4().hex[:24]}",
+                            type="function",
+                        )
+                        call["function"]["name"] = function["name"]
+                        first = False
+                    yield chunk({"role": "assistant", "tool_calls": [call]})
+                yield chunk({}, "tool_calls")
+            else:
+                async for token in mock.paced(tokens):
+                    yield chunk({"role": "assistant", "content": token})
+                yield chunk({}, "stop")
+            if body.get("stream_options", {}).get("include_usage"):
+                yield _sse(
+                    {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": len(tokens),
+                            "total_tokens": prompt_tokens + len(tokens),
+                        },
+                    }
+                )
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.post("/v1/messages")
+    async def anthropic_messages(request: Request):
+        body = await request.json()
+        if mock.should_fail():
+            return JSONResponse(
+                {
+                    "type": "error",
+                    "error": {"type": "api_error", "message": "Injected failure"},
+                },
+                status_code=mock.settings.failure_status,
+            )
+
+        model = body.get("model", "mock")
+        messages = body.get("messages", [])
+        tools = body.get("tools")
+        last_content = messages[-1].get("content") if messages else None
+        answered = isinstance(last_content, list) and any(
+            isinstance(block, dict) and block.get("type") == "tool_result"
+            for block in last_content
+        )
+        call_tool = mock.should_call_tool(tools, answered)
+        tokens = mock.reply_tokens()
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+
+        async def stream():
+            yield _sse(
+                {
+                    "type": "message_start",
+                    "message": {
+                        "id": message_id,
+                        "type": "message",
+                        "role": "assistant",
+                        "model": model,
+                        "content": [],
+                        "stop_reason": None,
+                        "stop_sequence": None,
+                        "usage": {
+                            "input_tokens": _estimate_tokens(
+                                [body.get("system"), messages]
+                            ),
+                            "output_tokens": 1,
+                        },
+                    },
+                },
+                "message_start",
+            )
+            if call_tool:
+                tool = tools[0]
+                arguments = json.dumps(_tool_arguments(tool.get("input_schema", {})))
+                mock.stats["tool_calls"] += 1
+                yield _sse(
+                    {
+                        "type": "content_block_start",
+                        "index": 0,
+                        "content_block": {
+                            "type": "tool_use",
+                            "id": f"toolu_{uuid.uuid4().hex[:24]}",
+                            "name": tool["name"],
+                            "input": {},
+                        },
+                    },
+                    "content_block_start",
+                )
+                pieces = [arguments[i : i + 8] for i in range(0, len(arguments), 8)]
+                async for piece in mock.paced(pieces):
+                    yield _sse(
+                        {
+                            "type": "content_block_delta",
+                            "index": 0,
+                            "delta": {
+                                "type": "input_json_delta",
+                                "partial_json": piece,
+                            },
+                        },
+                        "content_block_delta",
+                    )
+                stop_reason = "tool_use"
+            else:
+                yield _sse(
+                    {
+                        "type": "content_block_start",
+                        "index": 0,
+                        "content_block": {"type": "text", "text": ""},
+                    },
+                    "content_block_start",
+                )
+                async for token in mock.paced(tokens):
+                    yield _sse(
+                        {
+                            "type": "content_block_delta",
+                            "index": 0,
+                            "delta": {"type": "text_delta", "text": token},
+                        },
+                        "content_block_delta",
+                    )
+                stop_reason = "end_turn"
+            yield _sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+            yield _sse(
+                {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                    "usage": {"output_tokens": len(tokens)},
+                },
+                "message_delta",
+            )
+            yield _sse({"type": "message_stop"}, "message_stop")
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.post("/completion")
+    @app.post("/v1/completions")
+    async def llama_cpp_completion(request: Request):
+        body = await request.json()
+        if mock.should_fail():
+            return JSONResponse(
+                {
+                    "error": {
+                        "code": mock.settings.failure_status,
+                        "message": "Injected failure",
+                    }
+                },
+                status_code=mock.settings.failure_status,
+            )
+
+        tokens = mock.reply_tokens()
+
+        async def stream():
+            async for token in mock.paced(tokens):
+                yield _sse({"content": token, "stop": False})
+            yield _sse(
+                {
+                    "content": "",
+                    "stop": True,
+                    "tokens_predicted": len(tokens),
+                    "tokens_evaluated": _estimate_tokens(body.get("prompt", "")),
+                }
+            )
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = MockSettings()
+    parser = argparse.ArgumentParser(
+        description="Mock OpenAI / Anthropic / llama.cpp streaming server"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument(
+        "--ttft", type=float, default=defaults.ttft, help="Seconds to first token"
+    )
+    parser.add_argument(
+        "--ttft-jitter",
+        type=float,
+        default=defaults.ttft_jitter,
+        help="Random extra seconds added to the first-token delay",
+    )
+    parser.add_argument(
+        "--tokens-per-second",
+        type=float,
+        default=defaults.tokens_per_second,
+        help="Generation speed after the first token (0 for no delay)",
+    )
+    parser.add_argument(
+        "--response-tokens",
+        type=int,
+        default=defaults.response_tokens,
+        help="Number of tokens in each reply",
+    )
+    parser.add_argument(
+        "--tool-call-rate",
+        type=float,
+        default=defaults.tool_call_rate,
+        help="Probability of calling the first tool when the request has tools",
+    )
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=defaults.failure_rate,
+        help="Probability of answering a request with an HTTP error",
+    )
+    parser.add_argument(
+        "--failure-status",
+        type=int,
+        default=defaults.failure_status,
+        help="HTTP status of injected failures, e.g. 429, 500 or 529",
+    )
+    parser.add_argument(
+        "--disconnect-rate",
+        type=float,
+        default=defaults.disconnect_rate,
+        help="Probability of dropping the connection halfway through a stream",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    settings = MockSettings(
+        ttft=args.ttft,
+        ttft_jitter=args.ttft_jitter,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        tool_call_rate=args.tool_call_rate,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+        disconnect_rate=args.disconnect_rate,
+    )
+    logger.info(f"Starting mock LLM server on http://{args.host}:{args.port}")
+    logger.info(f"Settings: {settings}")
+    uvicorn.run(
+        create_app(MockLLM(settings, seed=args.seed)),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
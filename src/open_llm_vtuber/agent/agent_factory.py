@@ -55,6 +55,22 @@ class AgentFactory:
                     f"Configuration not found for LLM provider: {llm_provider}"
                 )
 
+            if llm_provider == "router_llm":
+                # The router is built from the other configs it names
+                backend_configs = {}
+                for name in llm_config.get("backends", []):
+                    backend_config = llm_configs.get(name)
+                    if not backend_config:
+                        raise ValueError(
+                            f"Configuration not found for router backend: {name}"
+                        )
+                    backend_configs[name] = {
+                        key: value
+                        for key, value in backend_config.items()
+                        if key != "interrupt_method"
+                    }
+                llm_config["backend_configs"] = backend_configs
+
             # Create the stateless LLM
             llm = StatelessLLMFactory.create_llm(
                 llm_provider=llm_provider, system_prompt=system_prompt, **llm_config
@@ -83,6 +99,10 @@ class AgentFactory:
                 tool_manager=tool_manager,
                 tool_executor=tool_executor,
                 mcp_prompt_string=mcp_prompt_string,
+                context_max_tokens=basic_memory_settings.get("context_max_tokens"),
+                context_trim_ratio=basic_memory_settings.get("context_trim_ratio", 0.6),
+                context_keep_recent=basic_memory_settings.get("context_keep_recent", 6),
+                context_summarize=basic_memory_settings.get("context_summarize", False),
             )
 
         elif conversation_agent_choice == "mem0_agent":
@@ -43,7 +43,7 @@ class AgentInterface(ABC):
         pass
 
     @abstractmethod
-    def set_memory_from_history(self, conf_uid: str, history_uid: str) -> None:
+    async def set_memory_from_history(self, conf_uid: str, history_uid: str) -> None:
         """
         Load the agent's working memory from chat history
 
@@ -52,3 +52,21 @@ class AgentInterface(ABC):
             history_uid: str - History ID
         """
         pass
+
+    def create_session(self, **session_components) -> "AgentInterface":
+        """
+        Create the agent used by one client session.
+
+        Agents that keep conversation state locally should return a new
+        instance with its own state that shares the expensive parts (LLM
+        clients, tool schemas) with this one. The default returns the agent
+        itself, which suits agents whose state lives on a remote server.
+
+        Args:
+            **session_components: Session-specific components, such as the
+                `tool_manager` and `tool_executor` of the session.
+
+        Returns:
+            AgentInterface - The agent for the session
+        """
+        return self
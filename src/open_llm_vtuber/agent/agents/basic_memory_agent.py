@@ -1,3 +1,4 @@
+import copy
 from typing import (
     AsyncIterator,
     List,
@@ -14,7 +15,8 @@ from ..output_types import SentenceOutput, DisplayText
 from ..stateless_llm.stateless_llm_interface import StatelessLLMInterface
 from ..stateless_llm.claude_llm import AsyncLLM as ClaudeAsyncLLM
 from ..stateless_llm.openai_compatible_llm import AsyncLLM as OpenAICompatibleAsyncLLM
-from ...chat_history_manager import get_history
+from ..stateless_llm.router_llm import RouterLLM
+from ...chat_history_manager import iter_history_reversed, run_history_io
 from ..transformers import (
     sentence_divider,
     actions_extractor,
@@ -23,6 +25,7 @@ from ..transformers import (
 )
 from ...config_manager import TTSPreprocessorConfig
 from ..input_types import BatchInput, TextSource
+from ..context_window import ContextWindow
 from prompts import prompt_loader
 from ...mcpp.tool_manager import ToolManager
 from ...mcpp.json_detector import StreamJSONDetector
@@ -49,10 +52,21 @@ class BasicMemoryAgent(AgentInterface):
         tool_manager: Optional[ToolManager] = None,
         tool_executor: Optional[ToolExecutor] = None,
         mcp_prompt_string: str = "",
+        context_max_tokens: int | None = None,
+        context_trim_ratio: float = 0.6,
+        context_keep_recent: int = 6,
+        context_summarize: bool = False,
     ):
         """Initialize agent with LLM and configuration."""
         super().__init__()
         self._memory = []
+        self._context_settings = {
+            "max_tokens": context_max_tokens,
+            "trim_ratio": context_trim_ratio,
+            "keep_recent_messages": context_keep_recent,
+            "summarize": context_summarize,
+        }
+        self._context_window = self._create_context_window()
         self._live2d_model = live2d_model
         self._tts_preprocessor_config = tts_preprocessor_config
         self._faster_first_response = faster_first_response
@@ -111,6 +125,51 @@ class BasicMemoryAgent(AgentInterface):
 
         logger.info("BasicMemoryAgent initialized.")
 
+    def _create_context_window(self) -> ContextWindow | None:
+        if not self._context_settings["max_tokens"]:
+            return None
+        return ContextWindow(
+            **self._context_settings, summarizer=self._summarize_context
+        )
+
+    def create_session(
+        self,
+        tool_manager: Optional[ToolManager] = None,
+        tool_executor: Optional[ToolExecutor] = None,
+        **session_components,
+    ) -> "BasicMemoryAgent":
+        """Create an agent with its own conversation state for one session.
+
+        The LLM, the pre-formatted tool schemas and the configuration are
+        shared with this agent. Memory, interrupt state, the JSON detector and
+        the context window belong to the new agent only.
+
+        Args:
+            tool_manager: Tool manager of the session. Keeps the shared one if None.
+            tool_executor: Tool executor of the session, whose MCP client reports
+                tool status to the session's client. Keeps the shared one if None.
+
+        Returns:
+            BasicMemoryAgent: The agent for the session.
+        """
+        session = copy.copy(self)
+        session._memory = []
+        session._interrupt_handled = False
+        session.prompt_mode_flag = False
+        session._json_detector = StreamJSONDetector()
+        session._context_window = session._create_context_window()
+
+        if tool_manager is not None:
+            session._tool_manager = tool_manager
+            session._formatted_tools_openai = tool_manager.get_formatted_tools("OpenAI")
+            session._formatted_tools_claude = tool_manager.get_formatted_tools("Claude")
+        if tool_executor is not None:
+            session._tool_executor = tool_executor
+
+        # The chat pipeline is a closure over the agent, so build one for the copy
+        session.chat = session._chat_function_factory()
+        return session
+
     def _set_llm(self, llm: StatelessLLMInterface):
         """Set the LLM for chat completion."""
         self._llm = llm
@@ -125,6 +184,26 @@ class BasicMemoryAgent(AgentInterface):
 
         self._system = system
 
+    def _system_prompt(self) -> str:
+        """System prompt for the next request, including the summary of
+        turns that were dropped from the context window."""
+        if self._context_window:
+            return self._context_window.system_prompt(self._system)
+        return self._system
+
+    async def _summarize_context(self, prompt: str) -> str:
+        """Summarize dropped turns with the agent's own LLM."""
+        summary = ""
+        async for event in self._llm.chat_completion(
+            [{"role": "user", "content": prompt}],
+            "You summarize conversations accurately and concisely.",
+        ):
+            if isinstance(event, str):
+                summary += event
+            elif isinstance(event, dict) and event.get("type") == "text_delta":
+                summary += event.get("text", "")
+        return summary
+
     def _add_message(
         self,
         message: Union[str, List[Dict[str, Any]]],
@@ -173,24 +252,65 @@ class BasicMemoryAgent(AgentInterface):
 
         self._memory.append(message_data)
 
-    def set_memory_from_history(self, conf_uid: str, history_uid: str) -> None:
-        """Load memory from chat history."""
-        messages = get_history(conf_uid, history_uid)
+    async def set_memory_from_history(self, conf_uid: str, history_uid: str) -> None:
+        """Load memory from chat history.
 
+        With a context budget, only the latest messages that fit in it are
+        read, from the end of the history file. The file is read on the
+        history thread, so the event loop never waits for the disk.
+        """
         self._memory = []
-        for msg in messages:
-            role = "user" if msg["role"] == "human" else "assistant"
-            content = msg["content"]
-            if isinstance(content, str) and content:
-                self._memory.append(
-                    {
+        if self._context_window:
+            self._context_window.reset()
+        self._memory = await run_history_io(
+            self._read_history_tail, conf_uid, history_uid
+        )
+        logger.info(f"Loaded {len(self._memory)} messages from history.")
+
+    def _read_history_tail(
+        self, conf_uid: str, history_uid: str
+    ) -> List[Dict[str, Any]]:
+        """Read the messages of a history that go into memory, oldest first."""
+
+        def newest_first():
+            for _, msg in iter_history_reversed(conf_uid, history_uid):
+                role = "user" if msg["role"] == "human" else "assistant"
+                content = msg["content"]
+                if isinstance(content, str) and content:
+                    yield {
                         "role": role,
                         "content": content,
                     }
-                )
-            else:
-                logger.warning(f"Skipping invalid message from history: {msg}")
-        logger.info(f"Loaded {len(self._memory)} messages from history.")
+                else:
+                    logger.warning(f"Skipping invalid message from history: {msg}")
+
+        messages = newest_first()
+        try:
+            if self._context_window:
+                return self._context_window.select_tail(messages, self._system)
+            return list(messages)[::-1]
+        finally:
+            messages.close()
+
+    def create_memory_checkpoint(self) -> tuple[list, int]:
+        """Mark the current memory state so it can be restored later.
+
+        Used to undo a speculative turn whose transcript turned out to be wrong.
+        """
+        dropped = self._context_window.dropped_messages if self._context_window else 0
+        return self._memory, dropped + len(self._memory)
+
+    def restore_memory_checkpoint(self, checkpoint: tuple[list, int]) -> None:
+        """Drop every message added to memory after the checkpoint was taken."""
+        memory, length = checkpoint
+        if memory is not self._memory:
+            # Memory was replaced (e.g. a history was loaded), nothing to undo.
+            return
+        # The checkpoint counts messages since the start of the session, which
+        # stays correct when old messages are dropped from the context window.
+        if self._context_window:
+            length -= self._context_window.dropped_messages
+        del self._memory[max(length, 0) :]
 
     def handle_interrupt(self, heard_response: str) -> None:
         """Handle user interruption."""
@@ -241,6 +361,8 @@ class BasicMemoryAgent(AgentInterface):
 
     def _to_messages(self, input_data: BatchInput) -> List[Dict[str, Any]]:
         """Prepare messages for LLM API call."""
+        if self._context_window:
+            self._context_window.fit(self._memory, self._system)
         messages = self._memory.copy()
         user_content = []
         text_prompt = self._to_text_prompt(input_data)
@@ -299,7 +421,9 @@ class BasicMemoryAgent(AgentInterface):
         current_assistant_message_content = []
 
         while True:
-            stream = self._llm.chat_completion(messages, self._system, tools=tools)
+            stream = self._llm.chat_completion(
+                messages, self._system_prompt(), tools=tools
+            )
             pending_tool_calls.clear()
             current_assistant_message_content.clear()
 
@@ -409,20 +533,20 @@ class BasicMemoryAgent(AgentInterface):
         messages = initial_messages.copy()
         current_turn_text = ""
         pending_tool_calls: Union[List[ToolCallObject], List[Dict[str, Any]]] = []
-        current_system_prompt = self._system
+        current_system_prompt = self._system_prompt()
 
         while True:
             if self.prompt_mode_flag:
                 if self._mcp_prompt_string:
                     current_system_prompt = (
-                        f"{self._system}\n\n{self._mcp_prompt_string}"
+                        f"{self._system_prompt()}\n\n{self._mcp_prompt_string}"
                     )
                 else:
                     logger.warning("Prompt mode active but mcp_prompt_string is empty!")
-                    current_system_prompt = self._system
+                    current_system_prompt = self._system_prompt()
                 tools_for_api = None
             else:
-                current_system_prompt = self._system
+                current_system_prompt = self._system_prompt()
                 tools_for_api = tools
 
             stream = self._llm.chat_completion(
@@ -605,11 +729,18 @@ class BasicMemoryAgent(AgentInterface):
 
             if self._use_mcpp and self._tool_manager:
                 tools = None
-                if isinstance(self._llm, ClaudeAsyncLLM):
+                # A router only uses native tools if all of its backends
+                # speak the same tool format
+                llms = (
+                    self._llm.backends
+                    if isinstance(self._llm, RouterLLM)
+                    else [self._llm]
+                )
+                if all(isinstance(llm, ClaudeAsyncLLM) for llm in llms):
                     tool_mode = "Claude"
                     tools = self._formatted_tools_claude
                     llm_supports_native_tools = True
-                elif isinstance(self._llm, OpenAICompatibleAsyncLLM):
+                elif all(isinstance(llm, OpenAICompatibleAsyncLLM) for llm in llms):
                     tool_mode = "OpenAI"
                     tools = self._formatted_tools_openai
                     llm_supports_native_tools = True
@@ -643,7 +774,9 @@ class BasicMemoryAgent(AgentInterface):
                 return
             else:
                 logger.info("Starting simple chat completion.")
-                token_stream = self._llm.chat_completion(messages, self._system)
+                token_stream = self._llm.chat_completion(
+                    messages, self._system_prompt()
+                )
                 complete_response = ""
                 async for event in token_stream:
                     text_chunk = ""
@@ -8,6 +8,7 @@ from ..transformers import (
     display_processor,
 )
 from ...config_manager import TTSPreprocessorConfig
+from ...utils.stream_bridge import iterate_in_thread
 from ..input_types import BatchInput, TextSource
 from letta_client import Letta
 
@@ -55,21 +56,22 @@ class LettaAgent(AgentInterface):
             )
         )
 
-    def set_memory_from_history(self, conf_uid: str, history_uid: str) -> None:
+    async def set_memory_from_history(self, conf_uid: str, history_uid: str) -> None:
         # The Letta Server automatically stores historical messages, so this part is not needed
         pass
 
     def handle_interrupt(self, heard_response: str) -> None:
         pass
 
-    async def generator_to_async(self, gen):
-        for item in gen:
+    async def generator_to_async(self, make_gen):
+        # The Letta client streams over blocking HTTP, read it off the event loop
+        async for item in iterate_in_thread(make_gen):
             yield item
 
     async def chat(self, input_data: BatchInput) -> AsyncIterator[SentenceOutput]:
         messages = self._to_messages(input_data)
         stream = self.generator_to_async(
-            self.client.agents.messages.stream(
+            lambda: self.client.agents.messages.stream(
                 agent_id=self.id,
                 messages=messages,
             )
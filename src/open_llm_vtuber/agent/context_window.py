@@ -0,0 +1,249 @@
+"""
+Token budget for the conversation memory of an agent.
+
+The memory of a long-running stream grows without bound, and the whole of it
+is sent to the LLM on every turn. `ContextWindow` keeps the prompt under a
+token budget by dropping the oldest turns, and can fold them into a running
+summary in the background.
+
+Trimming happens in large steps: once the budget is exceeded, the history is
+cut down to `trim_ratio` of the budget. Between two trims the system prompt
+and the retained messages stay byte-for-byte identical, so provider-side
+prompt caching keeps hitting instead of missing on every turn.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+from loguru import logger
+
+# Rough per-message overhead of role markers and separators
+MESSAGE_TOKEN_OVERHEAD = 4
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below in a few sentences, from the assistant's "
+    "point of view. Keep names, facts, promises and open questions that may "
+    "matter later. Reply with the summary only.\n\n"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count of a text without a tokenizer.
+
+    ASCII text averages about four characters per token, while CJK and other
+    non-ASCII characters are closer to one token each.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text", "") for part in content if isinstance(part, dict)
+        )
+    return str(content) if content is not None else ""
+
+
+class ContextWindow:
+    """Keeps an agent's memory under a token budget."""
+
+    def __init__(
+        self,
+        max_tokens: int,
+        trim_ratio: float = 0.6,
+        keep_recent_messages: int = 6,
+        summarize: bool = False,
+        summarizer: Callable[[str], Awaitable[str]] | None = None,
+    ):
+        """
+        Args:
+            max_tokens: Token budget for the system prompt plus the memory.
+            trim_ratio: When the budget is exceeded, older turns are dropped
+                until the prompt fits in this fraction of the budget.
+            keep_recent_messages: Number of latest messages that are never
+                dropped.
+            summarize: Whether dropped turns are summarized in the background.
+            summarizer: Coroutine function that turns a prompt into a summary.
+                Required when `summarize` is True.
+        """
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+        if not 0 < trim_ratio <= 1:
+            raise ValueError("trim_ratio must be in (0, 1]")
+
+        self.max_tokens = max_tokens
+        self.trim_ratio = trim_ratio
+        self.keep_recent_messages = max(keep_recent_messages, 1)
+        self.summarize = summarize and summarizer is not None
+        self._summarizer = summarizer
+
+        # One entry per message in memory: (message, content, tokens). The
+        # message and content are compared by identity, so only new or edited
+        # messages are counted again.
+        self._counts: List[tuple[Dict[str, Any], Any, int]] = []
+        self._system_prompt: str | None = None
+        self._system_tokens = 0
+
+        self.summary = ""
+        self.dropped_messages = 0
+        self._summary_task: asyncio.Task | None = None
+
+    def _message_tokens(self, memory: List[Dict[str, Any]]) -> List[int]:
+        counts = self._counts
+        if len(counts) > len(memory):
+            del counts[len(memory) :]
+        for i, message in enumerate(memory):
+            content = message.get("content")
+            if i < len(counts):
+                cached_message, cached_content, _ = counts[i]
+                if cached_message is message and cached_content is content:
+                    continue
+            entry = (
+                message,
+                content,
+                estimate_tokens(_content_text(content)) + MESSAGE_TOKEN_OVERHEAD,
+            )
+            if i < len(counts):
+                counts[i] = entry
+            else:
+                counts.append(entry)
+        return [tokens for _, _, tokens in counts]
+
+    def _prompt_tokens(self, system: str) -> int:
+        if system is not self._system_prompt:
+            self._system_prompt = system
+            self._system_tokens = estimate_tokens(system)
+        return self._system_tokens
+
+    def count_tokens(self, memory: List[Dict[str, Any]], system: str = "") -> int:
+        """Return the approximate token count of the system prompt and memory."""
+        return self._prompt_tokens(system) + sum(self._message_tokens(memory))
+
+    def select_tail(
+        self, newest_first: Iterable[Dict[str, Any]], system: str = ""
+    ) -> List[Dict[str, Any]]:
+        """Pick the latest messages that fit the budget, e.g. of a loaded history.
+
+        Messages are taken until the prompt would exceed `trim_ratio` of the
+        budget, which is what `fit` trims down to, so the loaded history is
+        not trimmed again on the next turn. Like `fit`, the selection starts
+        on a user message.
+
+        Args:
+            newest_first: The messages, newest first. Only as many as needed
+                are consumed.
+            system: The system prompt that will be sent with the messages.
+
+        Returns:
+            The selected messages, oldest first.
+        """
+        budget = self.max_tokens * self.trim_ratio - self._prompt_tokens(system)
+        selected: List[Dict[str, Any]] = []
+        total = 0
+        for message in newest_first:
+            total += (
+                estimate_tokens(_content_text(message.get("content")))
+                + MESSAGE_TOKEN_OVERHEAD
+            )
+            if total > budget and len(selected) >= self.keep_recent_messages:
+                break
+            selected.append(message)
+        selected.reverse()
+
+        start = 0
+        while (
+            start < len(selected) - self.keep_recent_messages
+            and selected[start].get("role") != "user"
+        ):
+            start += 1
+        return selected[start:]
+
+    def fit(self, memory: List[Dict[str, Any]], system: str = "") -> int:
+        """Drop the oldest turns from `memory` (in place) if it is over budget.
+
+        The cut is placed on a user message so the remaining history starts
+        with a complete turn.
+
+        Args:
+            memory: The agent's memory, modified in place.
+            system: The system prompt that will be sent with the memory.
+
+        Returns:
+            int: Number of messages dropped.
+        """
+        tokens = self._message_tokens(memory)
+        total = self._prompt_tokens(system) + sum(tokens)
+        if total <= self.max_tokens:
+            return 0
+
+        target = self.max_tokens * self.trim_ratio
+        last_droppable = len(memory) - self.keep_recent_messages
+        cut = 0
+        while cut < last_droppable and total > target:
+            total -= tokens[cut]
+            cut += 1
+        while cut < last_droppable and memory[cut].get("role") != "user":
+            cut += 1
+        if cut == 0:
+            logger.warning(
+                f"Context is over budget ({total} > {self.max_tokens} tokens) "
+                f"but only the {self.keep_recent_messages} most recent messages remain."
+            )
+            return 0
+
+        dropped = memory[:cut]
+        del memory[:cut]
+        del self._counts[:cut]
+        self.dropped_messages += cut
+        logger.info(
+            f"Context window: dropped {cut} old messages, "
+            f"~{self.count_tokens(memory, system)} tokens left "
+            f"(budget {self.max_tokens})."
+        )
+        if self.summarize:
+            self._schedule_summary(dropped)
+        return cut
+
+    def _schedule_summary(self, dropped: List[Dict[str, Any]]) -> None:
+        previous_task = self._summary_task
+
+        async def _summarize() -> None:
+            if previous_task is not None:
+                # Summaries are chained so that each one builds on the last
+                await asyncio.gather(previous_task, return_exceptions=True)
+            transcript = "\n".join(
+                f"{m.get('role')}: {_content_text(m.get('content'))}" for m in dropped
+            )
+            if self.summary:
+                transcript = f"(Earlier summary: {self.summary})\n{transcript}"
+            try:
+                summary = await self._summarizer(SUMMARY_PROMPT + transcript)
+            except Exception as e:
+                logger.warning(f"Failed to summarize dropped context: {e}")
+                return
+            if summary.strip():
+                self.summary = summary.strip()
+                logger.debug(f"Updated conversation summary: {self.summary}")
+
+        try:
+            self._summary_task = asyncio.get_running_loop().create_task(_summarize())
+        except RuntimeError:
+            logger.debug("No running event loop, skipping context summary.")
+
+    def system_prompt(self, system: str) -> str:
+        """Return the system prompt with the running summary, if any."""
+        if not self.summary:
+            return system
+        return f"{system}\n\nSummary of the earlier conversation:\n{self.summary}"
+
+    def reset(self) -> None:
+        """Forget counts and summary, e.g. after another history was loaded."""
+        if self._summary_task is not None and not self._summary_task.done():
+            self._summary_task.cancel()
+        self._summary_task = None
+        self._counts.clear()
+        self.summary = ""
+        self.dropped_messages = 0
@@ -10,6 +10,7 @@ from loguru import logger
 from anthropic import AsyncAnthropic, NOT_GIVEN
 
 from .stateless_llm_interface import StatelessLLMInterface
+from .prompt_cache_stats import record_prompt_cache_usage
 
 
 class AsyncLLM(StatelessLLMInterface):
@@ -19,6 +20,7 @@ class AsyncLLM(StatelessLLMInterface):
         base_url: str = None,
         llm_api_key: str = None,
         system: str = None,
+        prompt_caching: bool = False,
     ):
         """
         Initialize Claude LLM.
@@ -28,9 +30,12 @@ class AsyncLLM(StatelessLLMInterface):
             base_url (str): Base URL for Claude API
             llm_api_key (str): Claude API key
             system (str): System prompt
+            prompt_caching (bool): Mark the tools, system prompt and conversation
+                with cache breakpoints so the prefix is read from the prompt cache
         """
         self.model = model
         self.system = system
+        self.prompt_caching = prompt_caching
 
         # Initialize Claude client
         self.client = AsyncAnthropic(
@@ -81,6 +86,46 @@ class AsyncLLM(StatelessLLMInterface):
         # Handle plain text content or non-list content
         return message
 
+    @staticmethod
+    def _add_cache_breakpoints(
+        system: str,
+        messages: List[Dict[str, Any]],
+        tools: List[Dict[str, Any]] | None,
+    ) -> tuple:
+        """Add `cache_control` breakpoints after the tools, the system prompt and
+        the latest message.
+
+        The breakpoint on the latest message caches the whole conversation, so
+        the next turn reads everything up to it from the cache and only the new
+        messages are prefilled.
+        """
+        cache_control = {"type": "ephemeral"}
+
+        if tools:
+            tools = [*tools[:-1], {**tools[-1], "cache_control": cache_control}]
+
+        system_blocks = (
+            [{"type": "text", "text": system, "cache_control": cache_control}]
+            if system
+            else system
+        )
+
+        if messages:
+            last = messages[-1]
+            content = last.get("content")
+            if isinstance(content, str) and content:
+                content = [
+                    {"type": "text", "text": content, "cache_control": cache_control}
+                ]
+            elif isinstance(content, list) and content:
+                content = [
+                    *content[:-1],
+                    {**content[-1], "cache_control": cache_control},
+                ]
+            messages = [*messages[:-1], {**last, "content": content}]
+
+        return system_blocks, messages, tools
+
     async def chat_completion(
         self,
         messages: List[Dict[str, Any]],
@@ -116,12 +161,18 @@ class AsyncLLM(StatelessLLMInterface):
                 if msg["role"] != "system"
             ]
 
+            system_prompt = system if system else (self.system if self.system else "")
+            if self.prompt_caching:
+                system_prompt, converted_messages, tools = self._add_cache_breakpoints(
+                    system_prompt, converted_messages, tools
+                )
+
             logger.debug(f"Sending messages to Claude API: {converted_messages}")
             logger.debug(f"Tools provided: {tools}")
 
             async with self.client.messages.stream(
                 messages=converted_messages,
-                system=system if system else (self.system if self.system else ""),
+                system=system_prompt,
                 model=self.model,
                 max_tokens=1024,
                 tools=tools if tools else NOT_GIVEN,
@@ -132,6 +183,22 @@ class AsyncLLM(StatelessLLMInterface):
                 async for event in stream:
                     if event.type == "message_start":
                         logger.debug("Stream: message_start")
+                        if self.prompt_caching:
+                            usage = event.message.usage
+                            cache_read = (
+                                getattr(usage, "cache_read_input_tokens", 0) or 0
+                            )
+                            cache_write = (
+                                getattr(usage, "cache_creation_input_tokens", 0) or 0
+                            )
+                            record_prompt_cache_usage(
+                                "claude",
+                                input_tokens=usage.input_tokens
+                                + cache_read
+                                + cache_write,
+                                cached_tokens=cache_read,
+                                cache_write_tokens=cache_write,
+                            )
                         yield {
                             "type": "message_start",
                             "data": event.message.model_dump(exclude_none=True),
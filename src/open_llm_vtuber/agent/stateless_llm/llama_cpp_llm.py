@@ -2,18 +2,35 @@
 This class provides a stateless interface to llama.cpp for language generation.
 """
 
-import asyncio
-from typing import AsyncIterator, List, Dict, Any
-from llama_cpp import Llama
+import threading
+from typing import AsyncIterator, Iterator, List, Dict, Any
+from llama_cpp import Llama, LlamaRAMCache
 from loguru import logger
 
 from .stateless_llm_interface import StatelessLLMInterface
+from .prompt_cache_stats import record_prompt_cache_lookup
+from ...utils.stream_bridge import iterate_in_thread
+
+
+class _CountingRAMCache(LlamaRAMCache):
+    """RAM prompt cache that records hits and misses in the cache stats."""
+
+    def __getitem__(self, key):
+        try:
+            state = super().__getitem__(key)
+        except KeyError:
+            record_prompt_cache_lookup("llama_cpp", hit=False)
+            raise
+        record_prompt_cache_lookup("llama_cpp", hit=True)
+        return state
 
 
 class LLM(StatelessLLMInterface):
     def __init__(
         self,
         model_path: str,
+        prompt_caching: bool = False,
+        prompt_cache_capacity_mb: int = 2048,
         **kwargs,
     ):
         """
@@ -21,6 +38,10 @@ class LLM(StatelessLLMInterface):
 
         Parameters:
         - model_path (str): Path to the GGUF model file
+        - prompt_caching (bool): Keep the KV state of recent prompts in RAM so a
+          request sharing a prefix with an earlier one (e.g. the system prompt
+          of another session) skips prefilling it
+        - prompt_cache_capacity_mb (int): Size of the prompt cache in MiB
         - **kwargs: Additional arguments passed to Llama constructor
         """
         logger.info(f"Initializing llama cpp with model path: {model_path}")
@@ -30,6 +51,27 @@ class LLM(StatelessLLMInterface):
         except Exception as e:
             logger.critical(f"Failed to initialize Llama model: {e}")
             raise
+        # A Llama instance holds one KV cache and cannot run two generations at
+        # once. The model is shared by all sessions, so generations take turns.
+        self._lock = threading.Lock()
+
+        # Llama already reuses the KV cache for the prefix shared with the
+        # previous call. The RAM cache also restores the state of older
+        # prompts, which helps when several sessions share one model.
+        if prompt_caching:
+            self.llm.set_cache(
+                _CountingRAMCache(capacity_bytes=prompt_cache_capacity_mb << 20)
+            )
+            logger.info(
+                f"Enabled llama.cpp prompt cache ({prompt_cache_capacity_mb} MiB)"
+            )
+
+    def _generate(self, messages: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            yield from self.llm.create_chat_completion(
+                messages=messages,
+                stream=True,
+            )
 
     async def chat_completion(
         self, messages: List[Dict[str, Any]], system: str = None
@@ -55,17 +97,15 @@ class LLM(StatelessLLMInterface):
                     *messages,
                 ]
 
-            # Create chat completion in a separate thread to avoid blocking
-            chat_completion = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.llm.create_chat_completion(
-                    messages=messages_with_system,
-                    stream=True,
-                ),
+            # Both creating the stream and stepping through it run inference,
+            # so the whole iteration happens in the local LLM pool.
+            chat_completion = iterate_in_thread(
+                lambda: self._generate(messages_with_system),
+                pool="llm_local",
             )
 
             # Process chunks
-            for chunk in chat_completion:
+            async for chunk in chat_completion:
                 if chunk.get("choices") and chunk["choices"][0].get("delta"):
                     content = chunk["choices"][0]["delta"].get("content", "")
                     if content:
@@ -0,0 +1,182 @@
+"""
+Process-wide HTTP connection manager for remote LLM backends.
+
+Every `AsyncLLM` used to build its own `AsyncOpenAI` client, so each session
+and each config switch opened fresh connections and paid for the TCP and TLS
+handshakes again before the first token. Clients are now shared: one pooled
+`httpx` client per base URL, and one `AsyncOpenAI` client per base URL and set
+of credentials, reused by every `ServiceContext`.
+"""
+
+import asyncio
+import importlib.util
+import weakref
+from typing import Any, Dict, Tuple
+
+import httpx
+from loguru import logger
+from openai import AsyncOpenAI
+
+# Used until `configure_llm_clients` is called with the system config.
+DEFAULT_CLIENT_SETTINGS: Dict[str, Any] = {
+    "http2": False,
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 60.0,
+    "connect_timeout": 10.0,
+    "timeout": 600.0,
+}
+
+_settings: Dict[str, Any] = dict(DEFAULT_CLIENT_SETTINGS)
+_http_clients: Dict[str, httpx.AsyncClient] = {}
+_openai_clients: Dict[Tuple[str, str, str, str], AsyncOpenAI] = {}
+_sync_client: httpx.Client | None = None
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """Keeps a separate connection pool for every event loop.
+
+    Pooled connections belong to the loop that opened them. The default
+    context is loaded under `asyncio.run` before uvicorn starts its own loop,
+    so a single pool would hand out connections of a closed loop.
+    """
+
+    def __init__(self, **transport_kwargs: Any):
+        self._transport_kwargs = transport_kwargs
+        self._transports = weakref.WeakKeyDictionary()
+
+    def _get_transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+            self._transports[loop] = transport
+        return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._get_transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+def _http2_enabled() -> bool:
+    if not _settings["http2"]:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning(
+            "HTTP/2 is enabled for LLM clients but the 'h2' package is not "
+            "installed. Falling back to HTTP/1.1. Install it with "
+            "`pip install httpx[http2]`."
+        )
+        _settings["http2"] = False
+        return False
+    return True
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=_settings["max_connections"],
+        max_keepalive_connections=_settings["max_keepalive_connections"],
+        keepalive_expiry=_settings["keepalive_expiry"],
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(_settings["timeout"], connect=_settings["connect_timeout"])
+
+
+def configure_llm_clients(client_settings: Dict[str, Any]) -> None:
+    """Set the pool settings used for LLM HTTP clients created from now on.
+
+    Clients that already exist keep their connections, so a config reload
+    does not drop warm connections.
+
+    Args:
+        client_settings: Keys of `DEFAULT_CLIENT_SETTINGS` to override.
+    """
+    _settings.update(
+        {k: v for k, v in client_settings.items() if k in DEFAULT_CLIENT_SETTINGS}
+    )
+    logger.info(
+        f"LLM HTTP clients: http2={_settings['http2']}, "
+        f"max_connections={_settings['max_connections']}, "
+        f"max_keepalive_connections={_settings['max_keepalive_connections']}, "
+        f"keepalive_expiry={_settings['keepalive_expiry']}s"
+    )
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """Get the shared, pooled async HTTP client for a base URL.
+
+    Args:
+        base_url: Base URL of the LLM API.
+
+    Returns:
+        httpx.AsyncClient: A client that keeps connections to the host alive.
+    """
+    key = base_url.rstrip("/")
+    client = _http_clients.get(key)
+    if client is None:
+        client = httpx.AsyncClient(
+            transport=_PerLoopTransport(http2=_http2_enabled(), limits=_limits()),
+            timeout=_timeout(),
+            follow_redirects=True,
+        )
+        _http_clients[key] = client
+        logger.debug(f"Created pooled LLM HTTP client for {key}")
+    return client
+
+
+def get_sync_http_client() -> httpx.Client:
+    """Get the shared blocking HTTP client, for code that cannot await
+    (e.g. `atexit` handlers)."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = httpx.Client(limits=_limits(), timeout=_timeout())
+    return _sync_client
+
+
+def get_openai_client(
+    base_url: str,
+    api_key: str,
+    organization: str | None = None,
+    project: str | None = None,
+) -> AsyncOpenAI:
+    """Get the shared `AsyncOpenAI` client for a base URL and credentials.
+
+    Args:
+        base_url: Base URL of the OpenAI-compatible API.
+        api_key: API key.
+        organization: Organization ID.
+        project: Project ID.
+
+    Returns:
+        AsyncOpenAI: A client backed by the pooled HTTP client of `base_url`.
+    """
+    key = (base_url.rstrip("/"), api_key, organization or "", project or "")
+    client = _openai_clients.get(key)
+    if client is None:
+        client = AsyncOpenAI(
+            base_url=base_url,
+            organization=organization,
+            project=project,
+            api_key=api_key,
+            http_client=get_http_client(base_url),
+        )
+        _openai_clients[key] = client
+    return client
+
+
+async def close_llm_clients() -> None:
+    """Close every shared LLM client. Call this on server shutdown."""
+    global _sync_client
+    _openai_clients.clear()
+    for client in _http_clients.values():
+        await client.aclose()
+    _http_clients.clear()
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
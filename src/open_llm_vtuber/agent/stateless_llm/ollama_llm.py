@@ -1,7 +1,16 @@
+import asyncio
 import atexit
-import requests
+import threading
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
 from loguru import logger
+from openai import NOT_GIVEN, NotGiven
+from openai.types.chat.chat_completion_chunk import ChoiceDeltaToolCall
+
 from .openai_compatible_llm import AsyncLLM
+from .llm_client_manager import get_sync_http_client
 
 
 class OllamaLLM(AsyncLLM):
@@ -15,10 +24,12 @@ class OllamaLLM(AsyncLLM):
         temperature: float = 1.0,
         keep_alive: float = -1,
         unload_at_exit: bool = True,
+        prompt_caching: bool = False,
     ):
         self.keep_alive = keep_alive
         self.unload_at_exit = unload_at_exit
         self.cleaned = False
+        self._preload_thread: threading.Thread | None = None
         super().__init__(
             model=model,
             base_url=base_url,
@@ -26,30 +37,59 @@ class OllamaLLM(AsyncLLM):
             organization_id=organization_id,
             project_id=project_id,
             temperature=temperature,
+            prompt_caching=prompt_caching,
         )
+        # Preload the model. Inside the event loop this runs in a thread so
+        # that loading a large model does not stall other sessions. A task
+        # would not do: the default context is built under `asyncio.run`,
+        # which cancels the tasks still pending when it returns.
+        logger.info("Preloading model for Ollama")
         try:
-            # preload model
-            logger.info("Preloading model for Ollama")
-            # Send the POST request to preload model
-            logger.debug(
-                requests.post(
-                    base_url.replace("/v1", "") + "/api/chat",
-                    json={
-                        "model": model,
-                        "keep_alive": keep_alive,
-                    },
-                )
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._preload_sync()
+        else:
+            self._preload_thread = threading.Thread(
+                target=self._preload_sync, name="ollama-preload", daemon=True
             )
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"Failed to preload model: {e}")
+            self._preload_thread.start()
+        # If keep_alive is less than 0, register cleanup to unload the model
+        if unload_at_exit:
+            atexit.register(self.cleanup)
+
+    def _api_chat_url(self) -> str:
+        return self.base_url.replace("/v1", "") + "/api/chat"
+
+    def _log_preload_error(self, e: Exception) -> None:
+        logger.error(f"Failed to preload model: {e}")
+        if isinstance(e, httpx.ConnectError):
             logger.critical(
                 "Fail to connect to Ollama backend. Is Ollama server running? Try running `ollama list` to start the server and try again.\nThe AI will repeat 'Error connecting chat endpoint' until the server is running."
             )
+
+    def _preload_sync(self):
+        try:
+            logger.debug(
+                get_sync_http_client().post(
+                    self._api_chat_url(),
+                    json={"model": self.model, "keep_alive": self.keep_alive},
+                )
+            )
         except Exception as e:
-            logger.error(f"Failed to preload model: {e}")
-        # If keep_alive is less than 0, register cleanup to unload the model
-        if unload_at_exit:
-            atexit.register(self.cleanup)
+            self._log_preload_error(e)
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        system: str = None,
+        tools: List[Dict[str, Any]] | NotGiven = NOT_GIVEN,
+    ) -> AsyncIterator[str | List[ChoiceDeltaToolCall]]:
+        """Stream a completion, once the model preload has finished."""
+        if self._preload_thread and self._preload_thread.is_alive():
+            await asyncio.to_thread(self._preload_thread.join)
+        async with aclosing(super().chat_completion(messages, system, tools)) as stream:
+            async for chunk in stream:
+                yield chunk
 
     def __del__(self):
         """Destructor to unload the model"""
@@ -61,13 +101,16 @@ class OllamaLLM(AsyncLLM):
             logger.info(f"Ollama: Unloading model: {self.model}")
             # Unload the model
             # unloading is just the same as preload, but with keep alive set to 0
-            logger.debug(
-                requests.post(
-                    self.base_url.replace("/v1", "") + "/api/chat",
-                    json={
-                        "model": self.model,
-                        "keep_alive": 0,
-                    },
+            try:
+                logger.debug(
+                    get_sync_http_client().post(
+                        self._api_chat_url(),
+                        json={
+                            "model": self.model,
+                            "keep_alive": 0,
+                        },
+                    )
                 )
-            )
+            except Exception as e:
+                logger.error(f"Ollama: Failed to unload model: {e}")
             self.cleaned = True
@@ -3,10 +3,11 @@ This class is responsible for handling asynchronous interaction with OpenAI API
 endpoints for language generation.
 """
 
+import hashlib
+import json
 from typing import AsyncIterator, List, Dict, Any
 from openai import (
     AsyncStream,
-    AsyncOpenAI,
     APIError,
     APIConnectionError,
     RateLimitError,
@@ -18,6 +19,8 @@ from openai.types.chat.chat_completion_chunk import ChoiceDeltaToolCall
 from loguru import logger
 
 from .stateless_llm_interface import StatelessLLMInterface
+from .llm_client_manager import get_openai_client
+from .prompt_cache_stats import record_prompt_cache_usage
 from ...mcpp.types import ToolCallObject
 
 
@@ -30,6 +33,7 @@ class AsyncLLM(StatelessLLMInterface):
         organization_id: str = "z",
         project_id: str = "z",
         temperature: float = 1.0,
+        prompt_caching: bool = False,
     ):
         """
         Initializes an instance of the `AsyncLLM` class.
@@ -41,15 +45,18 @@ class AsyncLLM(StatelessLLMInterface):
         - project_id (str, optional): The project ID for the OpenAI API. Defaults to "z".
         - llm_api_key (str, optional): The API key for the OpenAI API. Defaults to "z".
         - temperature (float, optional): What sampling temperature to use, between 0 and 2. Defaults to 1.0.
+        - prompt_caching (bool, optional): Keep the prompt prefix byte-stable, route requests by prefix and record prompt cache usage. Defaults to False.
         """
         self.base_url = base_url
         self.model = model
         self.temperature = temperature
-        self.client = AsyncOpenAI(
+        self.prompt_caching = prompt_caching
+        # Shared across sessions and config switches to keep connections warm
+        self.client = get_openai_client(
             base_url=base_url,
+            api_key=llm_api_key,
             organization=organization_id,
             project=project_id,
-            api_key=llm_api_key,
         )
         self.support_tools = True
 
@@ -57,6 +64,38 @@ class AsyncLLM(StatelessLLMInterface):
             f"Initialized AsyncLLM with the parameters: {self.base_url}, {self.model}"
         )
 
+    def _prompt_cache_options(
+        self, system: str | None, tools: List[Dict[str, Any]] | NotGiven
+    ) -> tuple:
+        """Prepare a request whose prompt prefix can be served from cache.
+
+        OpenAI-compatible providers cache exact prompt prefixes automatically.
+        The system prompt already comes first and the agent keeps the history
+        stable, but the tool list is ordered by how MCP servers were loaded, so
+        it is sorted by name to keep the prefix identical across sessions.
+        """
+        if tools:
+            tools = sorted(tools, key=lambda t: t.get("function", {}).get("name", ""))
+
+        # Usage data with the cached token count arrives in the last chunk
+        options: Dict[str, Any] = {"stream_options": {"include_usage": True}}
+        if "api.openai.com" in self.base_url:
+            # Route requests sharing a prefix to the same cache. Other
+            # compatible servers may reject unknown parameters.
+            prefix = json.dumps([self.model, system, tools or []], sort_keys=True)
+            options["extra_body"] = {
+                "prompt_cache_key": hashlib.sha256(prefix.encode()).hexdigest()[:32]
+            }
+        return tools, options
+
+    def _record_cache_usage(self, usage) -> None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        record_prompt_cache_usage(
+            "openai_compatible",
+            input_tokens=usage.prompt_tokens or 0,
+            cached_tokens=getattr(details, "cached_tokens", 0) or 0,
+        )
+
     async def chat_completion(
         self,
         messages: List[Dict[str, Any]],
@@ -97,6 +136,12 @@ class AsyncLLM(StatelessLLMInterface):
 
             available_tools = tools if self.support_tools else NOT_GIVEN
 
+            cache_kwargs = {}
+            if self.prompt_caching:
+                available_tools, cache_kwargs = self._prompt_cache_options(
+                    system, available_tools
+                )
+
             stream: AsyncStream[
                 ChatCompletionChunk
             ] = await self.client.chat.completions.create(
@@ -105,12 +150,15 @@ class AsyncLLM(StatelessLLMInterface):
                 stream=True,
                 temperature=self.temperature,
                 tools=available_tools,
+                **cache_kwargs,
             )
             logger.debug(
                 f"Tool Support: {self.support_tools}, Available tools: {available_tools}"
             )
 
             async for chunk in stream:
+                if self.prompt_caching and getattr(chunk, "usage", None):
+                    self._record_cache_usage(chunk.usage)
                 # Guard against chunks with missing choices field (e.g., from OpenWebUI)
                 if not chunk.choices:
                     continue
@@ -0,0 +1,78 @@
+"""
+Prompt cache statistics shared by the LLM backends.
+
+Backends with prompt caching enabled report how many prompt tokens each request
+read from the provider's cache. Token counts come from the provider's usage
+data (Claude, OpenAI-compatible APIs) or from the local prompt cache
+(llama.cpp, which only reports hits and misses).
+"""
+
+from typing import Any, Dict
+
+from loguru import logger
+
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _provider_stats(provider: str) -> Dict[str, int]:
+    return _stats.setdefault(
+        provider,
+        {
+            "requests": 0,
+            "hits": 0,
+            "input_tokens": 0,
+            "cached_tokens": 0,
+            "cache_write_tokens": 0,
+        },
+    )
+
+
+def record_prompt_cache_usage(
+    provider: str,
+    input_tokens: int,
+    cached_tokens: int,
+    cache_write_tokens: int = 0,
+) -> None:
+    """Record the prompt cache usage of one request.
+
+    Args:
+        provider: Backend name, e.g. "claude" or "openai_compatible".
+        input_tokens: Total prompt tokens of the request, cached ones included.
+        cached_tokens: Prompt tokens that were read from the cache.
+        cache_write_tokens: Prompt tokens written to the cache.
+    """
+    stats = _provider_stats(provider)
+    stats["requests"] += 1
+    stats["input_tokens"] += input_tokens
+    stats["cached_tokens"] += cached_tokens
+    stats["cache_write_tokens"] += cache_write_tokens
+    if cached_tokens:
+        stats["hits"] += 1
+    logger.debug(
+        f"Prompt cache ({provider}): {cached_tokens}/{input_tokens} prompt tokens "
+        f"from cache, {cache_write_tokens} written"
+    )
+
+
+def record_prompt_cache_lookup(provider: str, hit: bool) -> None:
+    """Record a cache lookup of a backend that cannot report token counts."""
+    stats = _provider_stats(provider)
+    stats["requests"] += 1
+    if hit:
+        stats["hits"] += 1
+
+
+def get_prompt_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return hit rates and cached token ratios per backend."""
+    return {
+        provider: {
+            **stats,
+            "hit_rate": stats["hits"] / stats["requests"] if stats["requests"] else 0.0,
+            "cached_token_ratio": (
+                stats["cached_tokens"] / stats["input_tokens"]
+                if stats["input_tokens"]
+                else 0.0
+            ),
+        }
+        for provider, stats in _stats.items()
+    }
@@ -0,0 +1,352 @@
+"""
+Routing LLM that spreads requests over several backends.
+
+`RouterLLM` wraps a set of configured stateless LLMs and sends every request to
+the backend that currently answers fastest. For each backend it keeps a rolling
+window of time-to-first-token (TTFT) samples and request outcomes. Backends that
+fail several times in a row are put on a cooldown, and a request whose backend
+fails before producing anything is retried on the next one.
+
+Optionally the router hedges: if the chosen backend has not produced its first
+chunk after `hedge_delay` seconds, the request is also sent to the next backend
+and whichever answers first is kept. The other request is cancelled.
+
+Failover only happens before the first chunk reaches the caller. Once a
+response is being streamed, it cannot be replayed on another backend.
+"""
+
+import asyncio
+import time
+import weakref
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .stateless_llm_interface import StatelessLLMInterface
+
+# Some backends report failures as a text chunk instead of raising
+ERROR_CHUNK_PREFIX = "Error calling the chat endpoint"
+
+_routers: "weakref.WeakSet[RouterLLM]" = weakref.WeakSet()
+
+
+class LLMRouterError(RuntimeError):
+    """Raised when no backend of the router could answer a request."""
+
+
+def _is_error_chunk(chunk: Any) -> bool:
+    if isinstance(chunk, str):
+        return chunk.startswith(ERROR_CHUNK_PREFIX)
+    return isinstance(chunk, dict) and chunk.get("type") == "error"
+
+
+# Returned by _first_chunk for a stream that ended without any chunk
+_EMPTY = object()
+
+
+async def _first_chunk(stream: AsyncIterator[Any]) -> Any:
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return _EMPTY
+
+
+async def _close_stream(stream: AsyncIterator[Any]) -> None:
+    try:
+        await stream.aclose()
+    except Exception as e:
+        logger.debug(f"Error closing an abandoned LLM stream: {e}")
+
+
+class _Backend:
+    """A backend of the router with its rolling latency and error statistics."""
+
+    def __init__(
+        self,
+        name: str,
+        llm: StatelessLLMInterface,
+        window: int,
+        max_age: float,
+    ):
+        self.name = name
+        self.llm = llm
+        self.max_age = max_age
+        # (timestamp, seconds to first token) of recent successful requests
+        self.ttft: Deque[Tuple[float, float]] = deque(maxlen=window)
+        # (timestamp, succeeded) of recent requests
+        self.outcomes: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+        self.requests = 0
+        self.failures = 0
+        self.hedges = 0
+        self.hedges_won = 0
+
+    def _prune(self, now: float) -> None:
+        # Old samples expire so that a backend which was slow or failing once
+        # is measured again instead of being avoided forever.
+        for samples in (self.ttft, self.outcomes):
+            while samples and now - samples[0][0] > self.max_age:
+                samples.popleft()
+
+    def mean_ttft(self, now: float) -> float:
+        self._prune(now)
+        if not self.ttft:
+            # Unmeasured backends rank first so they get measured
+            return 0.0
+        return sum(seconds for _, seconds in self.ttft) / len(self.ttft)
+
+    def error_rate(self, now: float) -> float:
+        self._prune(now)
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for _, ok in self.outcomes if not ok) / len(self.outcomes)
+
+    def cooling_down(self, now: float) -> bool:
+        return now < self.cooldown_until
+
+    def expected_latency(self, now: float) -> float:
+        """Mean TTFT scaled by the retries the error rate implies."""
+        mean_ttft = self.mean_ttft(now)
+        error_rate = self.error_rate(now)
+        if not self.ttft and error_rate:
+            # Only failures recently, rank it behind every backend that answers
+            return float("inf")
+        return mean_ttft / max(1.0 - error_rate, 0.1)
+
+    def record_success(self, ttft: float) -> None:
+        now = time.monotonic()
+        self.ttft.append((now, ttft))
+        self.outcomes.append((now, True))
+        self.consecutive_failures = 0
+
+    def record_failure(self, failure_threshold: int, cooldown: float) -> None:
+        now = time.monotonic()
+        self.failures += 1
+        self.outcomes.append((now, False))
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= failure_threshold:
+            self.cooldown_until = now + cooldown
+            logger.warning(
+                f"LLM router: backend '{self.name}' failed "
+                f"{self.consecutive_failures} times in a row, "
+                f"skipping it for {cooldown}s."
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "hedges": self.hedges,
+            "hedges_won": self.hedges_won,
+            "mean_ttft": self.mean_ttft(now),
+            "error_rate": self.error_rate(now),
+            "cooling_down": self.cooling_down(now),
+        }
+
+
+class RouterLLM(StatelessLLMInterface):
+    """Stateless LLM that routes each request to the fastest healthy backend."""
+
+    def __init__(
+        self,
+        backends: Dict[str, StatelessLLMInterface],
+        hedge_delay: Optional[float] = None,
+        stats_window: int = 20,
+        stats_max_age: float = 300.0,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+    ):
+        """
+        Args:
+            backends: The LLMs to route between, by name. The order is the
+                preference order while no latency has been measured.
+            hedge_delay: Seconds to wait for the first chunk before also sending
+                the request to the next backend. None disables hedging.
+            stats_window: Number of recent requests per backend that latency and
+                error rate are computed from.
+            stats_max_age: Seconds after which a sample no longer counts.
+            failure_threshold: Consecutive failures after which a backend is put
+                on cooldown.
+            cooldown: Seconds a failing backend is skipped, unless every other
+                backend is failing too.
+        """
+        if not backends:
+            raise ValueError("RouterLLM needs at least one backend")
+        if hedge_delay is not None and hedge_delay < 0:
+            raise ValueError("hedge_delay must not be negative")
+
+        self.hedge_delay = hedge_delay
+        self.failure_threshold = max(failure_threshold, 1)
+        self.cooldown = cooldown
+        self._backends = [
+            _Backend(name, llm, max(stats_window, 1), stats_max_age)
+            for name, llm in backends.items()
+        ]
+        _routers.add(self)
+        logger.info(
+            f"LLM router initialized with backends {list(backends)}, "
+            f"hedge delay: {hedge_delay}"
+        )
+
+    @property
+    def backends(self) -> List[StatelessLLMInterface]:
+        """The backend LLMs, in configured order."""
+        return [backend.llm for backend in self._backends]
+
+    def _ranked_backends(self) -> List[_Backend]:
+        now = time.monotonic()
+        # sorted() is stable, so ties keep the configured order. Backends on
+        # cooldown come last and are only tried when all others fail.
+        return sorted(
+            self._backends,
+            key=lambda b: (b.cooling_down(now), b.expected_latency(now)),
+        )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the routing statistics of every backend."""
+        return {backend.name: backend.stats() for backend in self._backends}
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        system: str = None,
+        tools: List[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Generate a chat completion on the fastest healthy backend.
+
+        Parameters:
+        - messages (List[Dict[str, Any]]): The list of messages to send to the API.
+        - system (str, optional): System prompt to use for this completion.
+        - tools (List[Dict[str, Any]], optional): Tools to pass to the backend.
+
+        Yields:
+        - The chunks of the backend that answered first.
+
+        Raises:
+        - LLMRouterError: When every backend failed before answering.
+        """
+        backend, stream, first = await self._first_response(messages, system, tools)
+        try:
+            yield first
+            async for chunk in stream:
+                yield chunk
+        except Exception:
+            backend.record_failure(self.failure_threshold, self.cooldown)
+            raise
+        finally:
+            await _close_stream(stream)
+
+    async def _first_response(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[str],
+        tools: Optional[List[Dict[str, Any]]],
+    ) -> Tuple[_Backend, AsyncIterator[Any], Any]:
+        """Start the request and return the first backend to produce a chunk.
+
+        Returns:
+            The winning backend, its stream and the first chunk of the stream.
+        """
+        candidates = self._ranked_backends()
+        # Attempt task -> (backend, stream, start time, whether it is a hedge)
+        pending: Dict[
+            asyncio.Task, Tuple[_Backend, AsyncIterator[Any], float, bool]
+        ] = {}
+        hedged = False
+        last_error: Exception | None = None
+        last_error_chunk: Any = None
+
+        def launch(is_hedge: bool = False) -> None:
+            backend = candidates.pop(0)
+            backend.requests += 1
+            if is_hedge:
+                backend.hedges += 1
+            kwargs = {"tools": tools} if tools is not None else {}
+            stream = backend.llm.chat_completion(messages, system, **kwargs)
+            task = asyncio.ensure_future(_first_chunk(stream))
+            pending[task] = (backend, stream, time.monotonic(), is_hedge)
+
+        async def abandon(task: asyncio.Task, stream: AsyncIterator[Any]) -> None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await _close_stream(stream)
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if self.hedge_delay is not None and not hedged and candidates:
+                    started = min(attempt[2] for attempt in pending.values())
+                    timeout = max(self.hedge_delay - (time.monotonic() - started), 0)
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged = True
+                    logger.debug(
+                        f"LLM router: no answer after {self.hedge_delay}s, "
+                        f"hedging on '{candidates[0].name}'."
+                    )
+                    launch(is_hedge=True)
+                    continue
+
+                for task in done:
+                    backend, stream, started, is_hedge = pending.pop(task)
+                    try:
+                        first = task.result()
+                    except Exception as e:
+                        first = None
+                        last_error = e
+                    if first is _EMPTY:
+                        first = None
+                        last_error = LLMRouterError(
+                            f"Backend '{backend.name}' returned an empty response"
+                        )
+
+                    if first is not None and not _is_error_chunk(first):
+                        backend.record_success(time.monotonic() - started)
+                        if is_hedge:
+                            backend.hedges_won += 1
+                        for other_task, attempt in list(pending.items()):
+                            await abandon(other_task, attempt[1])
+                        pending.clear()
+                        return backend, stream, first
+
+                    if first is not None:
+                        last_error_chunk = first
+                    logger.warning(
+                        f"LLM router: backend '{backend.name}' failed: "
+                        f"{last_error if first is None else first}"
+                    )
+                    backend.record_failure(self.failure_threshold, self.cooldown)
+                    await _close_stream(stream)
+
+                if not pending and candidates:
+                    launch()
+        except BaseException:
+            for task, attempt in list(pending.items()):
+                await abandon(task, attempt[1])
+            raise
+
+        if last_error_chunk is not None:
+            # Pass the backend's own error message on, as a single backend would
+            return backend, _empty_stream(), last_error_chunk
+        raise LLMRouterError(
+            f"All LLM backends failed, last error: {last_error}"
+        ) from last_error
+
+
+async def _empty_stream() -> AsyncIterator[Any]:
+    return
+    yield
+
+
+def get_llm_router_stats() -> List[Dict[str, Dict[str, Any]]]:
+    """Return the per-backend statistics of every live LLM router."""
+    return [router.stats() for router in list(_routers)]
@@ -4,13 +4,13 @@ compatible endpoints for language generation where the language model is not
 trained using a ChatML format.
 """
 
-import requests
 import json
 from jinja2 import Template
 from loguru import logger
 from typing import AsyncIterator, List, Dict, Any
 
 from .stateless_llm_interface import StatelessLLMInterface
+from .llm_client_manager import get_http_client
 
 
 TEMPLATES = {
@@ -114,6 +114,7 @@ class AsyncLLMWithTemplate(StatelessLLMInterface):
         self.prompt_headers = {
             "Authorization": llm_api_key or "Bearer your_api_key_here"
         }
+        self.client = get_http_client(base_url)
         logger.info(
             f"Initialized AsyncLLM with the parameters: {self.completion_url} ({template})"
         )
@@ -138,7 +139,6 @@ class AsyncLLMWithTemplate(StatelessLLMInterface):
         """
         logger.debug(f"Messages: {messages}")
         bos_token = "<|begin_of_text|>"
-        stream = None
         try:
             # If system prompt is provided, add it to the messages
             messages_with_system: List[Dict[str, Any]] = messages
@@ -157,37 +157,36 @@ class AsyncLLMWithTemplate(StatelessLLMInterface):
                 "temperature": self.temperature,
                 "prompt": prompt,
             }
-            with requests.post(
-                self.completion_url, headers=self.prompt_headers, json=data, stream=True
+            # Leaving the `async with` block, including when the consumer stops
+            # iterating on interrupt, closes the response and its connection,
+            # so the server stops generating tokens.
+            async with self.client.stream(
+                "POST", self.completion_url, headers=self.prompt_headers, json=data
             ) as response:
-                for line in response.iter_lines():
-                    if line:
-                        line = self._clean_raw_bytes(line)
-                        next_token = self._process_line(line)
-                        if next_token:
-                            if next_token == self.eot_token:
-                                break
-                            yield next_token
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    line = self._clean_raw_line(line)
+                    if line is None:
+                        continue
+                    next_token = self._process_line(line)
+                    if next_token:
+                        if next_token == self.eot_token:
+                            break
+                        yield next_token
+            logger.debug("Chat completion finished.")
         except Exception as e:
             logger.error(f"LLM API WITH TEMPLATE: Error occurred: {e}")
-            logger.info(f"Base URL: {self.base_url}")
+            logger.info(f"Base URL: {self.completion_url}")
             logger.info(f"Model: {self.model}")
             logger.info(f"Messages: {messages}")
             logger.info(f"temperature: {self.temperature}")
             yield "Error calling the chat endpoint: Error occurred while generating response. See the logs for details."
-        finally:
-            # make sure the stream is properly closed
-            # so when interrupted, no more tokens will being generated.
-            if stream:
-                logger.debug("Chat completion finished.")
-                await stream.close()
-                logger.debug("Stream closed.")
-
-    def _clean_raw_bytes(self, line):
-        line = line.decode("utf-8")
-        line = line.removeprefix("data: ")
-        line = json.loads(line)
-        return line
+
+    def _clean_raw_line(self, line: str) -> Dict[str, Any] | None:
+        line = line.strip().removeprefix("data:").strip()
+        if not line or line == "[DONE]":
+            return None
+        return json.loads(line)
 
     def _process_line(self, line):
         if not (("stop" in line) and (line["stop"])):
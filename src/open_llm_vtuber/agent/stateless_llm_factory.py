@@ -39,6 +39,7 @@ class LLMFactory:
                 organization_id=kwargs.get("organization_id"),
                 project_id=kwargs.get("project_id"),
                 temperature=kwargs.get("temperature"),
+                prompt_caching=kwargs.get("prompt_caching", False),
             )
         if llm_provider == "stateless_llm_with_template":
             return StatelessLLMWithTemplate(
@@ -59,6 +60,7 @@ class LLMFactory:
                 temperature=kwargs.get("temperature"),
                 keep_alive=kwargs.get("keep_alive"),
                 unload_at_exit=kwargs.get("unload_at_exit"),
+                prompt_caching=kwargs.get("prompt_caching", False),
             )
 
         elif llm_provider == "llama_cpp_llm":
@@ -66,6 +68,8 @@ class LLMFactory:
 
             return LlamaLLM(
                 model_path=kwargs.get("model_path"),
+                prompt_caching=kwargs.get("prompt_caching", False),
+                prompt_cache_capacity_mb=kwargs.get("prompt_cache_capacity_mb", 2048),
             )
         elif llm_provider == "claude_llm":
             return ClaudeLLM(
@@ -73,6 +77,26 @@ class LLMFactory:
                 base_url=kwargs.get("base_url"),
                 model=kwargs.get("model"),
                 llm_api_key=kwargs.get("llm_api_key"),
+                prompt_caching=kwargs.get("prompt_caching", False),
+            )
+        elif llm_provider == "router_llm":
+            from .stateless_llm.router_llm import RouterLLM
+
+            backends = {
+                name: LLMFactory.create_llm(
+                    llm_provider=name,
+                    system_prompt=kwargs.get("system_prompt"),
+                    **backend_config,
+                )
+                for name, backend_config in kwargs.get("backend_configs", {}).items()
+            }
+            return RouterLLM(
+                backends=backends,
+                hedge_delay=kwargs.get("hedge_delay"),
+                stats_window=kwargs.get("stats_window", 20),
+                stats_max_age=kwargs.get("stats_max_age", 300.0),
+                failure_threshold=kwargs.get("failure_threshold", 3),
+                cooldown=kwargs.get("cooldown", 30.0),
             )
         else:
             raise ValueError(f"Unsupported LLM provider: {llm_provider}")
@@ -1,6 +1,7 @@
 import abc
 import numpy as np
-import asyncio
+
+from ..utils.executor_pool import run_in_pool
 
 
 class ASRInterface(metaclass=abc.ABCMeta):
@@ -11,8 +12,9 @@ class ASRInterface(metaclass=abc.ABCMeta):
     async def async_transcribe_np(self, audio: np.ndarray) -> str:
         """Asynchronously transcribe speech audio in numpy array format.
 
-        By default, this runs the synchronous transcribe_np in a coroutine.
-        Subclasses can override this method to provide true async implementation.
+        By default, this runs the synchronous transcribe_np in the dedicated,
+        bounded ASR executor pool. Subclasses can override this method to
+        provide true async implementation.
 
         Args:
             audio: The numpy array of the audio data to transcribe.
@@ -22,7 +24,7 @@ class ASRInterface(metaclass=abc.ABCMeta):
         """
         if audio.dtype != np.float32:
             audio = audio.astype(np.float32)
-        return await asyncio.to_thread(self.transcribe_np, audio)
+        return await run_in_pool("asr", self.transcribe_np, audio)
 
     @abc.abstractmethod
     def transcribe_np(self, audio: np.ndarray) -> str:
@@ -0,0 +1,262 @@
+"""
+Incremental WAV decoder for ASR input.
+
+The decoder parses RIFF chunks as bytes arrive, so an upload can be decoded
+while it is still being received instead of being buffered in full. Samples of
+any common PCM / IEEE float layout are downmixed to mono and resampled to the
+sample rate the ASR engine expects.
+"""
+
+import struct
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Chunk sizes streaming writers use when the length is not known up front
+_UNKNOWN_SIZES = (0, 0xFFFFFFFF)
+
+
+class WavFormatError(ValueError):
+    """Raised when the input is not a WAV file this decoder can handle."""
+
+
+class _StreamingResampler:
+    """Resamples a mono float32 stream chunk by chunk.
+
+    Downsampling applies a Butterworth low-pass first so that the linear
+    interpolation does not alias. Filter state and the interpolation position
+    carry over between chunks, so the output does not depend on how the input
+    was split.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int):
+        self._ratio = source_rate / target_rate
+        self._next_output_index = 0
+        self._consumed = 0
+        self._carry = np.zeros(0, dtype=np.float64)
+
+        self._sos = None
+        self._zi = None
+        if target_rate < source_rate:
+            from scipy.signal import butter
+
+            self._sos = butter(8, 0.45 * target_rate, fs=source_rate, output="sos")
+            self._zi = np.zeros((self._sos.shape[0], 2))
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if len(samples) == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        samples = samples.astype(np.float64)
+        if self._sos is not None:
+            from scipy.signal import sosfilt
+
+            samples, self._zi = sosfilt(self._sos, samples, zi=self._zi)
+
+        window = np.concatenate([self._carry, samples])
+        window_start = self._consumed - len(self._carry)
+        self._consumed += len(samples)
+        last_index = self._consumed - 1
+
+        end = int(np.floor(last_index / self._ratio)) + 1
+        self._carry = window[-1:]
+        if end <= self._next_output_index:
+            return np.zeros(0, dtype=np.float32)
+
+        positions = np.arange(self._next_output_index, end) * self._ratio - window_start
+        self._next_output_index = end
+        return np.interp(positions, np.arange(len(window)), window).astype(np.float32)
+
+
+class StreamingWavDecoder:
+    """Decodes a WAV byte stream into mono float32 samples in [-1, 1].
+
+    Feed the bytes in chunks of any size with `feed`, then call `finish` to get
+    the samples at `target_sample_rate`.
+    """
+
+    def __init__(self, target_sample_rate: int):
+        """
+        Args:
+            target_sample_rate: Sample rate of the decoded output.
+        """
+        self.target_sample_rate = target_sample_rate
+        self.sample_rate: int | None = None
+        self.channels: int | None = None
+        self.bits_per_sample: int | None = None
+        self.format_tag: int | None = None
+
+        self._buffer = bytearray()
+        self._state = "riff"
+        self._remaining = 0  # bytes left in the current chunk (None = until EOF)
+        self._block_align = 0
+        self._sample_dtype: np.dtype | None = None
+        self._resampler: _StreamingResampler | None = None
+        self._output: list[np.ndarray] = []
+        self._seen_data = False
+
+    def feed(self, data: bytes) -> None:
+        """Decode as much of the stream as the bytes received so far allow.
+
+        Args:
+            data: The next chunk of the WAV byte stream.
+
+        Raises:
+            WavFormatError: If the stream is not a supported WAV file.
+        """
+        self._buffer.extend(data)
+
+        while True:
+            if self._state == "riff":
+                if len(self._buffer) < 12:
+                    return
+                riff_id, _, wave_id = struct.unpack("<4sI4s", self._buffer[:12])
+                if riff_id not in (b"RIFF", b"RF64") or wave_id != b"WAVE":
+                    raise WavFormatError("Invalid WAV file: missing RIFF/WAVE header")
+                del self._buffer[:12]
+                self._state = "chunk_header"
+
+            elif self._state == "chunk_header":
+                if len(self._buffer) < 8:
+                    return
+                chunk_id, chunk_size = struct.unpack("<4sI", self._buffer[:8])
+                del self._buffer[:8]
+                if chunk_id == b"fmt ":
+                    self._state = "fmt"
+                    self._remaining = chunk_size
+                elif chunk_id == b"data":
+                    if self._sample_dtype is None:
+                        raise WavFormatError(
+                            "Invalid WAV file: data chunk before fmt chunk"
+                        )
+                    self._seen_data = True
+                    self._state = "data"
+                    self._remaining = (
+                        None if chunk_size in _UNKNOWN_SIZES else chunk_size
+                    )
+                else:
+                    # LIST, fact, cue, ... carry nothing the ASR needs.
+                    # Chunks are padded to an even size.
+                    self._state = "skip"
+                    self._remaining = chunk_size + (chunk_size & 1)
+
+            elif self._state == "fmt":
+                padded_size = self._remaining + (self._remaining & 1)
+                if len(self._buffer) < padded_size:
+                    return
+                self._parse_fmt(bytes(self._buffer[: self._remaining]))
+                del self._buffer[:padded_size]
+                self._state = "chunk_header"
+
+            elif self._state == "skip":
+                skipped = min(self._remaining, len(self._buffer))
+                del self._buffer[:skipped]
+                self._remaining -= skipped
+                if self._remaining:
+                    return
+                self._state = "chunk_header"
+
+            elif self._state == "data":
+                available = len(self._buffer)
+                if self._remaining is not None:
+                    available = min(available, self._remaining)
+                usable = available - available % self._block_align
+                if usable:
+                    self._decode_frames(bytes(self._buffer[:usable]))
+                    del self._buffer[:usable]
+                    if self._remaining is not None:
+                        self._remaining -= usable
+                if self._remaining is None or self._remaining >= self._block_align:
+                    return
+                # Drop a trailing partial frame and the pad byte, if any
+                tail = self._remaining + (self._remaining & 1)
+                if len(self._buffer) < tail:
+                    return
+                del self._buffer[:tail]
+                self._state = "chunk_header"
+
+    def finish(self) -> np.ndarray:
+        """Return all decoded samples.
+
+        Returns:
+            np.ndarray: Mono float32 samples at `target_sample_rate`.
+
+        Raises:
+            WavFormatError: If the stream ended before any audio data.
+        """
+        if not self._seen_data:
+            raise WavFormatError("Invalid WAV file: no audio data found")
+        if not self._output:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(self._output)
+
+    def _parse_fmt(self, fmt: bytes) -> None:
+        if len(fmt) < 16:
+            raise WavFormatError("Invalid WAV file: fmt chunk too small")
+        (
+            format_tag,
+            channels,
+            sample_rate,
+            _,
+            block_align,
+            bits_per_sample,
+        ) = struct.unpack("<HHIIHH", fmt[:16])
+        if format_tag == WAVE_FORMAT_EXTENSIBLE:
+            if len(fmt) < 26:
+                raise WavFormatError("Invalid WAV file: truncated extensible fmt")
+            # The first two bytes of the sub-format GUID hold the format tag
+            format_tag = struct.unpack("<H", fmt[24:26])[0]
+
+        if channels < 1 or sample_rate < 1:
+            raise WavFormatError("Invalid WAV file: bad channel count or sample rate")
+
+        if format_tag == WAVE_FORMAT_PCM and bits_per_sample in (8, 16, 24, 32):
+            self._sample_dtype = {
+                8: np.dtype(np.uint8),
+                16: np.dtype("<i2"),
+                24: np.dtype(np.uint8),  # unpacked by hand
+                32: np.dtype("<i4"),
+            }[bits_per_sample]
+        elif format_tag == WAVE_FORMAT_IEEE_FLOAT and bits_per_sample in (32, 64):
+            self._sample_dtype = np.dtype("<f4" if bits_per_sample == 32 else "<f8")
+        else:
+            raise WavFormatError(
+                f"Unsupported WAV encoding: format {format_tag:#06x}, "
+                f"{bits_per_sample} bits per sample"
+            )
+
+        self.format_tag = format_tag
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.bits_per_sample = bits_per_sample
+        self._block_align = block_align or channels * bits_per_sample // 8
+        if sample_rate != self.target_sample_rate:
+            self._resampler = _StreamingResampler(sample_rate, self.target_sample_rate)
+
+    def _decode_frames(self, data: bytes) -> None:
+        bits = self.bits_per_sample
+        if self.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+            samples = np.frombuffer(data, dtype=self._sample_dtype).astype(np.float32)
+        elif bits == 8:
+            samples = (
+                np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0
+            ) / 128.0
+        elif bits == 24:
+            raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            ints = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+            ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+            samples = ints.astype(np.float32) / float(1 << 23)
+        else:
+            samples = np.frombuffer(data, dtype=self._sample_dtype).astype(
+                np.float32
+            ) / float(1 << (bits - 1))
+
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        if self._resampler is not None:
+            samples = self._resampler.process(samples)
+        if len(samples):
+            self._output.append(samples.astype(np.float32, copy=False))
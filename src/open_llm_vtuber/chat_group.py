@@ -1,7 +1,8 @@
 from typing import Dict, List, Optional, Set, Tuple, Callable, Any
 from dataclasses import dataclass
 from fastapi import WebSocket
-import json
+from .utils import json_codec
+from .utils.ws_broadcast import describe_send_error, send_text_to_all
 from loguru import logger
 
 
@@ -186,7 +187,7 @@ async def handle_group_operation(
                     await send_group_update(client_connections[target_uid], target_uid)
                     # Notify the invited member
                     await client_connections[target_uid].send_text(
-                        json.dumps(
+                        json_codec.dumps(
                             {
                                 "type": "group-operation-result",
                                 "success": True,
@@ -204,7 +205,7 @@ async def handle_group_operation(
 
         # Send operation result to the initiator
         await client_connections[client_uid].send_text(
-            json.dumps(
+            json_codec.dumps(
                 {
                     "type": "group-operation-result",
                     "success": success,
@@ -219,7 +220,7 @@ async def handle_group_operation(
                 try:
                     await send_group_update(client_connections[target_uid], target_uid)
                     await client_connections[target_uid].send_text(
-                        json.dumps(
+                        json_codec.dumps(
                             {
                                 "type": "group-operation-result",
                                 "success": True,
@@ -243,7 +244,7 @@ async def handle_group_operation(
                         )
                         if member_uid != client_uid:
                             await client_connections[member_uid].send_text(
-                                json.dumps(
+                                json_codec.dumps(
                                     {
                                         "type": "group-operation-result",
                                         "success": True,
@@ -274,7 +275,7 @@ async def handle_client_disconnect(
         if member_uid != client_uid and member_uid in client_connections:
             await send_group_update(client_connections[member_uid], member_uid)
             await client_connections[member_uid].send_text(
-                json.dumps(
+                json_codec.dumps(
                     {
                         "type": "group-operation-result",
                         "success": True,
@@ -290,10 +291,20 @@ async def broadcast_to_group(
     client_connections: Dict[str, WebSocket],
     exclude_uid: Optional[str] = None,
 ) -> None:
-    """Broadcasts a message to all members in a group except the sender"""
-    for member_uid in group_members:
-        if member_uid != exclude_uid and member_uid in client_connections:
-            try:
-                await client_connections[member_uid].send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Failed to broadcast to {member_uid}: {e}")
+    """Broadcasts a message to all members in a group except the sender
+
+    The message is encoded once and sent to all members concurrently, so a
+    slow member does not hold up the others.
+    """
+    recipients = {
+        member_uid: client_connections[member_uid]
+        for member_uid in group_members
+        if member_uid != exclude_uid and member_uid in client_connections
+    }
+    if not recipients:
+        return
+    failures = await send_text_to_all(recipients, json_codec.dumps(message))
+    for member_uid, error in failures.items():
+        logger.error(
+            f"Failed to broadcast to {member_uid}: {describe_send_error(error)}"
+        )
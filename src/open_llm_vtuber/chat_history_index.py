@@ -0,0 +1,255 @@
+"""Index of the chat histories of each character.
+
+Listing the histories of a character used to read every history file. The
+index keeps, per conf_uid and history, the message count, the latest message
+(with its content shortened to a preview) and the size and modification time
+of the file when the entry was made. `chat_history_manager` updates entries
+as it writes, and re-reads a history only when its file no longer matches
+its entry, e.g. after a crash or an edit outside the server.
+
+Two backends are available:
+- "json": entries are kept in memory and saved to chat_history/<conf_uid>/
+  .index.json when the histories are listed and on shutdown.
+- "sqlite": entries are written through to chat_history/.index.sqlite3,
+  which suits many thousands of histories per character.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, TypedDict
+
+from loguru import logger
+
+HISTORY_ROOT = "chat_history"
+JSON_INDEX_FILENAME = ".index.json"
+SQLITE_INDEX_FILENAME = ".index.sqlite3"
+
+# Characters of the latest message kept in the index
+PREVIEW_LENGTH = 200
+
+
+class HistoryIndexEntry(TypedDict):
+    message_count: int
+    latest_message: Optional[dict]
+    timestamp: Optional[str]
+    # Size and modification time of the history file the entry describes
+    size: int
+    mtime_ns: int
+
+
+def make_preview(message: dict | None) -> dict | None:
+    """Shorten the content of a message for the index."""
+    if message is None:
+        return None
+    content = message.get("content")
+    if isinstance(content, str) and len(content) > PREVIEW_LENGTH:
+        message = {**message, "content": content[:PREVIEW_LENGTH] + "…"}
+    return message
+
+
+class HistoryIndex(ABC):
+    """Storage of history index entries."""
+
+    @abstractmethod
+    def load(self, conf_uid: str) -> Dict[str, HistoryIndexEntry]:
+        """Return the entries of a character by history_uid."""
+
+    @abstractmethod
+    def get(self, conf_uid: str, history_uid: str) -> HistoryIndexEntry | None:
+        """Return the entry of a history, if indexed."""
+
+    @abstractmethod
+    def upsert(self, conf_uid: str, entries: Dict[str, HistoryIndexEntry]) -> None:
+        """Add or replace entries."""
+
+    @abstractmethod
+    def delete(self, conf_uid: str, history_uids: Iterable[str]) -> None:
+        """Remove entries."""
+
+    def rename(self, conf_uid: str, old_history_uid: str, new_history_uid: str):
+        """Move an entry to a new history_uid."""
+        entry = self.get(conf_uid, old_history_uid)
+        self.delete(conf_uid, [old_history_uid])
+        if entry is not None:
+            self.upsert(conf_uid, {new_history_uid: entry})
+
+    def clear(self, conf_uid: str) -> None:
+        """Remove all entries of a character."""
+        self.delete(conf_uid, list(self.load(conf_uid)))
+
+    def flush(self) -> None:
+        """Persist pending changes."""
+
+    def close(self) -> None:
+        self.flush()
+
+
+class JSONHistoryIndex(HistoryIndex):
+    """Index kept in memory and saved as one JSON file per character."""
+
+    def __init__(self, root: str = HISTORY_ROOT) -> None:
+        self.root = root
+        self._entries: Dict[str, Dict[str, HistoryIndexEntry]] = {}
+        self._dirty: set[str] = set()
+        self._lock = threading.RLock()
+
+    def _path(self, conf_uid: str) -> str:
+        return os.path.join(self.root, conf_uid, JSON_INDEX_FILENAME)
+
+    def _entries_of(self, conf_uid: str) -> Dict[str, HistoryIndexEntry]:
+        entries = self._entries.get(conf_uid)
+        if entries is None:
+            entries = {}
+            try:
+                with open(self._path(conf_uid), "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                # The index is rebuilt from the history files
+                logger.warning(f"Ignoring unreadable history index of {conf_uid}: {e}")
+            self._entries[conf_uid] = entries
+        return entries
+
+    def load(self, conf_uid: str) -> Dict[str, HistoryIndexEntry]:
+        with self._lock:
+            return dict(self._entries_of(conf_uid))
+
+    def get(self, conf_uid: str, history_uid: str) -> HistoryIndexEntry | None:
+        with self._lock:
+            return self._entries_of(conf_uid).get(history_uid)
+
+    def upsert(self, conf_uid: str, entries: Dict[str, HistoryIndexEntry]) -> None:
+        if not entries:
+            return
+        with self._lock:
+            self._entries_of(conf_uid).update(entries)
+            self._dirty.add(conf_uid)
+
+    def delete(self, conf_uid: str, history_uids: Iterable[str]) -> None:
+        with self._lock:
+            entries = self._entries_of(conf_uid)
+            for history_uid in history_uids:
+                if entries.pop(history_uid, None) is not None:
+                    self._dirty.add(conf_uid)
+
+    def flush(self) -> None:
+        with self._lock:
+            for conf_uid in list(self._dirty):
+                path = self._path(conf_uid)
+                if not os.path.isdir(os.path.dirname(path)):
+                    self._dirty.discard(conf_uid)
+                    continue
+                try:
+                    tmp_path = f"{path}.tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump(self._entries[conf_uid], f, ensure_ascii=False)
+                    os.replace(tmp_path, path)
+                    self._dirty.discard(conf_uid)
+                except Exception as e:
+                    logger.error(f"Failed to save history index of {conf_uid}: {e}")
+
+
+class SQLiteHistoryIndex(HistoryIndex):
+    """Index stored in a SQLite database shared by all characters."""
+
+    def __init__(self, root: str = HISTORY_ROOT) -> None:
+        os.makedirs(root, exist_ok=True)
+        self.path = os.path.join(root, SQLITE_INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS histories (
+                conf_uid TEXT NOT NULL,
+                history_uid TEXT NOT NULL,
+                message_count INTEGER NOT NULL,
+                latest_message TEXT,
+                timestamp TEXT,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                PRIMARY KEY (conf_uid, history_uid)
+            )
+            """
+        )
+        self._db.commit()
+
+    @staticmethod
+    def _entry(row: tuple) -> HistoryIndexEntry:
+        message_count, latest_message, timestamp, size, mtime_ns = row
+        return {
+            "message_count": message_count,
+            "latest_message": json.loads(latest_message) if latest_message else None,
+            "timestamp": timestamp,
+            "size": size,
+            "mtime_ns": mtime_ns,
+        }
+
+    def load(self, conf_uid: str) -> Dict[str, HistoryIndexEntry]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT history_uid, message_count, latest_message, timestamp,"
+                " size, mtime_ns FROM histories WHERE conf_uid = ?",
+                (conf_uid,),
+            ).fetchall()
+        return {row[0]: self._entry(row[1:]) for row in rows}
+
+    def get(self, conf_uid: str, history_uid: str) -> HistoryIndexEntry | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT message_count, latest_message, timestamp, size, mtime_ns"
+                " FROM histories WHERE conf_uid = ? AND history_uid = ?",
+                (conf_uid, history_uid),
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    def upsert(self, conf_uid: str, entries: Dict[str, HistoryIndexEntry]) -> None:
+        if not entries:
+            return
+        rows: List[tuple] = [
+            (
+                conf_uid,
+                history_uid,
+                entry["message_count"],
+                json.dumps(entry["latest_message"], ensure_ascii=False)
+                if entry["latest_message"] is not None
+                else None,
+                entry["timestamp"],
+                entry["size"],
+                entry["mtime_ns"],
+            )
+            for history_uid, entry in entries.items()
+        ]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO histories VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def delete(self, conf_uid: str, history_uids: Iterable[str]) -> None:
+        with self._lock, self._db:
+            self._db.executemany(
+                "DELETE FROM histories WHERE conf_uid = ? AND history_uid = ?",
+                [(conf_uid, history_uid) for history_uid in history_uids],
+            )
+
+    def clear(self, conf_uid: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM histories WHERE conf_uid = ?", (conf_uid,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def create_history_index(backend: str, root: str = HISTORY_ROOT) -> HistoryIndex:
+    """Create the history index of the given backend, "json" or "sqlite"."""
+    if backend == "sqlite":
+        return SQLiteHistoryIndex(root)
+    if backend == "json":
+        return JSONHistoryIndex(root)
+    raise ValueError(f"Unknown history index backend: {backend}")
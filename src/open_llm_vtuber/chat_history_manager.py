@@ -1,11 +1,81 @@
+"""Chat histories of Open-LLM-VTuber.
+
+Each history is a JSON Lines file in chat_history/<conf_uid>/. The first
+line is a metadata record, every other line one message:
+
+    {"role": "metadata", "timestamp": "2025-01-01T12:00:00"}
+    {"role": "human", "timestamp": "2025-01-01T12:00:05", "content": "Hi"}
+    {"role": "ai", "timestamp": "2025-01-01T12:00:07", "content": "Hello!"}
+
+Storing a message appends one line instead of rewriting the file, and a
+crash can at worst leave a torn last line, which readers skip. Metadata
+updates are appended as further metadata records and merged on read.
+Histories in the former single-JSON-array format (.json) are converted the
+first time they are accessed.
+
+Listing the histories goes through the index in `chat_history_index`, and
+searching them through the one in `chat_history_search`. This module updates
+both on every write.
+
+All writes happen on the thread of `chat_history_writer`. `store_message`
+returns at once, and the other functions first wait for the messages stored
+before them. Coroutines should call them through `run_history_io`, which
+runs them on that thread too.
+"""
+
+import atexit
+import functools
 import os
 import re
 import json
+import time
 import uuid
 from datetime import datetime
-from typing import Literal, List, TypedDict, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Literal,
+    List,
+    Tuple,
+    TypedDict,
+    TypeVar,
+    Optional,
+)
 from loguru import logger
 
+from .chat_history_index import (
+    HistoryIndex,
+    HistoryIndexEntry,
+    JSONHistoryIndex,
+    create_history_index,
+    make_preview,
+)
+from .chat_history_search import HistorySearchIndex, SearchHit
+from .chat_history_writer import HistoryWriter
+
+HISTORY_EXT = ".jsonl"
+LEGACY_HISTORY_EXT = ".json"
+
+# Used until `configure_chat_history` is called with the system config.
+DEFAULT_HISTORY_SETTINGS: Dict[str, Any] = {
+    # "always": fsync after every write. "interval": at most once per
+    # fsync_interval seconds per file. "never": leave it to the OS.
+    "fsync": "interval",
+    "fsync_interval": 1.0,
+    # Storage of the history index, "json" or "sqlite"
+    "index_backend": "json",
+}
+
+_settings: Dict[str, Any] = dict(DEFAULT_HISTORY_SETTINGS)
+_last_fsync: Dict[str, float] = {}
+_history_index: HistoryIndex = JSONHistoryIndex()
+_search_index = HistorySearchIndex(ext=HISTORY_EXT)
+_writer = HistoryWriter()
+
+T = TypeVar("T")
+
 
 class HistoryMessage(TypedDict):
     role: Literal["human", "ai"]
@@ -16,6 +86,63 @@ class HistoryMessage(TypedDict):
     avatar: Optional[str]
 
 
+def configure_chat_history(history_settings: Dict[str, Any]) -> None:
+    """Set how history writes are made durable.
+
+    Args:
+        history_settings: Keys of `DEFAULT_HISTORY_SETTINGS` to override.
+    """
+    global _history_index
+
+    backend = _settings["index_backend"]
+    _settings.update(
+        {k: v for k, v in history_settings.items() if k in DEFAULT_HISTORY_SETTINGS}
+    )
+    if _settings["index_backend"] != backend:
+        _history_index.close()
+        _history_index = create_history_index(_settings["index_backend"])
+    logger.info(
+        f"Chat history: fsync={_settings['fsync']}, "
+        f"fsync_interval={_settings['fsync_interval']}s, "
+        f"index={_settings['index_backend']}"
+    )
+
+
+def close_chat_history() -> None:
+    """Write the queued messages and save the history index. Called on shutdown."""
+    _writer.close()
+    _history_index.close()
+    _search_index.close()
+
+
+atexit.register(close_chat_history)
+
+
+async def run_history_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a function of this module on the history thread and await it.
+
+    Example:
+        histories = await run_history_io(get_history_list, conf_uid)
+    """
+    return await _writer.run(func, *args, **kwargs)
+
+
+def get_chat_history_writer_stats() -> Dict[str, Any]:
+    """Return the queue length and write counts of the history thread."""
+    return _writer.stats()
+
+
+def _after_queued_writes(func: Callable[..., T]) -> Callable[..., T]:
+    """Let a function see the messages stored before it was called."""
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        _writer.flush()
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
 def _is_safe_filename(filename: str) -> bool:
     """Validate filename for safety and allowed characters"""
     if not filename or len(filename) > 255:
@@ -38,6 +165,15 @@ def _sanitize_path_component(component: str) -> str:
     return sanitized
 
 
+def is_valid_uid(uid: str) -> bool:
+    """Check that a conf or history uid can be used as a file name as is"""
+    return (
+        uid not in (".", "..")
+        and uid == os.path.basename(uid.strip())
+        and _is_safe_filename(uid)
+    )
+
+
 def _ensure_conf_dir(conf_uid: str) -> str:
     """Ensure the directory for a specific conf exists and return its path"""
     if not conf_uid:
@@ -49,17 +185,237 @@ def _ensure_conf_dir(conf_uid: str) -> str:
     return base_dir
 
 
-def _get_safe_history_path(conf_uid: str, history_uid: str) -> str:
+def _get_safe_history_path(
+    conf_uid: str, history_uid: str, ext: str = HISTORY_EXT
+) -> str:
     """Get sanitized path for history file"""
     safe_conf_uid = _sanitize_path_component(conf_uid)
     safe_history_uid = _sanitize_path_component(history_uid)
     base_dir = os.path.join("chat_history", safe_conf_uid)
-    full_path = os.path.normpath(os.path.join(base_dir, f"{safe_history_uid}.json"))
+    full_path = os.path.normpath(os.path.join(base_dir, f"{safe_history_uid}{ext}"))
     if not full_path.startswith(base_dir):
         raise ValueError("Invalid path: Path traversal detected")
     return full_path
 
 
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _encode_record(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _decode_record(line: bytes, filepath: str) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except (ValueError, UnicodeDecodeError):
+        # Most likely the torn last line of an interrupted write
+        logger.warning(f"Skipping unreadable record in history file: {filepath}")
+        return None
+
+
+def _sync(f, filepath: str) -> None:
+    policy = _settings["fsync"]
+    if policy == "never":
+        return
+    now = time.monotonic()
+    if policy == "interval":
+        if now - _last_fsync.get(filepath, 0.0) < _settings["fsync_interval"]:
+            return
+        _last_fsync[filepath] = now
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _append_records(filepath: str, lines: List[bytes]) -> int:
+    """Append encoded records to a history file, creating it if needed.
+
+    Returns:
+        The size of the file before the records were appended.
+    """
+    data = b"".join(lines)
+    with open(filepath, "a+b") as f:
+        # Start on a new line if the last write was torn
+        size = f.seek(0, os.SEEK_END)
+        if size > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = b"\n" + data
+        f.write(data)
+        _sync(f, filepath)
+    return size
+
+
+def _iter_records(filepath: str) -> Iterator[dict]:
+    """Read the records of a history file one line at a time."""
+    with open(filepath, "rb") as f:
+        for line in f:
+            record = _decode_record(line, filepath)
+            if record is not None:
+                yield record
+
+
+def _iter_lines_reversed(
+    f, end: int | None = None, block_size: int = 8192
+) -> Iterator[Tuple[int, bytes]]:
+    """Yield (offset, line) of a binary file from the last line to the first.
+
+    Args:
+        f: The file, opened in binary mode.
+        end: Only read the lines before this offset. Defaults to the whole file.
+        block_size: Bytes read at a time.
+    """
+    pos = f.seek(0, os.SEEK_END)
+    if end is not None:
+        pos = max(0, min(end, pos))
+    buffer = b""
+    while True:
+        # A line is complete once the newline before it is in the buffer
+        cut = buffer.rfind(b"\n", 0, len(buffer) - 1)
+        if cut >= 0:
+            yield pos + cut + 1, buffer[cut + 1 :]
+            buffer = buffer[: cut + 1]
+        elif pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            buffer = f.read(step) + buffer
+        else:
+            if buffer:
+                yield 0, buffer
+            return
+
+
+def _iter_records_reversed(
+    filepath: str, end: int | None = None
+) -> Iterator[Tuple[int, dict]]:
+    """Yield (offset, record) of a history file from the last record back."""
+    with open(filepath, "rb") as f:
+        for offset, line in _iter_lines_reversed(f, end):
+            record = _decode_record(line, filepath)
+            if record is not None:
+                yield offset, record
+
+
+def _migrate_legacy_history(legacy_path: str, filepath: str) -> None:
+    """Convert a history in the former JSON-array format to JSON Lines."""
+    with open(legacy_path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    if not records or records[0].get("role") != "metadata":
+        records.insert(0, {"role": "metadata", "timestamp": _now()})
+
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(_encode_record(record) for record in records))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+    os.remove(legacy_path)
+    logger.info(f"Converted history file {legacy_path} to {HISTORY_EXT}")
+
+
+def _get_history_path(conf_uid: str, history_uid: str) -> str:
+    """Get the path of a history file, converting a legacy file first."""
+    filepath = _get_safe_history_path(conf_uid, history_uid)
+    if not os.path.exists(filepath):
+        legacy_path = _get_safe_history_path(conf_uid, history_uid, LEGACY_HISTORY_EXT)
+        if os.path.exists(legacy_path):
+            try:
+                _migrate_legacy_history(legacy_path, filepath)
+            except Exception as e:
+                logger.error(f"Failed to convert history file {legacy_path}: {e}")
+    return filepath
+
+
+def _index_key(conf_uid: str) -> str:
+    return _sanitize_path_component(conf_uid)
+
+
+def _scan_history(filepath: str) -> HistoryIndexEntry:
+    """Build the index entry of a history by reading the whole file."""
+    stat = os.stat(filepath)
+    message_count = 0
+    latest_message = None
+    for record in _iter_records(filepath):
+        if record.get("role") != "metadata":
+            message_count += 1
+            latest_message = record
+    return {
+        "message_count": message_count,
+        "latest_message": make_preview(latest_message),
+        "timestamp": latest_message.get("timestamp") if latest_message else None,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def _index_append(
+    conf_uid: str,
+    history_uid: str,
+    filepath: str,
+    records: List[dict],
+    size_before: int,
+) -> None:
+    """Update the index entry of a history after records were appended."""
+    try:
+        key = _index_key(conf_uid)
+        entry = _history_index.get(key, history_uid)
+        if entry is None and size_before == 0:
+            entry = {
+                "message_count": 0,
+                "latest_message": None,
+                "timestamp": None,
+                "size": 0,
+                "mtime_ns": 0,
+            }
+        if entry is None or entry["size"] != size_before:
+            # The file changed behind the index, it is re-read when listed
+            _history_index.delete(key, [history_uid])
+            return
+
+        messages = [record for record in records if record.get("role") != "metadata"]
+        if messages:
+            entry["message_count"] += len(messages)
+            entry["latest_message"] = make_preview(messages[-1])
+            entry["timestamp"] = messages[-1].get("timestamp")
+        stat = os.stat(filepath)
+        entry["size"] = stat.st_size
+        entry["mtime_ns"] = stat.st_mtime_ns
+        _history_index.upsert(key, {history_uid: entry})
+    except Exception as e:
+        logger.warning(f"Failed to update the history index: {e}")
+
+
+def _update_search_index(method: Callable[..., Any], *args: Any) -> None:
+    """Apply a change to the search index, which must not fail the write."""
+    try:
+        method(*args)
+    except Exception as e:
+        # The history is indexed again on the next search
+        logger.warning(f"Failed to update the history search index: {e}")
+
+
+def _append_history_records(
+    conf_uid: str, history_uid: str, filepath: str, records: List[dict]
+) -> None:
+    lines = [_encode_record(record) for record in records]
+    size_before = _append_records(filepath, lines)
+    _index_append(conf_uid, history_uid, filepath, records, size_before)
+    _update_search_index(
+        _search_index.append,
+        _index_key(conf_uid),
+        history_uid,
+        filepath,
+        records,
+        size_before,
+        [len(line) for line in lines],
+    )
+
+
 def create_new_history(conf_uid: str) -> str:
     """Create a new history file with a unique ID and return the history_uid"""
     if not conf_uid:
@@ -73,15 +429,10 @@ def create_new_history(conf_uid: str) -> str:
 
     # Create history file with empty metadata
     try:
-        filepath = os.path.join(conf_dir, f"{history_uid}.json")
-        initial_data = [
-            {
-                "role": "metadata",
-                "timestamp": datetime.now().isoformat(timespec="seconds"),
-            }
-        ]
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(initial_data, f, ensure_ascii=False, indent=2)
+        filepath = os.path.join(conf_dir, f"{history_uid}{HISTORY_EXT}")
+        _append_history_records(
+            conf_uid, history_uid, filepath, [{"role": "metadata", "timestamp": _now()}]
+        )
     except Exception as e:
         logger.error(f"Failed to create new history file: {e}")
         return ""
@@ -100,6 +451,9 @@ def store_message(
 ):
     """Store a message in a specific history file
 
+    The message is written in the background, in order with the other
+    messages of the history.
+
     Args:
         conf_uid: Configuration unique identifier
         history_uid: History unique identifier
@@ -115,22 +469,11 @@ def store_message(
             logger.warning("Missing history_uid")
         return
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    logger.debug(f"Storing {role} message to {filepath}")
-
-    history_data = []
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                history_data = json.load(f)
-        except Exception:
-            logger.error(f"Failed to load history file: {filepath}")
-            pass
+    logger.debug(f"Queueing {role} message for history {history_uid}")
 
-    now_str = datetime.now().isoformat(timespec="seconds")
     new_item = {
         "role": role,
-        "timestamp": now_str,
+        "timestamp": _now(),
         "content": content,
     }
 
@@ -140,65 +483,60 @@ def store_message(
     if avatar is not None:
         new_item["avatar"] = avatar
 
-    history_data.append(new_item)
+    # Validate now, the caller gets no result from the writer thread
+    _get_safe_history_path(conf_uid, history_uid)
+    _writer.append((conf_uid, history_uid), new_item, _write_messages)
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(history_data, f, ensure_ascii=False, indent=2)
-    logger.debug(f"Successfully stored {role} message")
 
+def _write_messages(key: Tuple[str, str], messages: List[dict]) -> None:
+    """Append the queued messages of one history. Runs on the writer thread."""
+    conf_uid, history_uid = key
+    _ensure_conf_dir(conf_uid)
+    filepath = _get_history_path(conf_uid, history_uid)
+    _append_history_records(conf_uid, history_uid, filepath, messages)
+    logger.debug(f"Stored {len(messages)} message(s) to {filepath}")
 
+
+@_after_queued_writes
 def get_metadata(conf_uid: str, history_uid: str) -> dict:
     """Get metadata from history file"""
     if not conf_uid or not history_uid:
         return {}
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
+    filepath = _get_history_path(conf_uid, history_uid)
     if not os.path.exists(filepath):
         return {}
 
+    metadata = {}
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-
-        if history_data and history_data[0]["role"] == "metadata":
-            return history_data[0]
+        # Later metadata records update the header
+        for record in _iter_records(filepath):
+            if record.get("role") == "metadata":
+                metadata.update(record)
     except Exception as e:
         logger.error(f"Failed to get metadata: {e}")
-    return {}
+        return {}
+    return metadata
 
 
+@_after_queued_writes
 def update_metadate(conf_uid: str, history_uid: str, metadata: dict) -> bool:
     """Set metadata in history file
 
     Updates existing metadata with new fields, preserving existing ones.
-    If no metadata exists, creates new metadata entry.
+    The update is appended as a metadata record and merged by `get_metadata`.
     """
     if not conf_uid or not history_uid:
         return False
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
+    filepath = _get_history_path(conf_uid, history_uid)
     if not os.path.exists(filepath):
         return False
 
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-
-        if history_data and history_data[0]["role"] == "metadata":
-            # Update existing metadata while preserving other fields
-            history_data[0].update(metadata)
-        else:
-            # Create new metadata with timestamp if none exists
-            new_metadata = {
-                "role": "metadata",
-                "timestamp": datetime.now().isoformat(timespec="seconds"),
-            }
-            new_metadata.update(metadata)  # Add new fields
-            history_data.insert(0, new_metadata)
-
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(history_data, f, ensure_ascii=False, indent=2)
-
+        _append_history_records(
+            conf_uid, history_uid, filepath, [{**metadata, "role": "metadata"}]
+        )
         logger.debug(f"Updated metadata for history {history_uid}")
         return True
     except Exception as e:
@@ -206,6 +544,23 @@ def update_metadate(conf_uid: str, history_uid: str, metadata: dict) -> bool:
     return False
 
 
+@_after_queued_writes
+def iter_history(conf_uid: str, history_uid: str) -> Iterator[HistoryMessage]:
+    """Read the messages of a history one at a time, oldest first"""
+    if not conf_uid or not history_uid:
+        return
+
+    filepath = _get_history_path(conf_uid, history_uid)
+    if not os.path.exists(filepath):
+        logger.warning(f"History file not found: {filepath}")
+        return
+
+    for record in _iter_records(filepath):
+        if record.get("role") != "metadata":
+            yield record
+
+
+@_after_queued_writes
 def get_history(conf_uid: str, history_uid: str) -> List[HistoryMessage]:
     """Read chat history for the given conf_uid and history_uid"""
     if not conf_uid or not history_uid:
@@ -215,40 +570,156 @@ def get_history(conf_uid: str, history_uid: str) -> List[HistoryMessage]:
             logger.warning("Missing history_uid")
         return []
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
+    try:
+        return list(iter_history(conf_uid, history_uid))
+    except Exception as e:
+        logger.error(f"Failed to read history {history_uid}: {e}")
+        return []
 
+
+@_after_queued_writes
+def iter_history_reversed(
+    conf_uid: str, history_uid: str, before: int | None = None
+) -> Iterator[Tuple[int, HistoryMessage]]:
+    """Read the messages of a history from the newest back, seeking from the end
+
+    Args:
+        conf_uid: Configuration unique identifier
+        history_uid: History unique identifier
+        before: Only read messages before this cursor (default: all)
+
+    Yields:
+        (cursor, message) pairs, where the cursor marks the message's position
+    """
+    if not conf_uid or not history_uid:
+        return
+
+    filepath = _get_history_path(conf_uid, history_uid)
     if not os.path.exists(filepath):
         logger.warning(f"History file not found: {filepath}")
-        return []
+        return
+
+    for offset, record in _iter_records_reversed(filepath, before):
+        if record.get("role") != "metadata":
+            yield offset, record
+
+
+@_after_queued_writes
+def get_history_page(
+    conf_uid: str, history_uid: str, limit: int, before: int | None = None
+) -> Tuple[List[HistoryMessage], int | None]:
+    """Read a page of the most recent messages of a history
 
+    Args:
+        conf_uid: Configuration unique identifier
+        history_uid: History unique identifier
+        limit: Maximum number of messages in the page
+        before: Cursor returned with the previous page, to read older messages
+
+    Returns:
+        The messages of the page, oldest first, and the cursor of the next
+        (older) page, or None if there are no older messages
+    """
+    messages = []
+    cursor = None
+    oldest = None
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-            # Filter out metadata
-            return [msg for msg in history_data if msg["role"] != "metadata"]
-    except Exception:
-        return []
+        for offset, message in iter_history_reversed(conf_uid, history_uid, before):
+            if len(messages) >= limit:
+                cursor = oldest
+                break
+            messages.append(message)
+            oldest = offset
+    except Exception as e:
+        logger.error(f"Failed to read history {history_uid}: {e}")
+        return [], None
+    messages.reverse()
+    return messages, cursor
 
 
+@_after_queued_writes
 def delete_history(conf_uid: str, history_uid: str) -> bool:
     """Delete a specific history file"""
     if not conf_uid or not history_uid:
         logger.warning("Missing conf_uid or history_uid")
         return False
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    try:
-        if os.path.exists(filepath):
-            os.remove(filepath)
-            logger.debug(f"Successfully deleted history file: {filepath}")
-            return True
-    except Exception as e:
-        logger.error(f"Failed to delete history file: {e}")
-    return False
+    deleted = False
+    for ext in (HISTORY_EXT, LEGACY_HISTORY_EXT):
+        filepath = _get_safe_history_path(conf_uid, history_uid, ext)
+        try:
+            if os.path.exists(filepath):
+                os.remove(filepath)
+                _last_fsync.pop(filepath, None)
+                logger.debug(f"Successfully deleted history file: {filepath}")
+                deleted = True
+        except Exception as e:
+            logger.error(f"Failed to delete history file: {e}")
+    _history_index.delete(_index_key(conf_uid), [history_uid])
+    _update_search_index(_search_index.remove, _index_key(conf_uid), history_uid)
+    return deleted
+
+
+def _stat_histories(conf_uid: str, conf_dir: str) -> Dict[str, os.stat_result]:
+    """Stat the history files of a character, converting legacy files."""
+    stats = {}
+    legacy_uids = []
+    with os.scandir(conf_dir) as entries:
+        for dir_entry in entries:
+            name = dir_entry.name
+            if name.startswith("."):  # The indexes
+                continue
+            if name.endswith(HISTORY_EXT):
+                stats[name[: -len(HISTORY_EXT)]] = dir_entry.stat()
+            elif name.endswith(LEGACY_HISTORY_EXT):
+                legacy_uids.append(name[: -len(LEGACY_HISTORY_EXT)])
+    for history_uid in legacy_uids:
+        if history_uid not in stats:
+            filepath = _get_history_path(conf_uid, history_uid)
+            if os.path.exists(filepath):
+                stats[history_uid] = os.stat(filepath)
+    return stats
+
+
+def _sync_index(conf_uid: str, conf_dir: str) -> Dict[str, HistoryIndexEntry]:
+    """Bring the index of a character up to date with its history files."""
+    stats = _stat_histories(conf_uid, conf_dir)
+    key = _index_key(conf_uid)
+    index = _history_index.load(key)
+    changed = {}
+    for history_uid, stat in stats.items():
+        entry = index.get(history_uid)
+        if (
+            entry is None
+            or entry["size"] != stat.st_size
+            or entry["mtime_ns"] != stat.st_mtime_ns
+        ):
+            try:
+                entry = _scan_history(os.path.join(conf_dir, history_uid + HISTORY_EXT))
+            except Exception as e:
+                logger.error(f"Error reading history {history_uid}: {e}")
+                continue
+            changed[history_uid] = entry
+        index[history_uid] = entry
 
+    removed = [history_uid for history_uid in index if history_uid not in stats]
+    for history_uid in removed:
+        del index[history_uid]
+    if changed:
+        logger.debug(f"Re-indexed {len(changed)} histories of {conf_uid}")
+    _history_index.upsert(key, changed)
+    _history_index.delete(key, removed)
+    _history_index.flush()
+    return index
 
+
+@_after_queued_writes
 def get_history_list(conf_uid: str) -> List[dict]:
-    """Get list of histories with their latest messages"""
+    """Get list of histories with their latest messages
+
+    The latest messages come from the history index, with their content
+    shortened to a preview.
+    """
     if not conf_uid:
         return []
 
@@ -257,46 +728,25 @@ def get_history_list(conf_uid: str) -> List[dict]:
     empty_history_uids = []
 
     try:
-        for filename in os.listdir(conf_dir):
-            if not filename.endswith(".json"):
-                continue
-
-            history_uid = filename[:-5]
-            filepath = os.path.join(conf_dir, filename)
-
-            try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    messages = json.load(f)
-
-                    # Filter out metadata for checking if history is empty
-                    actual_messages = [
-                        msg for msg in messages if msg["role"] != "metadata"
-                    ]
-                    if not actual_messages:
-                        empty_history_uids.append(history_uid)
-                        continue
-
-                    latest_message = actual_messages[-1]
-                    history_info = {
-                        "uid": history_uid,
-                        "latest_message": latest_message,
-                        "timestamp": (
-                            latest_message["timestamp"] if latest_message else None
-                        ),
-                    }
-                    histories.append(history_info)
-            except Exception as e:
-                logger.error(f"Error reading history file {filename}: {e}")
+        index = _sync_index(conf_uid, conf_dir)
+        for history_uid, entry in index.items():
+            if not entry["message_count"]:
+                empty_history_uids.append(history_uid)
                 continue
+            histories.append(
+                {
+                    "uid": history_uid,
+                    "latest_message": entry["latest_message"],
+                    "timestamp": entry["timestamp"],
+                    "message_count": entry["message_count"],
+                }
+            )
 
         # Clean up empty histories if there are other non-empty ones
-        if len(empty_history_uids) > 0 and len(os.listdir(conf_dir)) > 1:
+        if len(empty_history_uids) > 0 and len(index) > 1:
             for uid in empty_history_uids:
-                try:
-                    os.remove(os.path.join(conf_dir, f"{uid}.json"))
+                if delete_history(conf_uid, uid):
                     logger.info(f"Removed empty history file: {uid}")
-                except Exception as e:
-                    logger.error(f"Failed to remove empty history file {uid}: {e}")
 
         histories.sort(
             key=lambda x: x["timestamp"] if x["timestamp"] else "", reverse=True
@@ -308,6 +758,56 @@ def get_history_list(conf_uid: str) -> List[dict]:
         return []
 
 
+@_after_queued_writes
+def search_history(
+    conf_uid: str,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    history_uid: str | None = None,
+) -> Tuple[List[SearchHit], bool]:
+    """Search the messages of a character for all the words of a query
+
+    Args:
+        conf_uid: Configuration unique identifier
+        query: Words to find. Chinese, Japanese and Korean need no spaces.
+        limit: Maximum number of hits to return
+        offset: Number of best hits to skip, for the following pages
+        history_uid: Only search this history (default all)
+
+    Returns:
+        The hits, most relevant first, and whether more hits follow.
+
+    Raises:
+        ValueError: If conf_uid cannot be used as a directory name.
+    """
+    if not conf_uid or not query.strip():
+        return [], False
+
+    key = _index_key(conf_uid)
+    conf_dir = os.path.join("chat_history", key)
+    # Nothing to search, and no index to create, for a character without history
+    if not os.path.isdir(conf_dir):
+        return [], False
+    try:
+        _search_index.sync(key, _stat_histories(conf_uid, conf_dir))
+        return _search_index.search(key, query, limit, offset, history_uid)
+    except Exception as e:
+        logger.error(f"Error searching histories: {e}")
+        return [], False
+
+
+@_after_queued_writes
+def rebuild_history_index(conf_uid: str) -> None:
+    """Drop the index entries of a character and re-read all its histories"""
+    if not conf_uid:
+        return
+    _history_index.clear(_index_key(conf_uid))
+    _sync_index(conf_uid, _ensure_conf_dir(conf_uid))
+    logger.info(f"Rebuilt the history index of {conf_uid}")
+
+
+@_after_queued_writes
 def modify_latest_message(
     conf_uid: str,
     history_uid: str,
@@ -319,29 +819,40 @@ def modify_latest_message(
         logger.warning("Missing conf_uid or history_uid")
         return False
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
+    filepath = _get_history_path(conf_uid, history_uid)
     if not os.path.exists(filepath):
         logger.warning(f"History file not found: {filepath}")
         return False
 
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-
-        if not history_data:
+        # Find the latest message and the metadata records written after it
+        trailing = []
+        for offset, record in _iter_records_reversed(filepath):
+            if record.get("role") != "metadata":
+                break
+            trailing.insert(0, record)
+        else:
             logger.warning("History is empty")
             return False
 
-        latest_message = history_data[-1]
-        if latest_message["role"] != role:
+        if record["role"] != role:
             logger.warning(
-                f"Latest message role ({latest_message['role']}) doesn't match requested role ({role})"
+                f"Latest message role ({record['role']}) doesn't match requested role ({role})"
             )
             return False
 
-        latest_message["content"] = new_content
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(history_data, f, ensure_ascii=False, indent=2)
+        # Rewrite the file from the latest message on
+        record["content"] = new_content
+        with open(filepath, "r+b") as f:
+            f.seek(offset)
+            f.truncate()
+            f.write(b"".join(map(_encode_record, [record, *trailing])))
+            _sync(f, filepath)
+        # Re-read when listed, the file no longer only grew
+        _history_index.delete(_index_key(conf_uid), [history_uid])
+        _update_search_index(
+            _search_index.reindex, _index_key(conf_uid), history_uid, filepath, offset
+        )
 
         logger.debug(f"Successfully modified latest {role} message")
         return True
@@ -351,6 +862,7 @@ def modify_latest_message(
         return False
 
 
+@_after_queued_writes
 def rename_history_file(
     conf_uid: str, old_history_uid: str, new_history_uid: str
 ) -> bool:
@@ -359,12 +871,22 @@ def rename_history_file(
         logger.warning("Missing required parameters for rename")
         return False
 
-    old_filepath = _get_safe_history_path(conf_uid, old_history_uid)
+    old_filepath = _get_history_path(conf_uid, old_history_uid)
     new_filepath = _get_safe_history_path(conf_uid, new_history_uid)
 
     try:
         if os.path.exists(old_filepath):
             os.rename(old_filepath, new_filepath)
+            _last_fsync.pop(old_filepath, None)
+            _history_index.rename(
+                _index_key(conf_uid), old_history_uid, new_history_uid
+            )
+            _update_search_index(
+                _search_index.rename,
+                _index_key(conf_uid),
+                old_history_uid,
+                new_history_uid,
+            )
             logger.info(
                 f"Renamed history file from {old_history_uid} to {new_history_uid}"
             )
@@ -0,0 +1,402 @@
+"""Full-text search of the chat histories of each character.
+
+Each character has an inverted index in chat_history/<conf_uid>/
+.search.sqlite3, an SQLite FTS5 table with one row per message.
+`chat_history_manager` adds the messages as it stores them, so searching
+never reads the histories. Only the messages of the returned page are read,
+by seeking to their offsets. Histories whose file changed behind the index,
+e.g. after a crash or an edit outside the server, are indexed again before
+the next search.
+
+FTS5 splits text on spaces and punctuation, which leaves a sentence of
+Chinese or Japanese as one token. Text is therefore tokenized here before it
+is indexed: runs of CJK characters become overlapping bigrams, everything
+else lowercase words. Queries are tokenized the same way, and a CJK run of
+the query becomes a phrase of its bigrams, so that "你好吗" only matches
+the three characters in a row.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TypedDict
+
+from loguru import logger
+
+HISTORY_ROOT = "chat_history"
+SEARCH_INDEX_FILENAME = ".search.sqlite3"
+
+# Characters of a message returned around the first match
+SNIPPET_LENGTH = 160
+
+_CJK = (
+    "\u1100-\u11ff"  # Hangul Jamo
+    "\u3040-\u30ff"  # Hiragana, Katakana
+    "\u3100-\u312f"  # Bopomofo
+    "\u3400-\u4dbf"  # CJK Extension A
+    "\u4e00-\u9fff"  # CJK Unified Ideographs
+    "\uac00-\ud7af"  # Hangul Syllables
+    "\uf900-\ufaff"  # CJK Compatibility Ideographs
+    "\U00020000-\U0002fa1f"  # CJK Extensions B-F and supplement
+)
+_TOKEN_RE = re.compile(rf"([{_CJK}]+)|([^\W_{_CJK}]+)")
+
+
+class SearchHit(TypedDict):
+    history_uid: str
+    role: str
+    timestamp: Optional[str]
+    name: Optional[str]
+    snippet: str
+    # Pass as `before` to get_history_page to read the history up to the hit
+    cursor: int
+    score: float
+
+
+def _cjk_bigrams(run: str) -> List[str]:
+    if len(run) == 1:
+        return [run]
+    return [run[i : i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into the tokens that are indexed.
+
+    CJK runs give their bigrams followed by their last character, so that a
+    single character can be found by prefix: "你好吗" gives "你好", "好吗"
+    and "吗".
+    """
+    tokens = []
+    for cjk, word in _TOKEN_RE.findall(text):
+        if cjk:
+            tokens.extend(_cjk_bigrams(cjk))
+            if len(cjk) > 1:
+                tokens.append(cjk[-1])
+        else:
+            tokens.append(word.casefold())
+    return tokens
+
+
+def build_query(query: str) -> str | None:
+    """Turn user input into an FTS5 query matching all of its terms."""
+    terms = []
+    for cjk, word in _TOKEN_RE.findall(query):
+        if cjk and len(cjk) == 1:
+            terms.append(f'"{cjk}"*')
+        elif cjk:
+            terms.append('"' + " ".join(_cjk_bigrams(cjk)) + '"')
+        else:
+            terms.append(f'"{word.casefold()}"')
+    return " AND ".join(terms) if terms else None
+
+
+def make_snippet(content: str, query: str, length: int = SNIPPET_LENGTH) -> str:
+    """Cut the part of a message around the first term of the query found."""
+    if len(content) <= length:
+        return content
+    folded = content.casefold()
+    start = 0
+    for cjk, word in _TOKEN_RE.findall(query):
+        found = folded.find(cjk or word.casefold())
+        if found >= 0:
+            start = max(0, found - length // 4)
+            break
+    end = min(len(content), start + length)
+    start = max(0, end - length)
+    return (
+        ("…" if start > 0 else "")
+        + content[start:end]
+        + ("…" if end < len(content) else "")
+    )
+
+
+def _iter_record_spans(f, start: int = 0) -> Iterator[Tuple[int, int, dict]]:
+    """Yield (offset, end, record) of the lines of a history file from start."""
+    f.seek(start)
+    offset = start
+    for line in f:
+        end = offset + len(line)
+        try:
+            yield offset, end, json.loads(line)
+        except (ValueError, UnicodeDecodeError):
+            pass  # A torn line, skipped like the history readers do
+        offset = end
+
+
+class _CharacterIndex:
+    """The search index of one character."""
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    history_uid TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY,
+                    history_uid TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    end INTEGER NOT NULL,
+                    role TEXT,
+                    timestamp TEXT
+                );
+                CREATE INDEX IF NOT EXISTS messages_by_history
+                    ON messages (history_uid, offset);
+                CREATE VIRTUAL TABLE IF NOT EXISTS terms USING fts5(tokens);
+                """
+            )
+
+    def files(self) -> Dict[str, Tuple[int, int]]:
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM files").fetchall()
+        return {history_uid: (size, mtime_ns) for history_uid, size, mtime_ns in rows}
+
+    def indexed_size(self, history_uid: str) -> int | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size FROM files WHERE history_uid = ?", (history_uid,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _delete_from(self, history_uid: str, offset: int = 0) -> None:
+        # Runs inside the transaction of the caller
+        self._db.execute(
+            "DELETE FROM terms WHERE rowid IN (SELECT id FROM messages"
+            " WHERE history_uid = ? AND offset >= ?)",
+            (history_uid, offset),
+        )
+        self._db.execute(
+            "DELETE FROM messages WHERE history_uid = ? AND offset >= ?",
+            (history_uid, offset),
+        )
+
+    def add(
+        self,
+        history_uid: str,
+        messages: Iterable[Tuple[int, int, dict]],
+        stat: os.stat_result,
+        replace_from: int | None = None,
+    ) -> int:
+        """Index (offset, end, record) of a history and record its file size.
+
+        Args:
+            replace_from: Drop the messages from this offset on first.
+
+        Returns:
+            The number of messages indexed.
+        """
+        count = 0
+        with self._lock, self._db:
+            if replace_from is not None:
+                self._delete_from(history_uid, replace_from)
+            for offset, end, record in messages:
+                if not isinstance(record, dict) or record.get("role") == "metadata":
+                    continue
+                content = record.get("content")
+                if not isinstance(content, str):
+                    continue
+                cursor = self._db.execute(
+                    "INSERT INTO messages (history_uid, offset, end, role, timestamp)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (
+                        history_uid,
+                        offset,
+                        end,
+                        record.get("role"),
+                        record.get("timestamp"),
+                    ),
+                )
+                tokens = tokenize(content)
+                name = record.get("name")
+                if isinstance(name, str):
+                    tokens.extend(tokenize(name))
+                self._db.execute(
+                    "INSERT INTO terms (rowid, tokens) VALUES (?, ?)",
+                    (cursor.lastrowid, " ".join(tokens)),
+                )
+                count += 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                (history_uid, stat.st_size, stat.st_mtime_ns),
+            )
+        return count
+
+    def remove(self, history_uids: Iterable[str]) -> None:
+        with self._lock, self._db:
+            for history_uid in history_uids:
+                self._delete_from(history_uid)
+                self._db.execute(
+                    "DELETE FROM files WHERE history_uid = ?", (history_uid,)
+                )
+
+    def rename(self, old_history_uid: str, new_history_uid: str) -> None:
+        with self._lock, self._db:
+            for table in ("files", "messages"):
+                self._db.execute(
+                    f"UPDATE {table} SET history_uid = ? WHERE history_uid = ?",
+                    (new_history_uid, old_history_uid),
+                )
+
+    def search(
+        self, match: str, limit: int, offset: int, history_uid: str | None
+    ) -> List[tuple]:
+        sql = (
+            "SELECT m.history_uid, m.offset, m.end, m.role, m.timestamp,"
+            " bm25(terms) AS score FROM terms JOIN messages m ON m.id = terms.rowid"
+            " WHERE terms MATCH ?"
+        )
+        params: list = [match]
+        if history_uid is not None:
+            sql += " AND m.history_uid = ?"
+            params.append(history_uid)
+        # Newer messages first among equally relevant ones
+        sql += " ORDER BY score, m.id DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class HistorySearchIndex:
+    """The search indexes of all characters, opened on first use."""
+
+    def __init__(self, root: str = HISTORY_ROOT, ext: str = ".jsonl") -> None:
+        self.root = root
+        self.ext = ext
+        self._indexes: Dict[str, _CharacterIndex] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, conf_key: str) -> _CharacterIndex:
+        with self._lock:
+            index = self._indexes.get(conf_key)
+            if index is None:
+                conf_dir = os.path.join(self.root, conf_key)
+                os.makedirs(conf_dir, exist_ok=True)
+                index = _CharacterIndex(os.path.join(conf_dir, SEARCH_INDEX_FILENAME))
+                self._indexes[conf_key] = index
+            return index
+
+    def append(
+        self,
+        conf_key: str,
+        history_uid: str,
+        filepath: str,
+        records: List[dict],
+        size_before: int,
+        record_sizes: List[int],
+    ) -> None:
+        """Index records just appended to a history file.
+
+        The history is left for the next sync if the index did not cover
+        the file exactly up to the appended records.
+        """
+        index = self._get(conf_key)
+        if (index.indexed_size(history_uid) or 0) != size_before:
+            return
+        messages = []
+        offset = size_before
+        for record, size in zip(records, record_sizes):
+            messages.append((offset, offset + size, record))
+            offset += size
+        index.add(history_uid, messages, os.stat(filepath))
+
+    def reindex(
+        self, conf_key: str, history_uid: str, filepath: str, start: int = 0
+    ) -> int:
+        """Index a history file again from an offset on."""
+        index = self._get(conf_key)
+        with open(filepath, "rb") as f:
+            stat = os.fstat(f.fileno())
+            return index.add(
+                history_uid, _iter_record_spans(f, start), stat, replace_from=start
+            )
+
+    def sync(self, conf_key: str, stats: Dict[str, os.stat_result]) -> None:
+        """Bring the index of a character up to date with its history files.
+
+        Args:
+            stats: The current history files by history_uid.
+        """
+        index = self._get(conf_key)
+        indexed = index.files()
+        index.remove(uid for uid in indexed if uid not in stats)
+        for history_uid, stat in stats.items():
+            if indexed.get(history_uid) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            filepath = os.path.join(self.root, conf_key, history_uid + self.ext)
+            try:
+                count = self.reindex(conf_key, history_uid, filepath)
+                logger.debug(f"Indexed {count} messages of history {history_uid}")
+            except Exception as e:
+                logger.error(f"Failed to index history {history_uid}: {e}")
+
+    def remove(self, conf_key: str, history_uid: str) -> None:
+        self._get(conf_key).remove([history_uid])
+
+    def rename(self, conf_key: str, old_history_uid: str, new_history_uid: str):
+        self._get(conf_key).rename(old_history_uid, new_history_uid)
+
+    def search(
+        self,
+        conf_key: str,
+        query: str,
+        limit: int,
+        offset: int = 0,
+        history_uid: str | None = None,
+    ) -> Tuple[List[SearchHit], bool]:
+        """Find the messages matching every term of a query, best first.
+
+        Returns:
+            The hits of the page and whether more hits follow.
+        """
+        match = build_query(query)
+        if match is None:
+            return [], False
+        rows = self._get(conf_key).search(match, limit + 1, offset, history_uid)
+        has_more = len(rows) > limit
+
+        hits: List[SearchHit] = []
+        stale = set()
+        for uid, start, end, role, timestamp, score in rows[:limit]:
+            filepath = os.path.join(self.root, conf_key, uid + self.ext)
+            try:
+                with open(filepath, "rb") as f:
+                    f.seek(start)
+                    record = json.loads(f.read(end - start))
+                content = record["content"]
+            except Exception:
+                # Picked up by the next sync
+                stale.add(uid)
+                continue
+            hits.append(
+                {
+                    "history_uid": uid,
+                    "role": role,
+                    "timestamp": timestamp,
+                    "name": record.get("name"),
+                    "snippet": make_snippet(content, query),
+                    "cursor": end,
+                    "score": -score,
+                }
+            )
+        if stale:
+            self._get(conf_key).remove(stale)
+        return hits, has_more
+
+    def close(self) -> None:
+        with self._lock:
+            for index in self._indexes.values():
+                index.close()
+            self._indexes.clear()
@@ -0,0 +1,158 @@
+"""
+Background thread for chat history disk I/O.
+
+Conversations store a message after every turn. Doing that on the event loop
+makes every session's audio and websocket traffic wait on the disk, so
+history I/O runs on one dedicated thread instead.
+
+Appends are fire-and-forget. When the thread picks up work, consecutive
+appends to the same history are written with a single open and write.
+Everything else (reads, deletes, renames) is submitted as a call that runs
+after the appends queued before it. One thread keeps all of it in
+submission order, so a read always sees the messages stored before it.
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Tuple, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+BatchWriter = Callable[[Hashable, List[Any]], None]
+
+_STOP = object()
+
+
+class HistoryWriter:
+    """Runs history I/O on a dedicated thread, in submission order."""
+
+    def __init__(self, name: str = "chat-history-writer") -> None:
+        self.name = name
+        self._jobs: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+        self.appends = 0
+        self.batches = 0
+        self.calls = 0
+        self.errors = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._thread.start()
+
+    def on_writer_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def append(self, key: Hashable, record: Any, write_batch: BatchWriter) -> None:
+        """Queue a record to be appended, without waiting.
+
+        Args:
+            key: Identifies the file. Records of one key keep their order.
+            record: The record to append.
+            write_batch: Writes a list of records of one key.
+        """
+        self._ensure_started()
+        self._jobs.put(("append", key, record, write_batch))
+
+    def submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> Future:
+        """Run a function on the writer thread after the queued appends."""
+        future: Future = Future()
+        if self.on_writer_thread():
+            # Already in order, queueing would wait for ourselves
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        self._ensure_started()
+        self._jobs.put(("call", future, func, args, kwargs))
+        return future
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Await a function run on the writer thread after the queued appends."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until everything queued so far is written."""
+        if self.on_writer_thread() or self._thread is None:
+            return
+        self.submit(lambda: None).result(timeout)
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """Write everything queued and stop the thread."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._jobs.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning("Chat history writer did not finish in time.")
+
+    def _write_batches(self, batches: Dict[Hashable, Tuple[BatchWriter, List]]):
+        for key, (write_batch, records) in batches.items():
+            try:
+                write_batch(key, records)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Failed to write {len(records)} history records: {e}")
+            self.batches += 1
+        batches.clear()
+
+    def _run(self) -> None:
+        stopping = False
+        while True:
+            # Once stopping, only what is already queued is left to do
+            jobs = [] if stopping else [self._jobs.get()]
+            # Take everything that piled up while the disk was busy
+            while True:
+                try:
+                    jobs.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+            if not jobs:
+                return
+
+            batches: Dict[Hashable, Tuple[BatchWriter, List]] = {}
+            for job in jobs:
+                if job is _STOP:
+                    # Jobs queued behind the stop still run, their callers
+                    # are waiting on them
+                    stopping = True
+                    continue
+                if job[0] == "append":
+                    _, key, record, write_batch = job
+                    batches.setdefault(key, (write_batch, []))[1].append(record)
+                    self.appends += 1
+                    continue
+
+                # A call sees every append queued before it
+                self._write_batches(batches)
+                _, future, func, args, kwargs = job
+                self.calls += 1
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            self._write_batches(batches)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._jobs.qsize(),
+            "appends": self.appends,
+            "batches": self.batches,
+            "calls": self.calls,
+            "errors": self.errors,
+        }
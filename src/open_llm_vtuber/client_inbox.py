@@ -0,0 +1,238 @@
+"""
+Inbound message lanes of the websocket clients.
+
+The receive loop of a client used to handle every message before reading the
+next one, so while VAD ran on an audio frame or a history page was loaded,
+heartbeats, interrupts and further audio frames waited unread. The receive
+loop now only decodes a message and puts it in a `ClientInbox`, which sorts
+the messages into three lanes, each handled in order by its own task:
+
+- "control": interrupts, heartbeats and playback notifications. Handled as
+  soon as they arrive, whatever the other lanes are doing.
+- "audio": microphone frames and the "mic-audio-end" that follows them. When
+  the worker falls behind, consecutive "mic-audio-data" frames are merged into
+  one, and past `max_audio_frames` the oldest "raw-audio-data" frames are
+  dropped: VAD on audio that old would only detect speech too late.
+- "general": everything else (history, configs, groups, text input). Past
+  `max_pending_messages`, new messages are rejected.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict
+
+from loguru import logger
+
+# Handled ahead of everything else the client sent
+CONTROL_MESSAGE_TYPES = frozenset(
+    {
+        "interrupt-signal",
+        "heartbeat",
+        "audio-play-start",
+        "frontend-playback-complete",
+    }
+)
+# "mic-audio-end" is queued behind the frames it ends
+AUDIO_MESSAGE_TYPES = frozenset({"mic-audio-data", "raw-audio-data", "mic-audio-end"})
+
+# Used until `configure_receive_queues` is called with the system config.
+DEFAULT_RECEIVE_QUEUE_SETTINGS: Dict[str, Any] = {
+    "max_audio_frames": 128,
+    "max_pending_messages": 64,
+}
+
+_settings: Dict[str, Any] = dict(DEFAULT_RECEIVE_QUEUE_SETTINGS)
+_inboxes: Dict[str, "ClientInbox"] = {}
+
+MessageHandler = Callable[[dict], Awaitable[None]]
+
+
+def configure_receive_queues(receive_queue_settings: Dict[str, Any]) -> None:
+    """Set the limits of new client inboxes.
+
+    Args:
+        receive_queue_settings: Keys of `DEFAULT_RECEIVE_QUEUE_SETTINGS` to
+            override.
+    """
+    _settings.update(
+        {
+            k: v
+            for k, v in receive_queue_settings.items()
+            if k in DEFAULT_RECEIVE_QUEUE_SETTINGS
+        }
+    )
+    logger.info(
+        f"Client receive queues: max_audio_frames={_settings['max_audio_frames']}, "
+        f"max_pending_messages={_settings['max_pending_messages']}"
+    )
+
+
+def get_receive_queue_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the lane depths and counters of every connected client."""
+    return {client_uid: inbox.stats() for client_uid, inbox in _inboxes.items()}
+
+
+def message_lane(msg_type: str | None) -> str:
+    """Return the lane ("control", "audio" or "general") of a message type."""
+    if msg_type in CONTROL_MESSAGE_TYPES:
+        return "control"
+    if msg_type in AUDIO_MESSAGE_TYPES:
+        return "audio"
+    return "general"
+
+
+class _Lane:
+    """Messages of one lane and the task handling them in order."""
+
+    def __init__(self, name: str, client_uid: str, handle: MessageHandler) -> None:
+        self.name = name
+        self.client_uid = client_uid
+        self.queue: Deque[dict] = deque()
+        self.handled = 0
+        self.peak = 0
+        self._handle = handle
+        self._not_empty = asyncio.Event()
+        self._task = asyncio.create_task(
+            self._run(), name=f"ws-{name}-lane-{client_uid}"
+        )
+
+    def append(self, data: dict) -> None:
+        self.queue.append(data)
+        self.peak = max(self.peak, len(self.queue))
+        self._not_empty.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._not_empty.wait()
+            # Taken off the queue first, so queued messages can be merged or
+            # dropped without touching the one being handled
+            data = self.queue.popleft()
+            if not self.queue:
+                self._not_empty.clear()
+            try:
+                await self._handle(data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    f"Error handling '{data.get('type')}' of client "
+                    f"{self.client_uid}: {e}"
+                )
+            self.handled += 1
+
+    async def aclose(self) -> None:
+        self.queue.clear()
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class ClientInbox:
+    """Per-client lanes between the receive loop and the message handlers."""
+
+    def __init__(
+        self,
+        client_uid: str,
+        handle: MessageHandler,
+        max_audio_frames: int | None = None,
+        max_pending_messages: int | None = None,
+    ) -> None:
+        """
+        Args:
+            client_uid: The client the messages come from.
+            handle: Coroutine function handling one decoded message.
+            max_audio_frames: Audio frames queued before the oldest raw
+                frames are dropped.
+            max_pending_messages: General messages queued before new ones are
+                rejected.
+        """
+        self.client_uid = client_uid
+        self.max_audio_frames = max_audio_frames or _settings["max_audio_frames"]
+        self.max_pending_messages = (
+            max_pending_messages or _settings["max_pending_messages"]
+        )
+        self._lanes = {
+            name: _Lane(name, client_uid, handle)
+            for name in ("control", "audio", "general")
+        }
+        _inboxes[client_uid] = self
+
+        self.audio_coalesced = 0
+        self.audio_dropped = 0
+        self.rejected = 0
+
+    def put(self, data: dict) -> bool:
+        """Queue a message in its lane without waiting for it to be handled.
+
+        Returns:
+            False if the message was rejected because the client has too many
+            general messages pending.
+        """
+        msg_type = data.get("type")
+        lane_name = message_lane(msg_type)
+        lane = self._lanes[lane_name]
+
+        if lane_name == "audio":
+            self._put_audio(lane, data)
+            return True
+        if lane_name == "general" and len(lane.queue) >= self.max_pending_messages:
+            self.rejected += 1
+            logger.warning(
+                f"Client {self.client_uid} has {len(lane.queue)} messages pending, "
+                f"rejecting '{msg_type}'."
+            )
+            return False
+        lane.append(data)
+        return True
+
+    def _put_audio(self, lane: _Lane, data: dict) -> None:
+        queue = lane.queue
+        if (
+            data.get("type") == "mic-audio-data"
+            and queue
+            and queue[-1].get("type") == "mic-audio-data"
+        ):
+            # The handler only appends the samples to the client's buffer
+            previous = queue[-1]
+            previous["audio"] = previous.get("audio") or []
+            previous["audio"].extend(data.get("audio") or [])
+            self.audio_coalesced += 1
+            return
+
+        lane.append(data)
+        if len(queue) <= self.max_audio_frames:
+            return
+        dropped = 0
+        for frame in list(queue):
+            if len(queue) <= self.max_audio_frames:
+                break
+            if frame.get("type") == "raw-audio-data":
+                queue.remove(frame)
+                dropped += 1
+        if dropped:
+            if not self.audio_dropped:
+                logger.warning(
+                    f"Client {self.client_uid} sends audio faster than it is "
+                    f"processed, dropping the oldest frames."
+                )
+            self.audio_dropped += dropped
+
+    async def aclose(self) -> None:
+        """Stop the lanes, dropping the messages not handled yet."""
+        if _inboxes.get(self.client_uid) is self:
+            del _inboxes[self.client_uid]
+            logger.debug(f"Receive lanes of client {self.client_uid}: {self.stats()}")
+        await asyncio.gather(*(lane.aclose() for lane in self._lanes.values()))
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {}
+        for name, lane in self._lanes.items():
+            stats[f"{name}_queued"] = len(lane.queue)
+            stats[f"{name}_peak"] = lane.peak
+            stats[f"{name}_handled"] = lane.handled
+        stats.update(
+            audio_coalesced=self.audio_coalesced,
+            audio_dropped=self.audio_dropped,
+            rejected=self.rejected,
+        )
+        return stats
@@ -7,7 +7,12 @@ and utility functions for loading/saving configurations.
 
 # Import main configuration classes
 from .main import Config
-from .system import SystemConfig
+from .system import (
+    SystemConfig,
+    ExecutorPoolConfig,
+    ExecutorPoolsConfig,
+    LLMHttpClientConfig,
+)
 from .character import CharacterConfig
 from .live import LiveConfig, BiliBiliLiveConfig
 from .stateless_llm import (
@@ -68,6 +73,9 @@ __all__ = [
     # Main configuration classes
     "Config",
     "SystemConfig",
+    "ExecutorPoolConfig",
+    "ExecutorPoolsConfig",
+    "LLMHttpClientConfig",
     "CharacterConfig",
     "LiveConfig",
     "BiliBiliLiveConfig",
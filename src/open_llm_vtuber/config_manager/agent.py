@@ -27,12 +27,19 @@ class BasicMemoryAgentConfig(I18nMixin, BaseModel):
         "deepseek_llm",
         "groq_llm",
         "mistral_llm",
+        "router_llm",
     ] = Field(..., alias="llm_provider")
 
     faster_first_response: Optional[bool] = Field(True, alias="faster_first_response")
     segment_method: Literal["regex", "pysbd"] = Field("pysbd", alias="segment_method")
     use_mcpp: Optional[bool] = Field(False, alias="use_mcpp")
     mcp_enabled_servers: Optional[List[str]] = Field([], alias="mcp_enabled_servers")
+    mcp_max_concurrent_tools: int = Field(4, alias="mcp_max_concurrent_tools")
+    mcp_tool_timeout: Optional[float] = Field(60.0, alias="mcp_tool_timeout")
+    context_max_tokens: Optional[int] = Field(None, alias="context_max_tokens")
+    context_trim_ratio: float = Field(0.6, alias="context_trim_ratio")
+    context_keep_recent: int = Field(6, alias="context_keep_recent")
+    context_summarize: bool = Field(False, alias="context_summarize")
 
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "llm_provider": Description(
@@ -55,6 +62,30 @@ class BasicMemoryAgentConfig(I18nMixin, BaseModel):
             en="List of MCP servers to enable for the agent",
             zh="为智能体启用 MCP 服务器列表",
         ),
+        "mcp_max_concurrent_tools": Description(
+            en="Maximum number of tool calls from one LLM turn that run at the same time",
+            zh="同一轮 LLM 回复中可同时执行的最大工具调用数",
+        ),
+        "mcp_tool_timeout": Description(
+            en="Seconds before a running tool call is abandoned with an error (null for no limit)",
+            zh="工具调用超过该秒数后放弃并返回错误（null 表示不限制）",
+        ),
+        "context_max_tokens": Description(
+            en="Approximate token budget for the system prompt and chat memory (null for unlimited)",
+            zh="系统提示词与对话记忆的大致 token 预算（null 表示不限制）",
+        ),
+        "context_trim_ratio": Description(
+            en="When over budget, drop old turns until the context fits in this fraction of the budget",
+            zh="超出预算时，删除较早的对话，直到上下文小于预算的该比例",
+        ),
+        "context_keep_recent": Description(
+            en="Number of most recent messages that are never dropped",
+            zh="始终保留的最近消息数",
+        ),
+        "context_summarize": Description(
+            en="Summarize dropped turns in the background and keep the summary in the system prompt",
+            zh="在后台总结被删除的对话，并将总结保留在系统提示词中",
+        ),
     }
 
 
@@ -1,6 +1,6 @@
 # config_manager/llm.py
 from typing import ClassVar, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from .i18n import I18nMixin, Description
 
 
@@ -64,6 +64,7 @@ class OpenAICompatibleConfig(StatelessLLMBaseConfig):
     organization_id: str | None = Field(None, alias="organization_id")
     project_id: str | None = Field(None, alias="project_id")
     temperature: float = Field(1.0, alias="temperature")
+    prompt_caching: bool = Field(False, alias="prompt_caching")
 
     _OPENAI_COMPATIBLE_DESCRIPTIONS: ClassVar[dict[str, Description]] = {
         "base_url": Description(en="Base URL for the API endpoint", zh="API的URL端点"),
@@ -79,6 +80,10 @@ class OpenAICompatibleConfig(StatelessLLMBaseConfig):
             en="What sampling temperature to use, between 0 and 2.",
             zh="使用的采样温度，介于 0 和 2 之间。",
         ),
+        "prompt_caching": Description(
+            en="Keep the prompt prefix stable for provider prompt caching and record cache hits (the API must support stream usage reporting)",
+            zh="保持提示词前缀稳定以利用服务商的提示词缓存，并统计缓存命中（API 需支持流式 usage 统计）",
+        ),
     }
 
     DESCRIPTIONS: ClassVar[dict[str, Description]] = {
@@ -192,6 +197,7 @@ class ClaudeConfig(StatelessLLMBaseConfig):
     interrupt_method: Literal["system", "user"] = Field(
         "user", alias="interrupt_method"
     )
+    prompt_caching: bool = Field(False, alias="prompt_caching")
 
     _CLAUDE_DESCRIPTIONS: ClassVar[dict[str, Description]] = {
         "base_url": Description(
@@ -201,6 +207,10 @@ class ClaudeConfig(StatelessLLMBaseConfig):
         "model": Description(
             en="Name of the Claude model to use", zh="要使用的 Claude 模型名称"
         ),
+        "prompt_caching": Description(
+            en="Add cache_control breakpoints so the tools, system prompt and history are read from Claude's prompt cache",
+            zh="添加 cache_control 断点，使工具、系统提示词和历史记录从 Claude 的提示词缓存中读取",
+        ),
     }
 
     DESCRIPTIONS: ClassVar[dict[str, Description]] = {
@@ -216,11 +226,21 @@ class LlamaCppConfig(StatelessLLMBaseConfig):
     interrupt_method: Literal["system", "user"] = Field(
         "system", alias="interrupt_method"
     )
+    prompt_caching: bool = Field(False, alias="prompt_caching")
+    prompt_cache_capacity_mb: int = Field(2048, alias="prompt_cache_capacity_mb")
 
     _LLAMA_DESCRIPTIONS: ClassVar[dict[str, Description]] = {
         "model_path": Description(
             en="Path to the GGUF model file", zh="GGUF 模型文件路径"
         ),
+        "prompt_caching": Description(
+            en="Keep the KV state of recent prompts in RAM to skip prefilling shared prefixes",
+            zh="在内存中保存最近提示词的 KV 状态，跳过共享前缀的预填充",
+        ),
+        "prompt_cache_capacity_mb": Description(
+            en="Size of the llama.cpp prompt cache in MiB",
+            zh="llama.cpp 提示词缓存的大小（MiB）",
+        ),
     }
 
     DESCRIPTIONS: ClassVar[dict[str, Description]] = {
@@ -229,6 +249,70 @@ class LlamaCppConfig(StatelessLLMBaseConfig):
     }
 
 
+class RouterLLMConfig(StatelessLLMBaseConfig):
+    """Configuration for the LLM router.
+
+    Backends are named by their key in llm_configs, which holds one config per
+    provider, so a router cannot list two endpoints of the same provider. A
+    second OpenAI-compatible endpoint can use another OpenAI-compatible config,
+    e.g. openai_compatible_llm or lmstudio_llm.
+    """
+
+    backends: list[str] = Field(..., alias="backends")
+    hedge_delay: float | None = Field(None, alias="hedge_delay")
+    stats_window: int = Field(20, alias="stats_window")
+    stats_max_age: float = Field(300.0, alias="stats_max_age")
+    failure_threshold: int = Field(3, alias="failure_threshold")
+    cooldown: float = Field(30.0, alias="cooldown")
+
+    _ROUTER_DESCRIPTIONS: ClassVar[dict[str, Description]] = {
+        "backends": Description(
+            en="Names of the LLM configs in llm_configs to route between, in order of preference. Each config can be listed once, so two endpoints of the same provider need two different configs (e.g. openai_compatible_llm and lmstudio_llm for two OpenAI-compatible servers)",
+            zh="要在其间路由的 llm_configs 中的 LLM 配置名称，按优先顺序排列。每个配置只能列出一次，因此同一提供商的两个端点需要使用两个不同的配置（例如用 openai_compatible_llm 和 lmstudio_llm 表示两个 OpenAI 兼容服务器）",
+        ),
+        "hedge_delay": Description(
+            en="Seconds to wait for the first token before also sending the request to the next backend (null to disable)",
+            zh="等待首个 token 的秒数，超时后同时将请求发送到下一个后端（null 表示禁用）",
+        ),
+        "stats_window": Description(
+            en="Number of recent requests per backend used for latency and error rate",
+            zh="每个后端用于计算延迟和错误率的最近请求数",
+        ),
+        "stats_max_age": Description(
+            en="Seconds after which a latency or error sample expires",
+            zh="延迟或错误样本过期的秒数",
+        ),
+        "failure_threshold": Description(
+            en="Consecutive failures after which a backend is skipped for a while",
+            zh="连续失败多少次后暂时跳过该后端",
+        ),
+        "cooldown": Description(
+            en="Seconds a failing backend is skipped",
+            zh="跳过失败后端的秒数",
+        ),
+    }
+
+    DESCRIPTIONS: ClassVar[dict[str, Description]] = {
+        **StatelessLLMBaseConfig.DESCRIPTIONS,
+        **_ROUTER_DESCRIPTIONS,
+    }
+
+    @field_validator("backends")
+    def check_backends(cls, v):
+        if not v:
+            raise ValueError("router_llm needs at least one backend")
+        if "router_llm" in v:
+            raise ValueError("router_llm cannot route to itself")
+        duplicates = sorted({name for name in v if v.count(name) > 1})
+        if duplicates:
+            raise ValueError(
+                f"router_llm lists {duplicates} more than once. Backends are "
+                "configs of llm_configs, one per provider: use another "
+                "OpenAI-compatible config for a second endpoint"
+            )
+        return v
+
+
 class StatelessLLMConfigs(I18nMixin, BaseModel):
     """Pool of LLM provider configurations.
     This class contains configurations for different LLM providers."""
@@ -249,6 +333,7 @@ class StatelessLLMConfigs(I18nMixin, BaseModel):
     claude_llm: ClaudeConfig | None = Field(None, alias="claude_llm")
     llama_cpp_llm: LlamaCppConfig | None = Field(None, alias="llama_cpp_llm")
     mistral_llm: MistralConfig | None = Field(None, alias="mistral_llm")
+    router_llm: RouterLLMConfig | None = Field(None, alias="router_llm")
 
     DESCRIPTIONS: ClassVar[dict[str, Description]] = {
         "stateless_llm_with_template": Description(
@@ -282,4 +367,8 @@ class StatelessLLMConfigs(I18nMixin, BaseModel):
         "llama_cpp_llm": Description(
             en="Configuration for local Llama.cpp", zh="本地Llama.cpp配置"
         ),
+        "router_llm": Description(
+            en="Configuration for routing between several LLM backends",
+            zh="在多个 LLM 后端之间路由的配置",
+        ),
     }
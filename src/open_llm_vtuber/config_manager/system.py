@@ -1,9 +1,197 @@
 # config_manager/system.py
 from pydantic import Field, model_validator
-from typing import Dict, ClassVar
+from typing import Dict, ClassVar, Literal
 from .i18n import I18nMixin, Description
 
 
+class ExecutorPoolConfig(I18nMixin):
+    """Settings of one bounded executor pool."""
+
+    max_workers: int = Field(1, alias="max_workers")
+    max_queue_size: int = Field(8, alias="max_queue_size")
+    queue_timeout: float | None = Field(30.0, alias="queue_timeout")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "max_workers": Description(
+            en="Number of worker threads in the pool", zh="线程池中的工作线程数"
+        ),
+        "max_queue_size": Description(
+            en="Maximum number of jobs waiting for a worker before new jobs are rejected",
+            zh="等待工作线程的最大任务数，超出后新任务将被拒绝",
+        ),
+        "queue_timeout": Description(
+            en="Seconds a job may wait for a worker before it is rejected (null to wait forever)",
+            zh="任务等待工作线程的最长秒数，超时将被拒绝（null 表示一直等待）",
+        ),
+    }
+
+    @model_validator(mode="after")
+    def check_sizes(cls, values):
+        if values.max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if values.max_queue_size < 0:
+            raise ValueError("max_queue_size must not be negative")
+        return values
+
+
+class ExecutorPoolsConfig(I18nMixin):
+    """Dedicated executor pools for the heavy engine categories."""
+
+    asr: ExecutorPoolConfig = Field(
+        ExecutorPoolConfig(max_workers=1, max_queue_size=8, queue_timeout=30.0),
+        alias="asr",
+    )
+    tts: ExecutorPoolConfig = Field(
+        ExecutorPoolConfig(max_workers=2, max_queue_size=32, queue_timeout=60.0),
+        alias="tts",
+    )
+    llm_local: ExecutorPoolConfig = Field(
+        ExecutorPoolConfig(max_workers=1, max_queue_size=4, queue_timeout=120.0),
+        alias="llm_local",
+    )
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "asr": Description(
+            en="Executor pool for speech recognition", zh="语音识别使用的线程池"
+        ),
+        "tts": Description(
+            en="Executor pool for speech synthesis", zh="语音合成使用的线程池"
+        ),
+        "llm_local": Description(
+            en="Executor pool for in-process LLMs such as llama.cpp",
+            zh="进程内 LLM（如 llama.cpp）使用的线程池",
+        ),
+    }
+
+
+class LLMHttpClientConfig(I18nMixin):
+    """Connection pool settings shared by the remote LLM clients."""
+
+    http2: bool = Field(False, alias="http2")
+    max_connections: int = Field(100, alias="max_connections")
+    max_keepalive_connections: int = Field(20, alias="max_keepalive_connections")
+    keepalive_expiry: float = Field(60.0, alias="keepalive_expiry")
+    connect_timeout: float = Field(10.0, alias="connect_timeout")
+    timeout: float = Field(600.0, alias="timeout")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "http2": Description(
+            en="Use HTTP/2 when the server supports it (requires the 'h2' package)",
+            zh="服务器支持时使用 HTTP/2（需要安装 'h2' 包）",
+        ),
+        "max_connections": Description(
+            en="Maximum number of open connections per LLM base URL",
+            zh="每个 LLM base URL 的最大连接数",
+        ),
+        "max_keepalive_connections": Description(
+            en="Maximum number of idle connections kept alive per LLM base URL",
+            zh="每个 LLM base URL 保持的最大空闲连接数",
+        ),
+        "keepalive_expiry": Description(
+            en="Seconds an idle connection is kept alive",
+            zh="空闲连接保持的秒数",
+        ),
+        "connect_timeout": Description(
+            en="Seconds to wait for a connection to be established",
+            zh="建立连接的超时秒数",
+        ),
+        "timeout": Description(
+            en="Seconds to wait for a response from the LLM API",
+            zh="等待 LLM API 响应的超时秒数",
+        ),
+    }
+
+    @model_validator(mode="after")
+    def check_limits(cls, values):
+        if values.max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        if values.max_keepalive_connections < 0:
+            raise ValueError("max_keepalive_connections must not be negative")
+        return values
+
+
+class ChatHistoryConfig(I18nMixin):
+    """Storage settings of the chat history files."""
+
+    fsync: Literal["always", "interval", "never"] = Field("interval", alias="fsync")
+    fsync_interval: float = Field(1.0, alias="fsync_interval")
+    index_backend: Literal["json", "sqlite"] = Field("json", alias="index_backend")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "fsync": Description(
+            en="When history writes are forced to disk: after every write ('always'), at most once per fsync_interval per file ('interval'), or left to the OS ('never')",
+            zh="何时强制将聊天记录写入磁盘：每次写入后（'always'）、每个文件每 fsync_interval 秒最多一次（'interval'），或交由操作系统决定（'never'）",
+        ),
+        "fsync_interval": Description(
+            en="Minimum seconds between two fsyncs of a history file in 'interval' mode",
+            zh="'interval' 模式下同一聊天记录文件两次 fsync 之间的最小秒数",
+        ),
+        "index_backend": Description(
+            en="Storage of the history list index: a JSON file per character ('json') or one SQLite database ('sqlite') for many histories",
+            zh="聊天记录列表索引的存储方式：每个角色一个 JSON 文件（'json'），或适合大量聊天记录的单个 SQLite 数据库（'sqlite'）",
+        ),
+    }
+
+
+class SendQueueConfig(I18nMixin):
+    """Limits of the outbound message queue of each websocket client."""
+
+    max_messages: int = Field(256, alias="max_messages")
+    max_size: int = Field(16 * 1024 * 1024, alias="max_size")
+    slow_consumer_policy: Literal["drop_stale_audio", "disconnect", "wait"] = Field(
+        "drop_stale_audio", alias="slow_consumer_policy"
+    )
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "max_messages": Description(
+            en="Maximum number of messages waiting to be sent to one client",
+            zh="等待发送给单个客户端的最大消息数",
+        ),
+        "max_size": Description(
+            en="Maximum total size, in characters, of the messages waiting to be sent to one client",
+            zh="等待发送给单个客户端的消息的最大总大小（字符数）",
+        ),
+        "slow_consumer_policy": Description(
+            en="What to do when a client falls behind the limits: drop the audio of the oldest queued sentences and keep their text ('drop_stale_audio'), close the connection ('disconnect'), or make the conversation wait for the client ('wait')",
+            zh="客户端积压超过限制时的处理方式：丢弃最早排队句子的音频但保留文本（'drop_stale_audio'）、断开连接（'disconnect'），或让对话等待该客户端（'wait'）",
+        ),
+    }
+
+    @model_validator(mode="after")
+    def check_limits(cls, values):
+        if values.max_messages < 1:
+            raise ValueError("max_messages must be at least 1")
+        if values.max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        return values
+
+
+class ReceiveQueueConfig(I18nMixin):
+    """Limits of the inbound message lanes of each websocket client."""
+
+    max_audio_frames: int = Field(128, alias="max_audio_frames")
+    max_pending_messages: int = Field(64, alias="max_pending_messages")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "max_audio_frames": Description(
+            en="Maximum number of microphone frames waiting to be processed for one client before the oldest are dropped",
+            zh="单个客户端等待处理的最大麦克风音频帧数，超出后丢弃最早的帧",
+        ),
+        "max_pending_messages": Description(
+            en="Maximum number of other requests waiting to be processed for one client before new ones are rejected",
+            zh="单个客户端等待处理的其他请求的最大数量，超出后拒绝新请求",
+        ),
+    }
+
+    @model_validator(mode="after")
+    def check_limits(cls, values):
+        if values.max_audio_frames < 1:
+            raise ValueError("max_audio_frames must be at least 1")
+        if values.max_pending_messages < 1:
+            raise ValueError("max_pending_messages must be at least 1")
+        return values
+
+
 class SystemConfig(I18nMixin):
     """System configuration settings."""
 
@@ -13,6 +201,17 @@ class SystemConfig(I18nMixin):
     config_alts_dir: str = Field(..., alias="config_alts_dir")
     tool_prompts: Dict[str, str] = Field(..., alias="tool_prompts")
     enable_proxy: bool = Field(False, alias="enable_proxy")
+    executor_pools: ExecutorPoolsConfig = Field(
+        ExecutorPoolsConfig(), alias="executor_pools"
+    )
+    llm_http_client: LLMHttpClientConfig = Field(
+        LLMHttpClientConfig(), alias="llm_http_client"
+    )
+    chat_history: ChatHistoryConfig = Field(ChatHistoryConfig(), alias="chat_history")
+    send_queue: SendQueueConfig = Field(SendQueueConfig(), alias="send_queue")
+    receive_queue: ReceiveQueueConfig = Field(
+        ReceiveQueueConfig(), alias="receive_queue"
+    )
 
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "conf_version": Description(en="Configuration version", zh="配置文件版本"),
@@ -29,6 +228,26 @@ class SystemConfig(I18nMixin):
             en="Enable proxy mode for multiple clients",
             zh="启用代理模式以支持多个客户端使用一个 ws 连接",
         ),
+        "executor_pools": Description(
+            en="Sizes and admission limits of the ASR, TTS and local LLM worker pools",
+            zh="ASR、TTS 和本地 LLM 工作线程池的大小与准入限制",
+        ),
+        "llm_http_client": Description(
+            en="Connection pooling of the HTTP clients shared by remote LLMs",
+            zh="远程 LLM 共享 HTTP 客户端的连接池设置",
+        ),
+        "chat_history": Description(
+            en="Durability settings of the chat history files",
+            zh="聊天记录文件的持久化设置",
+        ),
+        "send_queue": Description(
+            en="Outbound message queue of each client and what to do with slow clients",
+            zh="每个客户端的发送消息队列，以及如何处理接收过慢的客户端",
+        ),
+        "receive_queue": Description(
+            en="Limits of the queues between receiving the messages of each client and handling them",
+            zh="每个客户端从接收消息到处理消息之间的队列限制",
+        ),
     }
 
     @model_validator(mode="after")
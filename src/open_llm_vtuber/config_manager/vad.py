@@ -14,6 +14,7 @@ class SileroVADConfig(I18nMixin):
     required_hits: int = Field(..., alias="required_hits")  # 3 * (0.032) = 0.1s
     required_misses: int = Field(..., alias="required_misses")  # 24 * (0.032) = 0.8s
     smoothing_window: int = Field(..., alias="smoothing_window")  # 5
+    speculative_misses: int = Field(0, alias="speculative_misses")  # 0 = disabled
 
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "orig_sr": Description(en="Original Audio Sample Rate", zh="原始音频采样率"),
@@ -35,6 +36,10 @@ class SileroVADConfig(I18nMixin):
         "smoothing_window": Description(
             en="Smoothing window size for VAD", zh="语音活动检测的平滑窗口大小"
         ),
+        "speculative_misses": Description(
+            en="Number of consecutive misses after which the LLM is started speculatively before the utterance ends (0 disables)",
+            zh="连续未命中多少次后在语句结束前提前推测性地启动 LLM（0 表示禁用）",
+        ),
     }
 
 
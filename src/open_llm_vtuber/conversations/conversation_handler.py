@@ -1,5 +1,4 @@
 import asyncio
-import json
 from typing import Dict, Optional, Callable
 
 import numpy as np
@@ -9,6 +8,7 @@ from loguru import logger
 from ..chat_group import ChatGroupManager
 from ..chat_history_manager import store_message
 from ..service_context import ServiceContext
+from ..utils import json_codec
 from .group_conversation import process_group_conversation
 from .single_conversation import process_single_conversation
 from .conversation_utils import EMOJI_LIST
@@ -55,7 +55,7 @@ async def handle_conversation_trigger(
         }
 
         await websocket.send_text(
-            json.dumps(
+            json_codec.dumps(
                 {
                     "type": "full-text",
                     "text": "AI wants to speak something...",
@@ -73,6 +73,11 @@ async def handle_conversation_trigger(
 
     group = chat_group_manager.get_client_group(client_uid)
     if group and len(group.members) > 1:
+        # Speculative turns only apply to single conversations
+        if context.speculative_turn:
+            await context.speculative_turn.cancel()
+            context.speculative_turn = None
+
         # Use group_id as task key for group conversations
         task_key = group.group_id
         if (
@@ -115,6 +120,11 @@ async def handle_individual_interrupt(
     context: ServiceContext,
     heard_response: str,
 ):
+    # Roll back a speculative turn before the interruption is recorded in memory
+    if context.speculative_turn:
+        await context.speculative_turn.cancel()
+        context.speculative_turn = None
+
     if client_uid in current_conversation_tasks:
         task = current_conversation_tasks[client_uid]
         if task and not task.done():
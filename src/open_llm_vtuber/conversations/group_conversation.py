@@ -1,6 +1,5 @@
 from typing import Any, Dict, List, Optional, Union
 import asyncio
-import json
 from loguru import logger
 from fastapi import WebSocket
 import numpy as np
@@ -24,6 +23,7 @@ from .types import (
 from ..service_context import ServiceContext
 from ..chat_history_manager import store_message
 from .tts_manager import TTSTaskManager
+from ..utils import json_codec
 
 
 async def process_group_conversation(
@@ -269,7 +269,7 @@ async def handle_group_member_turn(
 
     if tts_manager.task_list:
         await asyncio.gather(*tts_manager.task_list)
-        await current_ws_send(json.dumps({"type": "backend-synth-complete"}))
+        await current_ws_send(json_codec.dumps({"type": "backend-synth-complete"}))
 
         broadcast_ctx = BroadcastContext(
             broadcast_func=broadcast_func,
@@ -386,7 +386,7 @@ async def process_member_response(
     except Exception as e:
         logger.exception(f"Error processing group member response stream: {e}")
         await current_ws_send(
-            json.dumps(
+            json_codec.dumps(
                 {"type": "error", "message": f"Error processing response: {str(e)}"}
             )
         )
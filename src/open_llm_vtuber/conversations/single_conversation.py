@@ -1,6 +1,5 @@
 from typing import Union, List, Dict, Any, Optional
 import asyncio
-import json
 from loguru import logger
 import numpy as np
 
@@ -17,6 +16,7 @@ from .types import WebSocketSend
 from .tts_manager import TTSTaskManager
 from ..chat_history_manager import store_message
 from ..service_context import ServiceContext
+from ..utils import json_codec
 
 # Import necessary types from agent outputs
 from ..agent.output_types import SentenceOutput, AudioOutput
@@ -49,6 +49,10 @@ async def process_single_conversation(
     tts_manager = TTSTaskManager()
     full_response = ""  # Initialize full_response here
 
+    # Take over the agent turn started early on a partial utterance, if any
+    speculative_turn = context.speculative_turn
+    context.speculative_turn = None
+
     try:
         # Send initial signals
         await send_conversation_start_signals(websocket_send)
@@ -59,6 +63,14 @@ async def process_single_conversation(
             user_input, context.asr_engine, websocket_send
         )
 
+        # Reuse the speculative response if it was generated for this transcript
+        agent_output_stream = None
+        if speculative_turn:
+            if isinstance(user_input, np.ndarray) and not images and not metadata:
+                agent_output_stream = await speculative_turn.try_commit(input_text)
+            else:
+                await speculative_turn.cancel()
+
         # Create batch input
         batch_input = create_batch_input(
             input_text=input_text,
@@ -87,7 +99,8 @@ async def process_single_conversation(
 
         try:
             # agent.chat yields Union[SentenceOutput, Dict[str, Any]]
-            agent_output_stream = context.agent_engine.chat(batch_input)
+            if agent_output_stream is None:
+                agent_output_stream = context.agent_engine.chat(batch_input)
 
             async for output_item in agent_output_stream:
                 if (
@@ -98,7 +111,7 @@ async def process_single_conversation(
                     output_item["name"] = context.character_config.character_name
                     logger.debug(f"Sending tool status update: {output_item}")
 
-                    await websocket_send(json.dumps(output_item))
+                    await websocket_send(json_codec.dumps(output_item))
 
                 elif isinstance(output_item, (SentenceOutput, AudioOutput)):
                     # Handle SentenceOutput or AudioOutput
@@ -127,7 +140,7 @@ async def process_single_conversation(
                 f"Error processing agent response stream: {e}"
             )  # Log with stack trace
             await websocket_send(
-                json.dumps(
+                json_codec.dumps(
                     {
                         "type": "error",
                         "message": f"Error processing agent response: {str(e)}",
@@ -140,7 +153,7 @@ async def process_single_conversation(
         # Wait for any pending TTS tasks
         if tts_manager.task_list:
             await asyncio.gather(*tts_manager.task_list)
-            await websocket_send(json.dumps({"type": "backend-synth-complete"}))
+            await websocket_send(json_codec.dumps({"type": "backend-synth-complete"}))
 
         await finalize_conversation_turn(
             tts_manager=tts_manager,
@@ -167,8 +180,12 @@ async def process_single_conversation(
     except Exception as e:
         logger.error(f"Error in conversation chain: {e}")
         await websocket_send(
-            json.dumps({"type": "error", "message": f"Conversation error: {str(e)}"})
+            json_codec.dumps(
+                {"type": "error", "message": f"Conversation error: {str(e)}"}
+            )
         )
         raise
     finally:
+        if speculative_turn:
+            await speculative_turn.cancel()
         cleanup_conversation(tts_manager, session_emoji)
@@ -0,0 +1,171 @@
+import asyncio
+import re
+import time
+from typing import Any, AsyncIterator, Dict
+
+import numpy as np
+from loguru import logger
+
+from .conversation_utils import create_batch_input
+from ..agent.agents.basic_memory_agent import BasicMemoryAgent
+from ..service_context import ServiceContext
+
+_END_OF_STREAM = object()
+
+_stats: Dict[str, float] = {
+    "started": 0,
+    "hits": 0,
+    "misses": 0,
+    "cancelled": 0,
+    "latency_saved": 0.0,
+}
+
+
+def _normalize_transcript(text: str) -> str:
+    """Strip case, whitespace and punctuation so cosmetic ASR differences
+    between the speculative and the final transcript still count as a match."""
+    return re.sub(r'[\s.,!?;:，。！？；：、\'"』」）】…-]+', "", text).lower()
+
+
+class SpeculativeTurn:
+    """Runs the agent on the speech heard so far, before the utterance is final.
+
+    The VAD emits the audio as soon as the trailing silence is long enough to
+    suggest the user has finished speaking. The turn transcribes it and starts
+    `agent_engine.chat` right away, buffering the outputs without sending
+    anything to the client. When the final utterance arrives,
+    `process_single_conversation` calls `try_commit` with the final transcript:
+    if it matches, the buffered stream is used as the response; otherwise the
+    turn is cancelled and the agent memory is rolled back.
+    """
+
+    def __init__(self, context: ServiceContext, audio: np.ndarray):
+        """
+        Args:
+            context: Service context of the client that is speaking.
+            audio: The speech heard so far.
+        """
+        self._context = context
+        self._agent: BasicMemoryAgent = context.agent_engine
+        self._audio = audio
+        self._outputs: asyncio.Queue = asyncio.Queue()
+        self._transcribed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._memory_checkpoint = None
+        self._chat_started_at: float | None = None
+        self.transcript: str | None = None
+        self.committed = False
+        self._decided = False
+
+    @staticmethod
+    def is_supported(context: ServiceContext) -> bool:
+        """Speculation needs an agent whose memory can be rolled back."""
+        return isinstance(context.agent_engine, BasicMemoryAgent)
+
+    def start(self) -> None:
+        """Start transcribing and generating in the background."""
+        _stats["started"] += 1
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        try:
+            self.transcript = await self._context.asr_engine.async_transcribe_np(
+                self._audio
+            )
+            self._transcribed.set()
+            if not self.transcript.strip():
+                return
+            logger.debug(f"Speculative transcript: {self.transcript}")
+
+            batch_input = create_batch_input(
+                input_text=self.transcript,
+                images=None,
+                from_name=self._context.character_config.human_name,
+            )
+            self._memory_checkpoint = self._agent.create_memory_checkpoint()
+            self._chat_started_at = time.perf_counter()
+            async for output in self._agent.chat(batch_input):
+                await self._outputs.put(output)
+        except Exception as e:
+            logger.error(f"Error in speculative turn: {e}")
+            await self._outputs.put(e)
+        finally:
+            self._transcribed.set()
+            self._outputs.put_nowait(_END_OF_STREAM)
+
+    async def try_commit(self, final_transcript: str) -> AsyncIterator[Any] | None:
+        """Adopt the speculative response if the final transcript matches.
+
+        Args:
+            final_transcript: Transcript of the complete utterance.
+
+        Returns:
+            The agent output stream to use for this turn, or None if the
+            speculation missed and the turn was cancelled.
+        """
+        await self._transcribed.wait()
+        self._decided = True
+        if (
+            self._chat_started_at is None
+            or self.transcript is None
+            or _normalize_transcript(self.transcript)
+            != _normalize_transcript(final_transcript)
+        ):
+            _stats["misses"] += 1
+            logger.debug(
+                f"Speculation missed: '{self.transcript}' != '{final_transcript}'"
+            )
+            await self.cancel()
+            return None
+
+        self.committed = True
+        saved = time.perf_counter() - self._chat_started_at
+        _stats["hits"] += 1
+        _stats["latency_saved"] += saved
+        logger.info(
+            f"Speculation hit, LLM started {saved:.2f}s early "
+            f"(hit rate: {_stats['hits'] / (_stats['hits'] + _stats['misses']):.0%})"
+        )
+        return self._drain()
+
+    async def _drain(self) -> AsyncIterator[Any]:
+        try:
+            while True:
+                output = await self._outputs.get()
+                if output is _END_OF_STREAM:
+                    return
+                if isinstance(output, Exception):
+                    raise output
+                yield output
+        finally:
+            await self.cancel()
+
+    async def cancel(self) -> None:
+        """Stop the speculative generation and wait until it has unwound.
+
+        Memory is only rolled back if the turn was never committed.
+        """
+        if self._task and not self._task.done():
+            if not self._decided:
+                _stats["cancelled"] += 1
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+        if not self.committed and self._memory_checkpoint is not None:
+            self._agent.restore_memory_checkpoint(self._memory_checkpoint)
+            self._memory_checkpoint = None
+
+
+def get_speculation_stats() -> Dict[str, float]:
+    """Return hit rate and latency-saved metrics of speculative turns."""
+    decided = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": _stats["hits"] / decided if decided else 0.0,
+        "avg_latency_saved": (
+            _stats["latency_saved"] / _stats["hits"] if _stats["hits"] else 0.0
+        ),
+    }
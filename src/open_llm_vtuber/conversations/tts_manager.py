@@ -1,5 +1,4 @@
 import asyncio
-import json
 import re
 import uuid
 from datetime import datetime
@@ -10,6 +9,8 @@ from ..agent.output_types import DisplayText, Actions
 from ..live2d_model import Live2dModel
 from ..tts.tts_interface import TTSInterface
 from ..utils.stream_audio import prepare_audio_payload
+from ..utils import json_codec
+from ..utils.executor_pool import PoolOverloadedError, get_executor_pool
 from .types import WebSocketSend
 
 
@@ -26,6 +27,9 @@ class TTSTaskManager:
         # Counter for maintaining order
         self._sequence_counter = 0
         self._next_sequence_to_send = 0
+        # The sentences of a turn enter the shared TTS pool a few at a time,
+        # so a long reply waits here instead of filling the pool's queue
+        self._tts_slots = asyncio.Semaphore(get_executor_pool("tts").max_workers)
 
     async def speak(
         self,
@@ -85,6 +89,7 @@ class TTSTaskManager:
                 live2d_model=live2d_model,
                 tts_engine=tts_engine,
                 sequence_number=current_sequence,
+                websocket_send=websocket_send,
             )
         )
         self.task_list.append(task)
@@ -105,7 +110,7 @@ class TTSTaskManager:
                 # Send payloads in order
                 while self._next_sequence_to_send in buffered_payloads:
                     next_payload = buffered_payloads.pop(self._next_sequence_to_send)
-                    await websocket_send(json.dumps(next_payload))
+                    await websocket_send(json_codec.dumps(next_payload))
                     self._next_sequence_to_send += 1
 
                 self._payload_queue.task_done()
@@ -135,11 +140,13 @@ class TTSTaskManager:
         live2d_model: Live2dModel,
         tts_engine: TTSInterface,
         sequence_number: int,
+        websocket_send: WebSocketSend,
     ) -> None:
         """Process TTS generation and queue the result for ordered delivery"""
         audio_file_path = None
         try:
-            audio_file_path = await self._generate_audio(tts_engine, tts_text)
+            async with self._tts_slots:
+                audio_file_path = await self._generate_audio(tts_engine, tts_text)
             payload = prepare_audio_payload(
                 audio_path=audio_file_path,
                 display_text=display_text,
@@ -148,6 +155,12 @@ class TTSTaskManager:
             # Queue the payload with its sequence number
             await self._payload_queue.put((payload, sequence_number))
 
+        except PoolOverloadedError as e:
+            logger.warning(f"No audio for '''{tts_text}''': {e}")
+            # Tell the client why the sentence is silent
+            await websocket_send(json_codec.dumps({"type": "error", "message": str(e)}))
+            await self._send_silent_payload(display_text, actions, sequence_number)
+
         except Exception as e:
             logger.error(f"Error preparing audio payload: {e}")
             # Queue silent payload for error case
@@ -1,16 +1,41 @@
 import json
-from typing import List, Dict, Any, Optional, Tuple
+import re
+from typing import List, Dict, Any, Tuple
 from loguru import logger
 
+# Characters that change the scanner state outside and inside JSON strings.
+# Outside strings, any character JSON does not use there (letters other than
+# those of true/false/null, most punctuation) means the brace opened prose.
+_STRUCTURE_CHARS = re.compile(r'[{}"]|[^\s\[\]{}",:+\-.0-9aeflnrstuE]')
+_STRING_CHARS = re.compile(r'["\\]')
+
 
 class StreamJSONDetector:
-    """Detector for real-time JSON detection in streaming text."""
+    """Detector for real-time JSON detection in streaming text.
+
+    The detector scans each chunk once, keeping the brace depth and the
+    string/escape state across chunks, so the work is linear in the length of
+    the stream. Braces inside JSON strings are ignored. Text outside an open
+    object is dropped as soon as it has been scanned, so the buffer only holds
+    the object that is still incomplete.
+
+    A `{` in prose opens a span that never parses. The span is given up as
+    soon as it holds a character JSON cannot have outside a string, or when it
+    closes and fails to parse, and the scan restarts from the next `{` after
+    the one that opened it.
+    """
 
     def __init__(self):
-        self.buffer = ""  # Store text that has not been fully processed
-        self.potential_jsons = []  # Store possible JSON starting positions
         self.completed_jsons = []  # Store completed JSON objects
-        self.processed_ranges = []  # Store processed intervals [start, end]
+        self._parts: List[str] = []  # Text of the object being read
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def buffer(self) -> str:
+        """Text of the incomplete object at the end of the stream, if any."""
+        return "".join(self._parts)
 
     def process_chunk(self, chunk: str) -> List[Dict[str, Any]]:
         """Process a single text chunk, return a list of complete JSON objects found in this chunk.
@@ -21,104 +46,80 @@ class StreamJSONDetector:
         Returns:
             List[Dict[str, Any]]: List of complete JSON objects parsed from the current chunk
         """
-        # Add new chunk to buffer
-        old_length = len(self.buffer)
-        self.buffer += chunk
-
-        # Update potential JSON starting positions
-        self._find_potential_starts(old_length)
-
-        # Try to parse potential JSON objects
-        new_jsons = self._try_parse_jsons()
-
-        return new_jsons
-
-    def _find_potential_starts(self, start_from: int) -> None:
-        """Find new potential JSON starting positions in the buffer.
-
-        Args:
-            start_from (int): Position to start searching from
-        """
-        for i in range(start_from, len(self.buffer)):
-            if self.buffer[i] == "{" and not self._is_in_processed_range(i):
-                self.potential_jsons.append(i)
-
-    def _is_in_processed_range(self, pos: int) -> bool:
-        """Check if a specified position is within a processed range.
-
-        Args:
-            pos (int): Position to check
-
-        Returns:
-            bool: True if position is within a processed range, otherwise False
-        """
-        for start, end in self.processed_ranges:
-            if start <= pos <= end:
-                return True
-        return False
-
-    def _try_parse_jsons(self) -> List[Dict[str, Any]]:
-        """Try to parse JSON objects from the current buffer.
-
-        Returns:
-            List[Dict[str, Any]]: List of newly parsed JSON objects
-        """
         new_jsons = []
-        remaining_potential = []
-
-        # Sort by starting position, process outermost JSON first
-        self.potential_jsons.sort()
-
-        for start_idx in self.potential_jsons:
-            # Skip if this position is already within a processed range
-            if self._is_in_processed_range(start_idx):
-                continue
-
-            result, end_idx = self._extract_json(start_idx)
-            if result is not None:
-                new_jsons.append(result)
-                # Mark this range as processed
-                self.processed_ranges.append((start_idx, end_idx))
-                self.completed_jsons.append(result)
+        text = chunk
+        pos = 0
+        # Where the text of the open object starts in `text`. An object
+        # carried over from an earlier chunk continues from the beginning.
+        object_start = 0
+
+        while pos < len(text):
+            if self._depth == 0:
+                # Plain text, skip to the next object
+                object_start = text.find("{", pos)
+                if object_start == -1:
+                    break
+                self._depth = 1
+                pos = object_start + 1
+            elif self._escaped:
+                self._escaped = False
+                pos += 1
+            elif self._in_string:
+                match = _STRING_CHARS.search(text, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escaped = True
+                else:
+                    self._in_string = False
             else:
-                # This JSON may not be complete yet, keep it
-                remaining_potential.append(start_idx)
-
-        self.potential_jsons = remaining_potential
+                match = _STRUCTURE_CHARS.search(text, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                char = match.group()
+                if char == '"':
+                    self._in_string = True
+                elif char == "{":
+                    self._depth += 1
+                elif char == "}":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._parts.append(text[object_start:pos])
+                        span = "".join(self._parts)
+                        try:
+                            new_jsons.append(json.loads(span))
+                        except json.JSONDecodeError:
+                            logger.warning(
+                                f"JSON structure found but parsing failed: {span[:50]}..."
+                            )
+                            text, pos = self._restart(span, text[pos:])
+                            continue
+                        self._parts = []
+                else:
+                    # Not JSON, the brace opened plain text
+                    self._parts.append(text[object_start:pos])
+                    text, pos = self._restart("".join(self._parts), text[pos:])
+
+        if self._depth > 0:
+            self._parts.append(text[object_start:])
+
+        self.completed_jsons.extend(new_jsons)
         return new_jsons
 
-    def _extract_json(self, start_idx: int) -> Tuple[Optional[Dict[str, Any]], int]:
-        """Try to extract a complete JSON object from the given position.
-
-        Args:
-            start_idx (int): Potential starting position of JSON
+    def _restart(self, span: str, rest: str) -> Tuple[str, int]:
+        """Give up the span opened by its first brace.
 
         Returns:
-            Tuple[Optional[Dict[str, Any]], int]: Parsed JSON object and ending position,
-                                               or (None, -1) if incomplete
+            The text to scan again, from just after that brace, and the
+            position to scan it from.
         """
-        stack = 1
-        i = start_idx + 1
-
-        while i < len(self.buffer) and stack > 0:
-            if self.buffer[i] == "{":
-                stack += 1
-            elif self.buffer[i] == "}":
-                stack -= 1
-            i += 1
-
-        # If complete JSON is found
-        if stack == 0:
-            json_str = self.buffer[start_idx:i]
-            try:
-                json_data = json.loads(json_str)
-                return json_data, i - 1
-            except json.JSONDecodeError:
-                logger.warning(
-                    f"JSON structure found but parsing failed: {json_str[:50]}..."
-                )
-
-        return None, -1
+        self._parts = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        return span[1:] + rest, 0
 
     def get_all_jsons(self) -> List[Dict[str, Any]]:
         """Get all JSON objects parsed so far.
@@ -130,10 +131,11 @@ class StreamJSONDetector:
 
     def reset(self) -> None:
         """Reset detector state, prepare to process a new stream."""
-        self.buffer = ""
-        self.potential_jsons = []
         self.completed_jsons = []
-        self.processed_ranges = []
+        self._parts = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
 
 
 # Usage example
@@ -1,22 +1,19 @@
 """MCP Client for Open-LLM-Vtuber."""
 
-from contextlib import AsyncExitStack
 from typing import Dict, Any, List, Callable
 from loguru import logger
-from datetime import timedelta
 
-from mcp import ClientSession, StdioServerParameters
+from mcp import ClientSession
 from mcp.types import Tool
-from mcp.client.stdio import stdio_client
 
 from .server_registry import ServerRegistry
-
-DEFAULT_TIMEOUT = timedelta(seconds=30)
+from .session_pool import MCPSessionPool, get_mcp_session_pool
 
 
 class MCPClient:
     """MCP Client for Open-LLM-Vtuber.
-    Manages persistent connections to multiple MCP servers.
+    Calls tools on MCP servers shared with the other sessions through the
+    session pool, so each server runs once per process.
     """
 
     def __init__(
@@ -26,8 +23,6 @@ class MCPClient:
         client_uid: str = None,
     ) -> None:
         """Initialize the MCP Client."""
-        self.exit_stack: AsyncExitStack = AsyncExitStack()
-        self.active_sessions: Dict[str, ClientSession] = {}
         self._list_tools_cache: Dict[str, List[Tool]] = {}  # Cache for list_tools
         self._send_text: Callable = send_text
         self._client_uid: str = client_uid
@@ -40,45 +35,15 @@ class MCPClient:
             )
         logger.info("MCPC: Initialized MCPClient instance.")
 
+    @property
+    def _pool(self) -> MCPSessionPool:
+        return get_mcp_session_pool(self.server_registery)
+
     async def _ensure_server_running_and_get_session(
         self, server_name: str
     ) -> ClientSession:
-        """Gets the existing session or creates a new one."""
-        if server_name in self.active_sessions:
-            return self.active_sessions[server_name]
-
-        logger.info(f"MCPC: Starting and connecting to server '{server_name}'...")
-        server = self.server_registery.get_server(server_name)
-        if not server:
-            raise ValueError(
-                f"MCPC: Server '{server_name}' not found in available servers."
-            )
-
-        timeout = server.timeout if server.timeout else DEFAULT_TIMEOUT
-
-        server_params = StdioServerParameters(
-            command=server.command, args=server.args, env=server.env, cwd=server.cwd
-        )
-
-        try:
-            stdio_transport = await self.exit_stack.enter_async_context(
-                stdio_client(server_params)
-            )
-            read, write = stdio_transport
-
-            session = await self.exit_stack.enter_async_context(
-                ClientSession(read, write, read_timeout_seconds=timeout)
-            )
-            await session.initialize()
-
-            self.active_sessions[server_name] = session
-            logger.info(f"MCPC: Successfully connected to server '{server_name}'.")
-            return session
-        except Exception as e:
-            logger.exception(f"MCPC: Failed to connect to server '{server_name}': {e}")
-            raise RuntimeError(
-                f"MCPC: Failed to connect to server '{server_name}'."
-            ) from e
+        """Gets the shared session, starting the server if needed."""
+        return await self._pool.get_session(server_name)
 
     async def list_tools(self, server_name: str) -> List[Tool]:
         """List all available tools on the specified server."""
@@ -90,13 +55,12 @@ class MCPClient:
         logger.debug(
             f"MCPC: Cache miss for list_tools on server '{server_name}'. Fetching..."
         )
-        session = await self._ensure_server_running_and_get_session(server_name)
-        response = await session.list_tools()
+        tools = await self._pool.list_tools(server_name)
 
         # Store in cache before returning
-        self._list_tools_cache[server_name] = response.tools
+        self._list_tools_cache[server_name] = tools
         logger.debug(f"MCPC: Cached list_tools result for server '{server_name}'.")
-        return response.tools
+        return tools
 
     async def call_tool(
         self, server_name: str, tool_name: str, tool_args: Dict[str, Any]
@@ -106,9 +70,8 @@ class MCPClient:
         Returns:
             Dict containing the metadata and content_items from the tool response.
         """
-        session = await self._ensure_server_running_and_get_session(server_name)
         logger.info(f"MCPC: Calling tool '{tool_name}' on server '{server_name}'...")
-        response = await session.call_tool(tool_name, tool_args)
+        response = await self._pool.call_tool(server_name, tool_name, tool_args)
 
         if response.isError:
             error_text = (
@@ -155,14 +118,8 @@ class MCPClient:
         return result
 
     async def aclose(self) -> None:
-        """Closes all active server connections."""
-        logger.info(
-            f"MCPC: Closing client instance and {len(self.active_sessions)} active connections..."
-        )
-        await self.exit_stack.aclose()
-        self.active_sessions.clear()
+        """Releases the client. The shared servers keep running for other sessions."""
         self._list_tools_cache.clear()  # Clear cache on close
-        self.exit_stack = AsyncExitStack()
         logger.info("MCPC: Client instance closed.")
 
     async def __aenter__(self) -> "MCPClient":
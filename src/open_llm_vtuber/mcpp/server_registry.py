@@ -87,6 +87,10 @@ class ServerRegistry:
                 env=server_details.get("env", None),
                 cwd=server_details.get("cwd", None),
                 timeout=server_details.get("timeout", None),
+                max_concurrent_requests=server_details.get(
+                    "max_concurrent_requests", None
+                ),
+                cache_ttl=server_details.get("cache_ttl", {}),
             )
             logger.debug(f"MCPSR: Loaded server: '{server_name}'.")
 
@@ -0,0 +1,335 @@
+"""Process-wide pool of MCP server sessions for Open-LLM-Vtuber.
+
+Every websocket session used to start its own stdio MCP servers (node, uvx,
+python...), and listing tools started yet another set. The pool starts each
+server once and shares its session between all clients. MCP sessions
+multiplex requests by id, so concurrent calls only need a limit per server.
+
+Each server is owned by a supervisor task. It opens the stdio transport and
+the session, pings the server periodically, and restarts it with backoff when
+it dies or stops answering. The transport is entered and exited in that same
+task, as anyio requires.
+
+There is one pool per event loop, as subprocess pipes cannot be shared
+between loops. The default context lists the tools in a temporary loop before
+uvicorn starts its own; the servers started there are stopped with that loop,
+and `start_mcp_servers` starts them again on the serving loop at startup.
+"""
+
+import asyncio
+import weakref
+from datetime import timedelta
+from typing import Any, Dict, List
+
+import anyio
+from loguru import logger
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.types import CONNECTION_CLOSED, CallToolResult, Tool
+
+from .server_registry import ServerRegistry
+from .types import MCPServer
+
+DEFAULT_TIMEOUT = timedelta(seconds=30)
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+HEALTH_CHECK_INTERVAL = 30.0
+HEALTH_CHECK_TIMEOUT = 10.0
+STARTUP_TIMEOUT = 60.0
+MAX_RESTART_BACKOFF = 30.0
+# Consecutive failed starts after which the supervisor gives up until the
+# server is requested again
+MAX_START_ATTEMPTS = 3
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MCPSessionPool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _is_connection_lost(error: Exception) -> bool:
+    """Whether an error means the server process or its pipes are gone."""
+    if isinstance(
+        error,
+        (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream),
+    ):
+        return True
+    return getattr(getattr(error, "error", None), "code", None) == CONNECTION_CLOSED
+
+
+class _PooledServer:
+    """A shared MCP server process and its session."""
+
+    def __init__(self, server: MCPServer, health_check_interval: float):
+        self.server = server
+        self.health_check_interval = health_check_interval
+        self.session: ClientSession | None = None
+        # serverInfo.version reported by the last successful initialize
+        self.version: str | None = None
+        self.requests = asyncio.Semaphore(
+            server.max_concurrent_requests or DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        # Pending while no session is up, resolved when the server is ready
+        self._ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._connected = False
+        self._restart = asyncio.Event()
+        self._closing = False
+        self._supervisor: asyncio.Task | None = None
+
+        self.starts = 0
+        self.restarts = 0
+        self.failed_health_checks = 0
+        self.calls = 0
+
+    def _timeout(self) -> timedelta:
+        timeout = self.server.timeout
+        if isinstance(timeout, (int, float)):
+            return timedelta(seconds=timeout)
+        return timeout or DEFAULT_TIMEOUT
+
+    def _fail_waiters(self, error: Exception) -> None:
+        ready, self._ready = self._ready, asyncio.get_running_loop().create_future()
+        if not ready.done():
+            ready.set_exception(error)
+            # Mark it retrieved, waiters that timed out never will
+            ready.exception()
+
+    def start(self) -> None:
+        """Start the server in the background if it is not running."""
+        if self._supervisor is None or self._supervisor.done():
+            self._closing = False
+            self._supervisor = asyncio.create_task(
+                self._supervise(), name=f"mcp-server-{self.server.name}"
+            )
+
+    async def get_session(self) -> ClientSession:
+        """Return the session, starting the server if needed."""
+        if self.session is not None:
+            return self.session
+        self.start()
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._ready), STARTUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise RuntimeError(
+                f"MCPP: Server '{self.server.name}' did not start within {STARTUP_TIMEOUT}s."
+            ) from None
+
+    def request_restart(self, reason: str) -> None:
+        """Restart the server, e.g. after its pipe broke during a call."""
+        if self.session is not None and not self._restart.is_set():
+            logger.warning(f"MCPP: Restarting server '{self.server.name}' ({reason}).")
+            self._restart.set()
+
+    async def _supervise(self) -> None:
+        backoff = 1.0
+        failed_starts = 0
+        while not self._closing:
+            self.starts += 1
+            if self.starts > 1:
+                self.restarts += 1
+            self._connected = False
+            try:
+                await self._run_once()
+            except Exception as e:
+                logger.error(f"MCPP: Server '{self.server.name}' failed: {e!r}")
+
+            if self._connected:
+                failed_starts = 0
+                backoff = 1.0
+            else:
+                failed_starts += 1
+                self._fail_waiters(
+                    RuntimeError(
+                        f"MCPP: Failed to connect to server '{self.server.name}'."
+                    )
+                )
+                if failed_starts >= MAX_START_ATTEMPTS:
+                    logger.error(
+                        f"MCPP: Giving up on server '{self.server.name}' after "
+                        f"{failed_starts} failed starts. It is retried on next use."
+                    )
+                    return
+            if self._closing:
+                break
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_RESTART_BACKOFF)
+
+    async def _run_once(self) -> None:
+        """Run the server until it dies, fails a health check or is closed."""
+        server = self.server
+        logger.info(f"MCPP: Starting and connecting to server '{server.name}'...")
+        params = StdioServerParameters(
+            command=server.command, args=server.args, env=server.env, cwd=server.cwd
+        )
+        self._restart.clear()
+        try:
+            async with stdio_client(params) as (read, write):
+                async with ClientSession(
+                    read, write, read_timeout_seconds=self._timeout()
+                ) as session:
+                    result = await session.initialize()
+                    self.version = getattr(
+                        getattr(result, "serverInfo", None), "version", None
+                    )
+                    self.session = session
+                    self._connected = True
+                    self._ready.set_result(session)
+                    logger.info(
+                        f"MCPP: Successfully connected to server '{server.name}'."
+                    )
+                    await self._watch(session)
+        finally:
+            self.session = None
+            if self._ready.done():
+                self._ready = asyncio.get_running_loop().create_future()
+
+    async def _watch(self, session: ClientSession) -> None:
+        """Ping the server until a restart is requested or a ping fails."""
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._restart.wait(), self.health_check_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(session.send_ping(), HEALTH_CHECK_TIMEOUT)
+            except Exception as e:
+                self.failed_health_checks += 1
+                logger.warning(
+                    f"MCPP: Health check of server '{self.server.name}' failed: {e!r}"
+                )
+                return
+
+    async def close(self) -> None:
+        self._closing = True
+        self._restart.set()
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            await asyncio.gather(self._supervisor, return_exceptions=True)
+            self._supervisor = None
+        self._fail_waiters(RuntimeError(f"MCPP: Server '{self.server.name}' closed."))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.session is not None,
+            "version": self.version,
+            "starts": self.starts,
+            "restarts": self.restarts,
+            "failed_health_checks": self.failed_health_checks,
+            "calls": self.calls,
+        }
+
+
+class MCPSessionPool:
+    """Shares one session per MCP server between all clients of an event loop."""
+
+    def __init__(
+        self,
+        server_registery: ServerRegistry,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL,
+    ) -> None:
+        self.server_registery = server_registery
+        self.health_check_interval = health_check_interval
+        self._servers: Dict[str, _PooledServer] = {}
+
+    def _get_server(self, server_name: str) -> _PooledServer:
+        pooled = self._servers.get(server_name)
+        if pooled is None:
+            server = self.server_registery.get_server(server_name)
+            if not server:
+                raise ValueError(
+                    f"MCPP: Server '{server_name}' not found in available servers."
+                )
+            pooled = _PooledServer(server, self.health_check_interval)
+            self._servers[server_name] = pooled
+        return pooled
+
+    def server_version(self, server_name: str) -> str | None:
+        """Return the last reported version of a server, without starting it."""
+        pooled = self._servers.get(server_name)
+        return pooled.version if pooled else None
+
+    def start(self, server_names: List[str]) -> None:
+        """Start servers in the background, without waiting for them."""
+        for server_name in server_names:
+            try:
+                self._get_server(server_name).start()
+            except ValueError as e:
+                logger.warning(str(e))
+
+    async def get_session(self, server_name: str) -> ClientSession:
+        """Return the shared session of a server, starting it if needed."""
+        return await self._get_server(server_name).get_session()
+
+    async def list_tools(self, server_name: str) -> List[Tool]:
+        """List the tools of a server."""
+        session = await self.get_session(server_name)
+        response = await session.list_tools()
+        return response.tools
+
+    async def call_tool(
+        self, server_name: str, tool_name: str, tool_args: Dict[str, Any]
+    ) -> CallToolResult:
+        """Call a tool, waiting if the server is at its request limit."""
+        pooled = self._get_server(server_name)
+        async with pooled.requests:
+            session = await pooled.get_session()
+            pooled.calls += 1
+            try:
+                return await session.call_tool(tool_name, tool_args)
+            except Exception as e:
+                if _is_connection_lost(e):
+                    pooled.request_restart(f"{type(e).__name__} during a call")
+                raise
+
+    async def aclose(self) -> None:
+        """Stop all servers of the pool."""
+        servers = list(self._servers.values())
+        self._servers.clear()
+        await asyncio.gather(
+            *(pooled.close() for pooled in servers), return_exceptions=True
+        )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: pooled.stats() for name, pooled in self._servers.items()}
+
+
+def get_mcp_session_pool(server_registery: ServerRegistry) -> MCPSessionPool:
+    """Return the MCP session pool of the running event loop.
+
+    Servers that are not running yet are started from the latest registry.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = MCPSessionPool(server_registery)
+        _pools[loop] = pool
+    else:
+        pool.server_registery = server_registery
+    return pool
+
+
+def start_mcp_servers(
+    server_registery: ServerRegistry, server_names: List[str]
+) -> None:
+    """Start servers in the pool of the running event loop, in the background.
+
+    Called on the loop that serves the clients, so that the first tool call
+    does not wait for the servers to start.
+    """
+    get_mcp_session_pool(server_registery).start(server_names)
+
+
+async def close_mcp_session_pool() -> None:
+    """Stop the MCP servers started from the running event loop."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        logger.info("MCPP: Stopping shared MCP servers...")
+        await pool.aclose()
+
+
+def get_mcp_session_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Return per-server statistics of the pool of the running event loop."""
+    try:
+        pool = _pools.get(asyncio.get_running_loop())
+    except RuntimeError:
+        return {}
+    return pool.stats() if pool else {}
@@ -4,8 +4,9 @@ from typing import Dict, Optional, List, Tuple, Any
 from loguru import logger
 
 from .types import FormattedTool
-from .mcp_client import MCPClient
+from .session_pool import get_mcp_session_pool
 from .server_registry import ServerRegistry
+from .tool_catalog import ToolCatalog, get_tool_catalog_cache
 
 
 class ToolAdapter:
@@ -30,52 +31,45 @@ class ToolAdapter:
 
         logger.debug(f"MC: Fetching tool info for enabled servers: {enabled_servers}")
 
-        # Use a single client instance for efficiency
-        async with MCPClient(self.server_registery) as client:
-            for server_name in enabled_servers:
-                if server_name not in self.server_registery.servers:
-                    logger.warning(
-                        f"MC: Enabled server '{server_name}' not found in Server Manager. Skipping."
-                    )
-                    continue
+        # Listing tools starts the servers in the shared pool, where the
+        # sessions reuse them for their tool calls
+        pool = get_mcp_session_pool(self.server_registery)
+        for server_name in enabled_servers:
+            if server_name not in self.server_registery.servers:
+                logger.warning(
+                    f"MC: Enabled server '{server_name}' not found in Server Manager. Skipping."
+                )
+                continue
 
-                try:
-                    servers_info[server_name] = {}
-                    tools = await client.list_tools(server_name)
-                    logger.debug(
-                        f"MC: Found {len(tools)} tools on server '{server_name}'"
-                    )
-                    for tool in tools:
-                        servers_info[server_name][tool.name] = {}
-                        tool_info = servers_info[server_name][tool.name]
-                        tool_info["description"] = tool.description
-                        tool_info["parameters"] = tool.inputSchema.get("properties", {})
-                        tool_info["required"] = tool.inputSchema.get("required", [])
-
-                        # Store the tool info in FormattedTool format
-                        formatted_tools[tool.name] = FormattedTool(
-                            input_schema=tool.inputSchema,
-                            related_server=server_name,
-                            description=tool.description,
-                            # Generic schema will be generated later if needed
-                            generic_schema=None,
-                        )
-                except (ValueError, RuntimeError, ConnectionError) as e:
-                    logger.error(
-                        f"MC: Failed to get info for server '{server_name}': {e}"
-                    )
-                    if (
-                        server_name not in servers_info
-                    ):  # Ensure entry exists even on error
-                        servers_info[server_name] = {}
-                    continue  # Continue to next server
-                except Exception as e:
-                    logger.error(
-                        f"MC: Unexpected error for server '{server_name}': {e}"
+            try:
+                servers_info[server_name] = {}
+                tools = await pool.list_tools(server_name)
+                logger.debug(f"MC: Found {len(tools)} tools on server '{server_name}'")
+                for tool in tools:
+                    servers_info[server_name][tool.name] = {}
+                    tool_info = servers_info[server_name][tool.name]
+                    tool_info["description"] = tool.description
+                    tool_info["parameters"] = tool.inputSchema.get("properties", {})
+                    tool_info["required"] = tool.inputSchema.get("required", [])
+
+                    # Store the tool info in FormattedTool format
+                    formatted_tools[tool.name] = FormattedTool(
+                        input_schema=tool.inputSchema,
+                        related_server=server_name,
+                        description=tool.description,
+                        # Generic schema will be generated later if needed
+                        generic_schema=None,
                     )
-                    if server_name not in servers_info:
-                        servers_info[server_name] = {}
-                    continue  # Continue to next server
+            except (ValueError, RuntimeError, ConnectionError) as e:
+                logger.error(f"MC: Failed to get info for server '{server_name}': {e}")
+                if server_name not in servers_info:  # Ensure entry exists even on error
+                    servers_info[server_name] = {}
+                continue  # Continue to next server
+            except Exception as e:
+                logger.error(f"MC: Unexpected error for server '{server_name}': {e}")
+                if server_name not in servers_info:
+                    servers_info[server_name] = {}
+                continue  # Continue to next server
 
         logger.debug(
             f"MC: Finished fetching tool info. Found {len(formatted_tools)} tools across enabled servers."
@@ -216,17 +210,51 @@ class ToolAdapter:
         )
         return openai_tools, claude_tools
 
-    async def get_tools(
-        self, enabled_servers: List[str]
-    ) -> Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]]]:
-        """Run the dynamic fetching and formatting process."""
+    async def get_tool_catalog(
+        self, enabled_servers: List[str], use_cache: bool = True
+    ) -> ToolCatalog:
+        """Return the tools of the enabled servers in every format, cached."""
+        cache = get_tool_catalog_cache()
+        if use_cache:
+            catalog = cache.get(self.server_registery, enabled_servers)
+            if catalog is not None:
+                logger.debug(f"MC: Tool catalog cache hit for {enabled_servers}.")
+                return catalog
+
         logger.info(
             f"MC: Running dynamic tool construction for servers: {enabled_servers}"
         )
         servers_info, formatted_tools_dict = await self.get_server_and_tool_info(
             enabled_servers
         )
-        mcp_prompt_string = self.construct_mcp_prompt_string(servers_info)
         openai_tools, claude_tools = self.format_tools_for_api(formatted_tools_dict)
+        pool = get_mcp_session_pool(self.server_registery)
+        catalog = ToolCatalog(
+            servers_info=servers_info,
+            tools=formatted_tools_dict,
+            prompt=self.construct_mcp_prompt_string(servers_info),
+            openai_tools=openai_tools,
+            claude_tools=claude_tools,
+            server_versions={name: pool.server_version(name) for name in servers_info},
+        )
         logger.info("MC: Dynamic tool construction complete.")
-        return mcp_prompt_string, openai_tools, claude_tools
+
+        # A server that failed to answer would otherwise stay missing until
+        # the entry expires
+        failed = [
+            name
+            for name in enabled_servers
+            if name in self.server_registery.servers and not servers_info.get(name)
+        ]
+        if failed:
+            logger.debug(f"MC: Not caching the tool catalog, no tools from {failed}.")
+        else:
+            cache.put(self.server_registery, enabled_servers, catalog)
+        return catalog
+
+    async def get_tools(
+        self, enabled_servers: List[str]
+    ) -> Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Return the MCP prompt and the OpenAI and Claude tool lists."""
+        catalog = await self.get_tool_catalog(enabled_servers)
+        return catalog.prompt, catalog.openai_tools, catalog.claude_tools
@@ -0,0 +1,154 @@
+"""Cache of the MCP tool catalog for Open-LLM-Vtuber.
+
+Building the tool catalog lists the tools of every enabled server, which
+starts their processes, and formats the tools for the OpenAI and Claude APIs
+and the prompt mode. Agents are initialized for every new session and on
+every config switch, with the same servers almost every time, so the
+finished catalog is cached.
+
+An entry is keyed by the enabled servers and their configuration, so editing
+mcp_servers.json never returns a stale catalog. It expires after a TTL, and
+is dropped early when the session pool sees a server come back with another
+version. Checking that costs no I/O: the versions are those the pool recorded
+when it last (re)started the servers.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .server_registry import ServerRegistry
+from .session_pool import get_mcp_session_pool
+from .types import FormattedTool
+
+DEFAULT_TTL = 600.0
+
+CatalogKey = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class ToolCatalog:
+    """The tools of a set of servers, in every format the agents use.
+
+    Args:
+        servers_info (dict): Tool information by server, as used for the prompt.
+        tools (dict[str, FormattedTool]): Tools by name.
+        prompt (str): Tool description for the prompt mode.
+        openai_tools (list[dict]): Tools in the OpenAI function-calling format.
+        claude_tools (list[dict]): Tools in the Claude tool-use format.
+        server_versions (dict[str, Optional[str]]): Version of each server when
+            the catalog was built.
+    """
+
+    servers_info: Dict[str, Dict[str, Any]]
+    tools: Dict[str, FormattedTool]
+    prompt: str
+    openai_tools: List[Dict[str, Any]]
+    claude_tools: List[Dict[str, Any]]
+    server_versions: Dict[str, Optional[str]] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class ToolCatalogCache:
+    """Caches tool catalogs by enabled servers, with a TTL."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL) -> None:
+        self.ttl = ttl
+        self._entries: Dict[CatalogKey, ToolCatalog] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        server_registery: ServerRegistry, enabled_servers: List[str]
+    ) -> CatalogKey:
+        """Key a catalog by the enabled servers and their configuration."""
+        return tuple(
+            (name, repr(server_registery.get_server(name)))
+            for name in sorted(set(enabled_servers))
+        )
+
+    def _is_stale(self, catalog: ToolCatalog, server_registery: ServerRegistry) -> bool:
+        if time.monotonic() - catalog.created_at > self.ttl:
+            return True
+        pool = get_mcp_session_pool(server_registery)
+        for name, version in catalog.server_versions.items():
+            current = pool.server_version(name)
+            # Servers this event loop has not started yet are not checked
+            if current is not None and current != version:
+                logger.info(
+                    f"MCPTC: Server '{name}' changed version "
+                    f"({version} -> {current}), rebuilding the tool catalog."
+                )
+                return True
+        return False
+
+    def get(
+        self, server_registery: ServerRegistry, enabled_servers: List[str]
+    ) -> ToolCatalog | None:
+        """Return the cached catalog of the servers, if still valid."""
+        key = self.make_key(server_registery, enabled_servers)
+        catalog = self._entries.get(key)
+        if catalog is not None and self._is_stale(catalog, server_registery):
+            del self._entries[key]
+            catalog = None
+        if catalog is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return catalog
+
+    def put(
+        self,
+        server_registery: ServerRegistry,
+        enabled_servers: List[str],
+        catalog: ToolCatalog,
+    ) -> None:
+        self._entries[self.make_key(server_registery, enabled_servers)] = catalog
+
+    def invalidate(self, server_name: str | None = None) -> None:
+        """Drop the catalogs containing a server, or all catalogs."""
+        if server_name is None:
+            dropped = list(self._entries)
+        else:
+            dropped = [
+                key for key in self._entries if any(n == server_name for n, _ in key)
+            ]
+        for key in dropped:
+            del self._entries[key]
+        self.invalidations += len(dropped)
+        logger.debug(f"MCPTC: Invalidated {len(dropped)} tool catalog(s).")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+_cache = ToolCatalogCache()
+
+
+def get_tool_catalog_cache() -> ToolCatalogCache:
+    """Return the process-wide tool catalog cache."""
+    return _cache
+
+
+def invalidate_tool_catalog(server_name: str | None = None) -> None:
+    """Force the next agent initialization to fetch the tools again.
+
+    Args:
+        server_name: Only drop the catalogs containing this server. All
+            catalogs are dropped if None.
+    """
+    _cache.invalidate(server_name)
+
+
+def get_tool_catalog_stats() -> Dict[str, Any]:
+    """Return the hit, miss and invalidation counts of the catalog cache."""
+    return _cache.stats()
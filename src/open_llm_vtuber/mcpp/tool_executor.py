@@ -1,4 +1,5 @@
 import json
+import asyncio
 import datetime
 from loguru import logger
 from typing import (
@@ -13,6 +14,7 @@ from typing import (
 from .types import ToolCallObject
 from .mcp_client import MCPClient
 from .tool_manager import ToolManager
+from .tool_result_cache import get_tool_result_cache
 
 
 class ToolExecutor:
@@ -20,9 +22,20 @@ class ToolExecutor:
         self,
         mcp_client: MCPClient,
         tool_manager: ToolManager,
+        max_concurrent_tools: int = 4,
+        tool_timeout: float | None = 60.0,
     ):
+        """
+        Args:
+            mcp_client: Client used to call the tools.
+            tool_manager: Provides the server of each tool.
+            max_concurrent_tools: How many calls of one turn may run at once.
+            tool_timeout: Seconds before a call is abandoned. None for no limit.
+        """
         self._mcp_client = mcp_client
         self._tool_manager = tool_manager
+        self._max_concurrent_tools = max(max_concurrent_tools, 1)
+        self._tool_timeout = tool_timeout
 
     def parse_tool_call(self, call: Union[Dict[str, Any], ToolCallObject]) -> tuple:
         """Parse tool call from different formats.
@@ -157,11 +170,17 @@ class ToolExecutor:
         tool_calls: Union[List[Dict[str, Any]], List[ToolCallObject]],
         caller_mode: Literal["Claude", "OpenAI", "Prompt"],
     ) -> AsyncIterator[Dict[str, Any]]:
-        """Execute tools and yield status updates."""
-        tool_results_for_llm = []
+        """Execute tools and yield status updates.
+
+        Independent calls run concurrently, at most `max_concurrent_tools` at a
+        time. A status update is yielded when each call starts and finishes, and
+        the final results keep the order of `tool_calls`.
+        """
+        tool_results_for_llm: List[Dict[str, Any] | None] = [None] * len(tool_calls)
+        runnable = []
 
         logger.info(f"Executing {len(tool_calls)} tool(s) for {caller_mode} caller.")
-        for call in tool_calls:
+        for index, call in enumerate(tool_calls):
             (
                 tool_name,
                 tool_id,
@@ -192,114 +211,211 @@ class ToolExecutor:
                 yield status_update
                 # Even on parse error, we might need to format a result for the LLM
                 # Use dummy values or the error message
-                formatted_result = self.format_tool_result(
+                tool_results_for_llm[index] = self.format_tool_result(
                     caller_mode,
                     tool_id
                     or f"parse_error_{datetime.datetime.now(datetime.timezone.utc).isoformat()}",
                     result_content,
                     True,  # is_error
                 )
-                if formatted_result:
-                    tool_results_for_llm.append(formatted_result)
                 continue  # Skip execution logic for this call
 
-            # Yield 'running' status before execution
-            yield {
-                "type": "tool_call_status",
-                "tool_id": tool_id,
-                "tool_name": tool_name,
-                "status": "running",
-                "content": f"Input: {json.dumps(tool_input)}",
-                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
-                + "Z",
-            }
+            runnable.append((index, tool_name, tool_id, tool_input))
 
-            # Execute the tool
-            (
-                is_error,
-                text_content,
-                metadata,
-                content_items,
-            ) = await self.run_single_tool(tool_name, tool_id, tool_input)
-
-            # Determine content for status update and LLM result format
-            status_content = text_content  # Default to text content
-            llm_formatted_content = text_content  # Default to text content for LLM
-
-            if content_items:
-                image_items = [
-                    item for item in content_items if item.get("type") == "image"
-                ]
-                if image_items:
-                    num_images = len(image_items)
-                    status_content = (
-                        f"{text_content}\n[Tool returned {num_images} image(s)]".strip()
-                    )
-
-                    if caller_mode == "Claude":
-                        # Format for Claude: list of blocks
-                        claude_blocks = []
-                        if text_content:
-                            claude_blocks.append({"type": "text", "text": text_content})
-                        for item in content_items:
-                            if (
-                                item.get("type") == "image"
-                                and "data" in item
-                                and "mimeType" in item
-                            ):
-                                claude_blocks.append(
-                                    {
-                                        "type": "image",
-                                        "source": {
-                                            "type": "base64",
-                                            "media_type": item["mimeType"],
-                                            "data": item["data"],
-                                        },
-                                    }
-                                )
-                            # Add other non-text types here
-                        llm_formatted_content = (
-                            claude_blocks if claude_blocks else ""
-                        )  # Use blocks or empty string
-                    elif caller_mode in ["OpenAI", "Prompt"]:
-                        llm_formatted_content = status_content
-
-            # Prepare and yield tool call status update
-            status_update = {
-                "type": "tool_call_status",
-                "tool_id": tool_id,
-                "tool_name": tool_name,
-                "status": "error" if is_error else "completed",
-                "content": status_content
-                if not is_error
-                else f"Error: {text_content}",  # Use descriptive content or error message
-                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
-                + "Z",
-            }
+        if runnable:
+            events: asyncio.Queue = asyncio.Queue()
+            slots = asyncio.Semaphore(self._max_concurrent_tools)
 
-            # For stagehand_navigate tool, include browser view links if available
-            if tool_name == "stagehand_navigate" and not is_error:
-                live_view_data = metadata.get("liveViewData", {})
-                if live_view_data:
-                    logger.info(
-                        f"Found live view data for stagehand_navigate: {live_view_data}"
+            async def run(index: int, tool_name: str, tool_id: str, tool_input: Any):
+                async with slots:
+                    # Yield 'running' status before execution
+                    events.put_nowait(
+                        {
+                            "type": "tool_call_status",
+                            "tool_id": tool_id,
+                            "tool_name": tool_name,
+                            "status": "running",
+                            "content": f"Input: {json.dumps(tool_input)}",
+                            "timestamp": datetime.datetime.now(
+                                datetime.timezone.utc
+                            ).isoformat()
+                            + "Z",
+                        }
                     )
-                    status_update["browser_view"] = live_view_data
-
-            yield status_update
+                    run_result = await self._run_with_timeout(
+                        tool_name, tool_id, tool_input
+                    )
+                status_update, formatted_result = self._build_tool_result(
+                    caller_mode, tool_name, tool_id, *run_result
+                )
+                tool_results_for_llm[index] = formatted_result
+                events.put_nowait(status_update)
 
-            # Format result for LLM and add to list
-            formatted_result = self.format_tool_result(
-                caller_mode, tool_id, llm_formatted_content, is_error
-            )
-            if formatted_result:
-                tool_results_for_llm.append(formatted_result)
+            def report_crash(task: asyncio.Task) -> None:
+                if not task.cancelled() and task.exception() is not None:
+                    events.put_nowait(task.exception())
 
+            tasks = [asyncio.create_task(run(*item)) for item in runnable]
+            for task in tasks:
+                task.add_done_callback(report_crash)
+            try:
+                # Each call reports once when it starts and once when it ends
+                for _ in range(2 * len(tasks)):
+                    event = await events.get()
+                    if isinstance(event, BaseException):
+                        raise event
+                    yield event
+            finally:
+                # Stop the remaining calls if the conversation was interrupted
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        tool_results_for_llm = [
+            result for result in tool_results_for_llm if result is not None
+        ]
         logger.info(
             f"Finished executing tools with {len(tool_results_for_llm)} results."
         )
         yield {"type": "final_tool_results", "results": tool_results_for_llm}
 
+    async def _run_with_timeout(
+        self, tool_name: str, tool_id: str, tool_input: Any
+    ) -> tuple[bool, str, Dict[str, Any], List[Dict[str, Any]]]:
+        """Run a single tool, turning a timeout into an error result."""
+        try:
+            return await asyncio.wait_for(
+                self.run_single_tool(tool_name, tool_id, tool_input),
+                self._tool_timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Tool '{tool_name}' (ID: {tool_id}) timed out after {self._tool_timeout}s."
+            )
+            text_content = (
+                f"Error: Tool '{tool_name}' timed out after {self._tool_timeout}s."
+            )
+            return True, text_content, {}, [{"type": "error", "text": text_content}]
+
+    def _build_tool_result(
+        self,
+        caller_mode: Literal["Claude", "OpenAI", "Prompt"],
+        tool_name: str,
+        tool_id: str,
+        is_error: bool,
+        text_content: str,
+        metadata: Dict[str, Any],
+        content_items: List[Dict[str, Any]],
+    ) -> tuple[Dict[str, Any], Dict[str, Any] | None]:
+        """Build the status update and the LLM result of a finished tool call.
+
+        Returns:
+            tuple: (status_update, formatted_result)
+        """
+        # Determine content for status update and LLM result format
+        status_content = text_content  # Default to text content
+        llm_formatted_content = text_content  # Default to text content for LLM
+
+        if content_items:
+            image_items = [
+                item for item in content_items if item.get("type") == "image"
+            ]
+            if image_items:
+                num_images = len(image_items)
+                status_content = (
+                    f"{text_content}\n[Tool returned {num_images} image(s)]".strip()
+                )
+
+                if caller_mode == "Claude":
+                    # Format for Claude: list of blocks
+                    claude_blocks = []
+                    if text_content:
+                        claude_blocks.append({"type": "text", "text": text_content})
+                    for item in content_items:
+                        if (
+                            item.get("type") == "image"
+                            and "data" in item
+                            and "mimeType" in item
+                        ):
+                            claude_blocks.append(
+                                {
+                                    "type": "image",
+                                    "source": {
+                                        "type": "base64",
+                                        "media_type": item["mimeType"],
+                                        "data": item["data"],
+                                    },
+                                }
+                            )
+                        # Add other non-text types here
+                    llm_formatted_content = (
+                        claude_blocks if claude_blocks else ""
+                    )  # Use blocks or empty string
+                elif caller_mode in ["OpenAI", "Prompt"]:
+                    llm_formatted_content = status_content
+
+        # Prepare tool call status update
+        status_update = {
+            "type": "tool_call_status",
+            "tool_id": tool_id,
+            "tool_name": tool_name,
+            "status": "error" if is_error else "completed",
+            "content": status_content
+            if not is_error
+            else f"Error: {text_content}",  # Use descriptive content or error message
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat() + "Z",
+        }
+
+        # For stagehand_navigate tool, include browser view links if available
+        if tool_name == "stagehand_navigate" and not is_error:
+            live_view_data = metadata.get("liveViewData", {})
+            if live_view_data:
+                logger.info(
+                    f"Found live view data for stagehand_navigate: {live_view_data}"
+                )
+                status_update["browser_view"] = live_view_data
+
+        # Format result for LLM
+        formatted_result = self.format_tool_result(
+            caller_mode, tool_id, llm_formatted_content, is_error
+        )
+        return status_update, formatted_result
+
+    def _cache_ttl(self, server_name: str, tool_name: str) -> float | None:
+        """TTL of the tool's results from mcp_servers.json, None if not cached."""
+        server = self._mcp_client.server_registery.get_server(server_name)
+        if not server or not server.cache_ttl:
+            return None
+        return server.cache_ttl.get(tool_name, server.cache_ttl.get("*"))
+
+    async def _call_tool(
+        self, server_name: str, tool_name: str, tool_input: Any
+    ) -> Dict[str, Any]:
+        """Call the tool, or reuse a recent result if the tool is cacheable."""
+
+        def call():
+            return self._mcp_client.call_tool(
+                server_name=server_name, tool_name=tool_name, tool_args=tool_input
+            )
+
+        ttl = self._cache_ttl(server_name, tool_name)
+        if not ttl or ttl <= 0:
+            return await call()
+        return await get_tool_result_cache().get_or_call(
+            server_name,
+            tool_name,
+            tool_input,
+            ttl,
+            call,
+            # Errors are not cached, the next call may succeed
+            cacheable=lambda result: (
+                not any(
+                    item.get("type") == "error"
+                    for item in result.get("content_items", [])
+                )
+            ),
+        )
+
     async def run_single_tool(
         self, tool_name: str, tool_id: str, tool_input: Any
     ) -> tuple[bool, str, Dict[str, Any], List[Dict[str, Any]]]:
@@ -331,10 +447,8 @@ class ToolExecutor:
             is_error = True
         else:
             try:
-                result_dict = await self._mcp_client.call_tool(
-                    server_name=tool_info.related_server,
-                    tool_name=tool_name,
-                    tool_args=tool_input,
+                result_dict = await self._call_tool(
+                    tool_info.related_server, tool_name, tool_input
                 )
 
                 metadata = result_dict.get("metadata", {})
@@ -0,0 +1,163 @@
+"""Result cache for idempotent MCP tools.
+
+Group conversations and live streams often trigger the same web search or
+lookup several times within seconds. Tools that are safe to answer from a
+recent result can opt in with a per-tool TTL in mcp_servers.json:
+
+    "ddg-search": {
+        "command": "uvx",
+        "args": ["duckduckgo-mcp-server"],
+        "cache_ttl": {"search": 300, "fetch_content": 600}
+    }
+
+"*" sets the TTL of every tool of the server. Tools without a TTL are never
+cached. Results are keyed by server, tool and the arguments in canonical JSON,
+shared by all sessions, and evicted least recently used first. Identical
+calls that arrive while the first one is still running wait for its result
+instead of calling the tool again.
+"""
+
+import asyncio
+import copy
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+DEFAULT_MAX_ENTRIES = 256
+
+CacheKey = Tuple[str, str, str]
+
+
+def canonical_arguments(arguments: Any) -> str:
+    """Serialize tool arguments so that equal arguments give equal keys."""
+    return json.dumps(
+        arguments,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+class ToolResultCache:
+    """LRU cache of tool results with per-entry expiry."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        # key -> (expiry time, result)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _get(self, key: CacheKey) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _put(self, key: CacheKey, result: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_call(
+        self,
+        server_name: str,
+        tool_name: str,
+        arguments: Any,
+        ttl: float,
+        call: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda result: True,
+    ) -> Any:
+        """Return a fresh cached result, or call the tool and cache its result.
+
+        Args:
+            server_name: Server of the tool.
+            tool_name: Name of the tool.
+            arguments: Arguments of the call.
+            ttl: Seconds the result stays valid.
+            call: Runs the tool when there is no cached result.
+            cacheable: Whether a result may be cached, e.g. not errors.
+        """
+        key = (server_name, tool_name, canonical_arguments(arguments))
+        result = self._get(key)
+        if result is not None:
+            self.hits += 1
+            logger.debug(f"MCPRC: Cache hit for tool '{tool_name}'.")
+            return copy.deepcopy(result)
+
+        loop = asyncio.get_running_loop()
+        pending = self._inflight.get(key)
+        if pending is not None and pending.get_loop() is loop:
+            logger.debug(f"MCPRC: Waiting for the running call of '{tool_name}'.")
+            try:
+                result = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The first caller was interrupted, call the tool ourselves
+            else:
+                self.coalesced += 1
+                return copy.deepcopy(result)
+
+        self.misses += 1
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            result = await call()
+        except BaseException as e:
+            if not isinstance(e, asyncio.CancelledError):
+                future.set_exception(e)
+                # Mark it retrieved, there may be no waiter
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            if cacheable(result):
+                self._put(key, result, ttl)
+            return copy.deepcopy(result)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+_cache = ToolResultCache()
+
+
+def get_tool_result_cache() -> ToolResultCache:
+    """Return the process-wide tool result cache."""
+    return _cache
+
+
+def get_tool_result_cache_stats() -> Dict[str, Any]:
+    """Return the hit, miss and eviction counts of the tool result cache."""
+    return _cache.stats()
@@ -14,6 +14,8 @@ class MCPServer:
         env (Optional[dict[str, str]], optional): Environment variables for the command. Defaults to None.
         cwd (Optional[str], optional): Working directory for the command. Defaults to None.
         timeout (Optional[timedelta], optional): Timeout for the command. Defaults to 10 seconds.
+        max_concurrent_requests (Optional[int], optional): Requests the shared server handles at once. Defaults to None, the pool default.
+        cache_ttl (dict[str, float], optional): Seconds the results of each tool may be reused, "*" for all tools. Defaults to no caching.
     """
 
     name: str
@@ -22,6 +24,8 @@ class MCPServer:
     env: Optional[dict[str, str]] = None
     cwd: str | None = None
     timeout: Optional[timedelta] = timedelta(seconds=30)
+    max_concurrent_requests: Optional[int] = None
+    cache_ttl: dict[str, float] = field(default_factory=dict)
     description: str = "No description available."
 
 
@@ -8,6 +8,20 @@ import aiohttp
 from starlette.websockets import WebSocketDisconnect
 
 from .proxy_message_queue import ProxyMessageQueue
+from .utils import json_codec
+from .utils.ws_broadcast import describe_send_error, send_text_to_all
+
+
+def _summarize_for_log(message: dict) -> dict:
+    """Replace audio data and long volume lists of a message for the log."""
+    log_msg = dict(message)
+    if "audio" in log_msg:
+        log_msg["audio"] = (
+            f"[Audio data, {len(message.get('audio') or '')} bytes truncated]"
+        )
+    if "volumes" in log_msg and len(log_msg.get("volumes") or []) > 10:
+        log_msg["volumes"] = f"[{len(message['volumes'])} volume values]"
+    return log_msg
 
 
 class ProxyHandler:
@@ -74,7 +88,9 @@ class ProxyHandler:
             try:
                 if self.connected and self.server_ws and not self.server_ws.closed:
                     # Send heartbeat
-                    await self.server_ws.send_json({"type": "heartbeat"})
+                    await self.server_ws.send_str(
+                        json_codec.dumps({"type": "heartbeat"})
+                    )
                     await asyncio.sleep(30)  # Heartbeat interval
                 else:
                     # Try to reconnect
@@ -119,7 +135,7 @@ class ProxyHandler:
         try:
             # Handle messages from this client
             while True:
-                message = await websocket.receive_json()
+                message = json_codec.loads(await websocket.receive_text())
 
                 # Process text-input messages through the queue
                 if message.get("type") == "text-input":
@@ -201,7 +217,7 @@ class ProxyHandler:
             await self.connect_to_server()
 
         if self.server_ws and not self.server_ws.closed:
-            await self.server_ws.send_json(message)
+            await self.server_ws.send_str(json_codec.dumps(message))
 
     async def forward_server_messages(self):
         """Forward messages from server to all connected clients"""
@@ -216,7 +232,7 @@ class ProxyHandler:
                             if not msg.data:  # Check if data is empty
                                 continue
 
-                            data = json.loads(msg.data)
+                            data = json_codec.loads(msg.data)
                             if not data:  # Check if parsed data is empty
                                 continue
 
@@ -261,37 +277,27 @@ class ProxyHandler:
         if not message:  # Add null check
             return
 
-        disconnected_clients = []
-
-        # Log message, but handle audio data specially to avoid huge logs
-        log_msg = (
-            message.copy()
-            if "audio" not in message
-            else {
-                **{k: v for k, v in message.items() if k != "audio"},
-                "audio": f"[Audio data, {len(message.get('audio', ''))} bytes truncated]",
-            }
+        # Summarized only when debug logging is on, audio makes it expensive
+        logger.opt(lazy=True).debug(
+            "Broadcasting to clients (excluding {}): {}",
+            lambda: exclude_client,
+            lambda: _summarize_for_log(message),
         )
 
-        if "volumes" in log_msg and len(log_msg.get("volumes", [])) > 10:
-            log_msg["volumes"] = f"[{len(message.get('volumes', []))} volume values]"
-
-        logger.debug(f"Broadcasting to clients (excluding {exclude_client}): {log_msg}")
-
-        for client_id, websocket in self.clients.items():
-            # Skip the excluded client
-            if exclude_client and client_id == exclude_client:
-                continue
-
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending to client {client_id}: {e}")
-                disconnected_clients.append(client_id)
-
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            await self.handle_client_disconnect(client_id)
+        recipients = {
+            client_id: websocket
+            for client_id, websocket in self.clients.items()
+            if not (exclude_client and client_id == exclude_client)
+        }
+        failures = await send_text_to_all(recipients, json_codec.dumps(message))
+
+        # Clean up disconnected clients. Slow ones only miss this message.
+        for client_id, error in failures.items():
+            logger.error(
+                f"Error sending to client {client_id}: {describe_send_error(error)}"
+            )
+            if not isinstance(error, asyncio.TimeoutError):
+                await self.handle_client_disconnect(client_id)
 
     async def forward_with_broadcast(
         self, message: dict, sender_id: Optional[str] = None
@@ -1,15 +1,32 @@
 import os
 import json
 from uuid import uuid4
-import numpy as np
 from datetime import datetime
-from fastapi import APIRouter, WebSocket, UploadFile, File, Response
+from fastapi import APIRouter, WebSocket, Request, Response, Query
 from starlette.responses import JSONResponse
 from starlette.websockets import WebSocketDisconnect
 from loguru import logger
 from .service_context import ServiceContext
-from .websocket_handler import WebSocketHandler
+from .websocket_handler import WebSocketHandler, MAX_SEARCH_PAGE_SIZE
+from .chat_history_manager import (
+    get_chat_history_writer_stats,
+    is_valid_uid,
+    run_history_io,
+    search_history,
+)
 from .proxy_handler import ProxyHandler
+from .send_queue import QueuedWebSocket, get_send_queue_stats
+from .utils.executor_pool import PoolOverloadedError, get_executor_pool_stats
+from .utils import json_codec
+from .utils.multipart_stream import MultipartFileReader
+from .asr.wav_decoder import StreamingWavDecoder
+from .agent.stateless_llm.prompt_cache_stats import get_prompt_cache_stats
+from .agent.stateless_llm.router_llm import get_llm_router_stats
+from .client_inbox import get_receive_queue_stats
+from .conversations.speculative_turn import get_speculation_stats
+from .mcpp.session_pool import get_mcp_session_pool_stats
+from .mcpp.tool_catalog import get_tool_catalog_stats
+from .mcpp.tool_result_cache import get_tool_result_cache_stats
 
 
 def init_client_ws_route(default_context_cache: ServiceContext) -> APIRouter:
@@ -31,6 +48,8 @@ def init_client_ws_route(default_context_cache: ServiceContext) -> APIRouter:
         """WebSocket endpoint for client connections"""
         await websocket.accept()
         client_uid = str(uuid4())
+        # Messages to the client go through its send queue
+        websocket = QueuedWebSocket(websocket, client_uid)
 
         try:
             await ws_handler.handle_new_connection(websocket, client_uid)
@@ -41,6 +60,8 @@ def init_client_ws_route(default_context_cache: ServiceContext) -> APIRouter:
             logger.error(f"Error in WebSocket connection: {e}")
             await ws_handler.handle_disconnect(client_uid)
             raise
+        finally:
+            await websocket.aclose()
 
     return router
 
@@ -138,49 +159,102 @@ def init_webtool_routes(default_context_cache: ServiceContext) -> APIRouter:
             }
         )
 
+    @router.get("/stats")
+    async def get_stats():
+        """Runtime counters of the server, for monitoring"""
+        return JSONResponse(
+            {
+                "type": "stats",
+                "prompt_cache": get_prompt_cache_stats(),
+                "llm_routers": get_llm_router_stats(),
+                "speculative_turns": get_speculation_stats(),
+                "executor_pools": get_executor_pool_stats(),
+                "send_queues": get_send_queue_stats(),
+                "receive_queues": get_receive_queue_stats(),
+                "chat_history_writer": get_chat_history_writer_stats(),
+                "mcp_servers": get_mcp_session_pool_stats(),
+                "mcp_tool_catalog": get_tool_catalog_stats(),
+                "mcp_tool_results": get_tool_result_cache_stats(),
+            }
+        )
+
+    @router.get("/history/search")
+    async def search_chat_history(
+        q: str,
+        conf_uid: str | None = None,
+        history_uid: str | None = None,
+        limit: int = Query(20, ge=1, le=MAX_SEARCH_PAGE_SIZE),
+        offset: int = Query(0, ge=0),
+    ):
+        """Search the chat histories of a character, most relevant first
+
+        Searches the character of the default config unless conf_uid is given.
+        """
+        conf_uid = conf_uid or default_context_cache.character_config.conf_uid
+        for name, uid in (("conf_uid", conf_uid), ("history_uid", history_uid)):
+            if uid is not None and not is_valid_uid(uid):
+                return JSONResponse(
+                    {"error": f"Invalid {name}: {uid}"}, status_code=400
+                )
+        hits, has_more = await run_history_io(
+            search_history, conf_uid, q, limit, offset, history_uid
+        )
+        return JSONResponse(
+            {
+                "type": "history-search-results",
+                "query": q,
+                "results": hits,
+                "offset": offset,
+                "has_more": has_more,
+            }
+        )
+
     @router.post("/asr")
-    async def transcribe_audio(file: UploadFile = File(...)):
+    async def transcribe_audio(request: Request):
         """
-        Endpoint for transcribing audio using the ASR engine
+        Endpoint for transcribing audio using the ASR engine.
+
+        Accepts a WAV file either as the "file" field of a multipart form or as
+        the raw request body. The audio is decoded while it is being received
+        and resampled to the sample rate of the ASR engine.
         """
-        logger.info(f"Received audio file for transcription: {file.filename}")
+        asr_engine = default_context_cache.asr_engine
+        decoder = StreamingWavDecoder(target_sample_rate=asr_engine.SAMPLE_RATE)
 
         try:
-            contents = await file.read()
-
-            # Validate minimum file size
-            if len(contents) < 44:  # Minimum WAV header size
-                raise ValueError("Invalid WAV file: File too small")
-
-            # Decode the WAV header and get actual audio data
-            wav_header_size = 44  # Standard WAV header size
-            audio_data = contents[wav_header_size:]
-
-            # Validate audio data size
-            if len(audio_data) % 2 != 0:
-                raise ValueError("Invalid audio data: Buffer size must be even")
-
-            # Convert to 16-bit PCM samples to float32
-            try:
-                audio_array = (
-                    np.frombuffer(audio_data, dtype=np.int16).astype(np.float32)
-                    / 32768.0
-                )
-            except ValueError as e:
-                raise ValueError(
-                    f"Audio format error: {str(e)}. Please ensure the file is 16-bit PCM WAV format."
-                )
-
-            # Validate audio data
+            content_type = request.headers.get("content-type", "")
+            if content_type.startswith("multipart/form-data"):
+                reader = MultipartFileReader(content_type, "file")
+                async for chunk in request.stream():
+                    for data in reader.feed(chunk):
+                        decoder.feed(data)
+                if not reader.found:
+                    raise ValueError("Missing 'file' field in the form data")
+                logger.info(f"Received audio file for transcription: {reader.filename}")
+            else:
+                logger.info("Received audio stream for transcription")
+                async for chunk in request.stream():
+                    decoder.feed(chunk)
+
+            audio_array = decoder.finish()
             if len(audio_array) == 0:
                 raise ValueError("Empty audio data")
-
-            text = await default_context_cache.asr_engine.async_transcribe_np(
-                audio_array
+            logger.debug(
+                f"Decoded {decoder.channels}-channel {decoder.bits_per_sample}-bit "
+                f"audio at {decoder.sample_rate} Hz into {len(audio_array)} samples"
             )
+
+            text = await asr_engine.async_transcribe_np(audio_array)
             logger.info(f"Transcription result: {text}")
             return {"text": text}
 
+        except PoolOverloadedError as e:
+            logger.warning(f"ASR request rejected: {e}")
+            return Response(
+                content=json.dumps({"error": str(e)}),
+                status_code=503,
+                media_type="application/json",
+            )
         except ValueError as e:
             logger.error(f"Audio format error: {e}")
             return Response(
@@ -206,7 +280,7 @@ def init_webtool_routes(default_context_cache: ServiceContext) -> APIRouter:
 
         try:
             while True:
-                data = await websocket.receive_json()
+                data = json_codec.loads(await websocket.receive_text())
                 text = data.get("text")
                 if not text:
                     continue
@@ -230,20 +304,24 @@ def init_webtool_routes(default_context_cache: ServiceContext) -> APIRouter:
                             f"Generated audio for sentence: {sentence} at: {audio_path}"
                         )
 
-                        await websocket.send_json(
-                            {
-                                "status": "partial",
-                                "audioPath": audio_path,
-                                "text": sentence,
-                            }
+                        await websocket.send_text(
+                            json_codec.dumps(
+                                {
+                                    "status": "partial",
+                                    "audioPath": audio_path,
+                                    "text": sentence,
+                                }
+                            )
                         )
 
                     # Send completion signal
-                    await websocket.send_json({"status": "complete"})
+                    await websocket.send_text(json_codec.dumps({"status": "complete"}))
 
                 except Exception as e:
                     logger.error(f"Error generating TTS: {e}")
-                    await websocket.send_json({"status": "error", "message": str(e)})
+                    await websocket.send_text(
+                        json_codec.dumps({"status": "error", "message": str(e)})
+                    )
 
         except WebSocketDisconnect:
             logger.info("TTS WebSocket client disconnected")
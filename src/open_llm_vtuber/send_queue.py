@@ -0,0 +1,269 @@
+"""
+Outbound message queues of the websocket clients.
+
+Conversations used to await `websocket.send_text` for every message, so a
+client on a slow link stalled its own TTS pipeline, and in groups everyone
+else's. Each client connection is now wrapped in a `QueuedWebSocket`:
+`send_text` puts the message in a queue and returns, and a writer task of
+the connection sends the queue in order.
+
+The queue of a client is bounded in messages and in size (characters of the
+queued JSON text). A queued "full-text" message is replaced by a newer one
+while the client is behind. When a client falls behind by more than the
+limits, the slow-consumer policy applies:
+
+- "drop_stale_audio": the audio of the oldest queued "audio" messages is
+  dropped, keeping their text and actions, so the client still shows the
+  subtitles. If the queue is still too long, the client is disconnected.
+- "disconnect": the client is disconnected.
+- "wait": senders wait until the queue has room again (backpressure).
+
+A single message is always accepted into an empty queue, whatever its size.
+"""
+
+import asyncio
+import re
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from fastapi import WebSocket
+from loguru import logger
+
+from .utils import json_codec
+
+# Used until `configure_send_queues` is called with the system config.
+DEFAULT_SEND_QUEUE_SETTINGS: Dict[str, Any] = {
+    "max_messages": 256,
+    "max_size": 16 * 1024 * 1024,
+    "slow_consumer_policy": "drop_stale_audio",
+}
+
+# Close code sent to a client disconnected for being too slow ("Try Again Later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# Messages are encoded with "type" first, see json_codec
+_TYPE_RE = re.compile(r'\{\s*"type"\s*:\s*"([^"]*)"')
+
+_settings: Dict[str, Any] = dict(DEFAULT_SEND_QUEUE_SETTINGS)
+_queues: Dict[str, "QueuedWebSocket"] = {}
+
+
+def configure_send_queues(send_queue_settings: Dict[str, Any]) -> None:
+    """Set the limits and slow-consumer policy of new client queues.
+
+    Args:
+        send_queue_settings: Keys of `DEFAULT_SEND_QUEUE_SETTINGS` to override.
+    """
+    _settings.update(
+        {
+            k: v
+            for k, v in send_queue_settings.items()
+            if k in DEFAULT_SEND_QUEUE_SETTINGS
+        }
+    )
+    logger.info(
+        f"Client send queues: max_messages={_settings['max_messages']}, "
+        f"max_size={_settings['max_size']}, "
+        f"policy={_settings['slow_consumer_policy']}"
+    )
+
+
+def get_send_queue_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the queue depth and counters of every connected client."""
+    return {client_uid: queue.stats() for client_uid, queue in _queues.items()}
+
+
+def _message_type(text: str) -> Optional[str]:
+    match = _TYPE_RE.match(text, 0, 64)
+    return match.group(1) if match else None
+
+
+class _Outbound:
+    __slots__ = ("text", "type", "size")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.type = _message_type(text)
+        self.size = len(text)
+
+
+class QueuedWebSocket:
+    """A client websocket whose `send_text` goes through a bounded queue.
+
+    Everything but `send_text` and `close` is passed to the wrapped
+    websocket, so it can be used wherever the websocket was.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        client_uid: str,
+        max_messages: int | None = None,
+        max_size: int | None = None,
+        slow_consumer_policy: str | None = None,
+    ) -> None:
+        self.websocket = websocket
+        self.client_uid = client_uid
+        self.max_messages = max_messages or _settings["max_messages"]
+        self.max_size = max_size or _settings["max_size"]
+        self.slow_consumer_policy = (
+            slow_consumer_policy or _settings["slow_consumer_policy"]
+        )
+
+        self._queue: Deque[_Outbound] = deque()
+        self._size = 0
+        self._not_empty = asyncio.Event()
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+        self._closed = False
+        self._writer = asyncio.create_task(
+            self._write(), name=f"ws-writer-{client_uid}"
+        )
+        _queues[client_uid] = self
+
+        self.sent = 0
+        self.sent_size = 0
+        self.coalesced = 0
+        self.audio_dropped = 0
+        self.peak_messages = 0
+        self.peak_size = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.websocket, name)
+
+    def _over_limit(self) -> bool:
+        return len(self._queue) > self.max_messages or self._size > self.max_size
+
+    async def send_text(self, data: str) -> None:
+        """Queue a message for the client and return without waiting for it."""
+        if self._closed:
+            raise RuntimeError(f"Connection of client {self.client_uid} is closed.")
+
+        item = _Outbound(data)
+        # The first queued message may be in the middle of being sent
+        if (
+            item.type == "full-text"
+            and len(self._queue) > 1
+            and self._queue[-1].type == "full-text"
+        ):
+            # The client would show the newer text right after the older one
+            self._size -= self._queue.pop().size
+            self.coalesced += 1
+
+        if self.slow_consumer_policy == "wait":
+            while self._queue and not self._closed:
+                if self._size + item.size <= self.max_size and (
+                    len(self._queue) < self.max_messages
+                ):
+                    break
+                self._has_room.clear()
+                await self._has_room.wait()
+            if self._closed:
+                raise RuntimeError(f"Connection of client {self.client_uid} is closed.")
+
+        self._queue.append(item)
+        self._size += item.size
+        self.peak_messages = max(self.peak_messages, len(self._queue))
+        self.peak_size = max(self.peak_size, self._size)
+        self._not_empty.set()
+
+        if len(self._queue) > 1 and self._over_limit():
+            # A burst of messages may only have kept the writer from running
+            await asyncio.sleep(0)
+            if len(self._queue) > 1 and self._over_limit():
+                await self._handle_slow_consumer()
+
+    async def _handle_slow_consumer(self) -> None:
+        if self.slow_consumer_policy == "drop_stale_audio":
+            self._drop_stale_audio()
+            if not self._over_limit():
+                return
+        logger.warning(
+            f"Disconnecting slow client {self.client_uid}: {len(self._queue)} "
+            f"messages ({self._size} characters) not sent."
+        )
+        await self.close(
+            code=SLOW_CONSUMER_CLOSE_CODE, reason="Client too slow to receive"
+        )
+
+    def _drop_stale_audio(self) -> None:
+        """Strip the audio of the oldest queued audio messages until under limit."""
+        dropped = 0
+        for item in list(self._queue)[1:]:
+            if not self._over_limit():
+                break
+            if item.type != "audio":
+                continue
+            payload = json_codec.loads(item.text)
+            if not payload.get("audio"):
+                continue
+            payload["audio"] = None
+            payload["volumes"] = []
+            self._size -= item.size
+            item.text = json_codec.dumps(payload)
+            item.size = len(item.text)
+            self._size += item.size
+            dropped += 1
+        if dropped:
+            self.audio_dropped += dropped
+            logger.debug(
+                f"Client {self.client_uid} is behind, dropped the audio of "
+                f"{dropped} queued messages."
+            )
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                await self._not_empty.wait()
+                item = self._queue[0]
+                await self.websocket.send_text(item.text)
+                self._queue.popleft()
+                self._size -= item.size
+                self.sent += 1
+                self.sent_size += item.size
+                if not self._queue:
+                    self._not_empty.clear()
+                if not self._over_limit():
+                    self._has_room.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The receive loop sees the disconnect and cleans up
+            logger.debug(f"Stopped sending to client {self.client_uid}: {e}")
+            self._stop()
+
+    def _stop(self) -> None:
+        self._closed = True
+        self._queue.clear()
+        self._size = 0
+        self._has_room.set()
+        _queues.pop(self.client_uid, None)
+
+    async def aclose(self) -> None:
+        """Stop the writer task, dropping the messages not sent yet."""
+        if not self._closed:
+            logger.debug(f"Send queue of client {self.client_uid}: {self.stats()}")
+        self._stop()
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        """Stop sending and close the websocket."""
+        await self.aclose()
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception as e:
+            logger.debug(f"Error closing websocket of client {self.client_uid}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued_messages": len(self._queue),
+            "queued_size": self._size,
+            "peak_messages": self.peak_messages,
+            "peak_size": self.peak_size,
+            "sent": self.sent,
+            "sent_size": self.sent_size,
+            "coalesced": self.coalesced,
+            "audio_dropped": self.audio_dropped,
+        }
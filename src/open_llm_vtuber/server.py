@@ -17,6 +17,15 @@ from starlette.staticfiles import StaticFiles as StarletteStaticFiles
 from .routes import init_client_ws_route, init_webtool_routes, init_proxy_route
 from .service_context import ServiceContext
 from .config_manager.utils import Config
+from .utils.executor_pool import configure_executor_pools
+from .agent.stateless_llm.llm_client_manager import (
+    configure_llm_clients,
+    close_llm_clients,
+)
+from .mcpp.session_pool import close_mcp_session_pool, start_mcp_servers
+from .chat_history_manager import configure_chat_history, close_chat_history
+from .send_queue import configure_send_queues
+from .client_inbox import configure_receive_queues
 
 
 # Create a custom StaticFiles class that adds CORS headers
@@ -79,6 +88,28 @@ class WebSocketServer:
         )  # Use provided context or initialize a new empty one waiting to be loaded
         # It will be populated during the initialize method call
 
+        # Size the dedicated ASR / TTS / local LLM worker pools
+        configure_executor_pools(config.system_config.executor_pools.model_dump())
+
+        # Pooled HTTP clients shared by every session's remote LLM
+        configure_llm_clients(config.system_config.llm_http_client.model_dump())
+        self.app.add_event_handler("shutdown", close_llm_clients)
+
+        # How chat history appends are flushed to disk
+        configure_chat_history(config.system_config.chat_history.model_dump())
+        self.app.add_event_handler("shutdown", close_chat_history)
+
+        # Limits of the per-client outbound message queues
+        configure_send_queues(config.system_config.send_queue.model_dump())
+
+        # Limits of the per-client inbound message lanes
+        configure_receive_queues(config.system_config.receive_queue.model_dump())
+
+        # MCP servers are shared by every session. They run on the serving
+        # event loop from startup and are stopped with the server
+        self.app.add_event_handler("startup", self._start_mcp_servers)
+        self.app.add_event_handler("shutdown", close_mcp_session_pool)
+
         # Add global CORS middleware
         self.app.add_middleware(
             CORSMiddleware,
@@ -152,6 +183,25 @@ class WebSocketServer:
         """Asynchronously load the service context from config.
         Calling this function is needed if default_context_cache was not provided to the constructor."""
         await self.default_context_cache.load_from_config(self.config)
+        # MCP servers started to list the tools belong to this event loop,
+        # which `asyncio.run` ends. Stop them cleanly, startup starts them
+        # again on the serving loop.
+        await close_mcp_session_pool()
+
+    async def _start_mcp_servers(self) -> None:
+        """Start the enabled MCP servers on the serving event loop."""
+        context = self.default_context_cache
+        settings = (
+            self.config.character_config.agent_config.agent_settings.basic_memory_agent
+        )
+        if (
+            context.mcp_server_registery
+            and settings.use_mcpp
+            and settings.mcp_enabled_servers
+        ):
+            start_mcp_servers(
+                context.mcp_server_registery, settings.mcp_enabled_servers
+            )
 
     @staticmethod
     def clean_cache():
@@ -6,6 +6,7 @@ from fastapi import WebSocket
 
 from prompts import prompt_loader
 from .live2d_model import Live2dModel
+from .utils import json_codec
 from .asr.asr_interface import ASRInterface
 from .tts.tts_interface import TTSInterface
 from .vad.vad_interface import VADInterface
@@ -69,6 +70,9 @@ class ServiceContext:
 
         self.history_uid: str = ""  # Add history_uid field
 
+        # Agent turn started early on a not yet final utterance (see SpeculativeTurn)
+        self.speculative_turn = None
+
         self.send_text: Callable = None
         self.client_uid: str = None
 
@@ -92,14 +96,20 @@ class ServiceContext:
 
     # ==== Initializers
 
-    async def _init_mcp_components(self, use_mcpp, enabled_servers):
+    async def _init_mcp_components(
+        self,
+        use_mcpp,
+        enabled_servers,
+        max_concurrent_tools: int = 4,
+        tool_timeout: float | None = 60.0,
+    ):
         """Initializes MCP components based on configuration, dynamically fetching tool info."""
         logger.debug(
             f"Initializing MCP components: use_mcpp={use_mcpp}, enabled_servers={enabled_servers}"
         )
 
-        # Reset MCP components first
-        self.mcp_server_registery = None
+        # Reset MCP components first. The registry is kept, it describes the
+        # servers of the shared session pool.
         self.tool_manager = None
         self.mcp_client = None
         self.tool_executor = None
@@ -108,7 +118,7 @@ class ServiceContext:
 
         if use_mcpp and enabled_servers:
             # 1. Initialize ServerRegistry
-            self.mcp_server_registery = ServerRegistry()
+            self.mcp_server_registery = self.mcp_server_registery or ServerRegistry()
             logger.info("ServerRegistry initialized or referenced.")
 
             # 2. Use ToolAdapter to get the MCP prompt and tools
@@ -120,29 +130,22 @@ class ServiceContext:
                 return  # Exit if ToolAdapter is mandatory and not initialized
 
             try:
-                (
-                    mcp_prompt_string,
-                    openai_tools,
-                    claude_tools,
-                ) = await self.tool_adapter.get_tools(enabled_servers)
+                catalog = await self.tool_adapter.get_tool_catalog(enabled_servers)
                 # Store the generated prompt string
-                self.mcp_prompt = mcp_prompt_string
+                self.mcp_prompt = catalog.prompt
                 logger.info(
                     f"Dynamically generated MCP prompt string (length: {len(self.mcp_prompt)})."
                 )
                 logger.info(
-                    f"Dynamically formatted tools - OpenAI: {len(openai_tools)}, Claude: {len(claude_tools)}."
+                    f"Dynamically formatted tools - OpenAI: {len(catalog.openai_tools)}, Claude: {len(catalog.claude_tools)}."
                 )
 
                 # 3. Initialize ToolManager with the fetched formatted tools
-
-                _, raw_tools_dict = await self.tool_adapter.get_server_and_tool_info(
-                    enabled_servers
-                )
+                # The catalog is cached and shared, the session gets copies
                 self.tool_manager = ToolManager(
-                    formatted_tools_openai=openai_tools,
-                    formatted_tools_claude=claude_tools,
-                    initial_tools_dict=raw_tools_dict,
+                    formatted_tools_openai=list(catalog.openai_tools),
+                    formatted_tools_claude=list(catalog.claude_tools),
+                    initial_tools_dict=dict(catalog.tools),
                 )
                 logger.info("ToolManager initialized with dynamically fetched tools.")
 
@@ -168,7 +171,12 @@ class ServiceContext:
 
             # 5. Initialize ToolExecutor
             if self.mcp_client and self.tool_manager:
-                self.tool_executor = ToolExecutor(self.mcp_client, self.tool_manager)
+                self.tool_executor = ToolExecutor(
+                    self.mcp_client,
+                    self.tool_manager,
+                    max_concurrent_tools=max_concurrent_tools,
+                    tool_timeout=tool_timeout,
+                )
                 logger.info("ToolExecutor initialized for this session.")
             else:
                 logger.warning(
@@ -190,6 +198,9 @@ class ServiceContext:
     async def close(self):
         """Clean up resources, especially the MCPClient."""
         logger.info("Closing ServiceContext resources...")
+        if self.speculative_turn:
+            await self.speculative_turn.cancel()
+            self.speculative_turn = None
         if self.mcp_client:
             logger.info(f"Closing MCPClient for context instance {id(self)}...")
             await self.mcp_client.aclose()
@@ -230,7 +241,6 @@ class ServiceContext:
         self.asr_engine = asr_engine
         self.tts_engine = tts_engine
         self.vad_engine = vad_engine
-        self.agent_engine = agent_engine
         self.translate_engine = translate_engine
         # Load potentially shared components by reference
         self.mcp_server_registery = mcp_server_registery
@@ -239,9 +249,21 @@ class ServiceContext:
         self.client_uid = client_uid
 
         # Initialize session-specific MCP components
+        basic_memory_settings = (
+            self.character_config.agent_config.agent_settings.basic_memory_agent
+        )
         await self._init_mcp_components(
-            self.character_config.agent_config.agent_settings.basic_memory_agent.use_mcpp,
-            self.character_config.agent_config.agent_settings.basic_memory_agent.mcp_enabled_servers,
+            basic_memory_settings.use_mcpp,
+            basic_memory_settings.mcp_enabled_servers,
+            basic_memory_settings.mcp_max_concurrent_tools,
+            basic_memory_settings.mcp_tool_timeout,
+        )
+
+        # Share the agent's LLM and tool schemas, but keep the conversation
+        # state (memory, interrupt flag) separate for every session
+        self.agent_engine = agent_engine.create_session(
+            tool_manager=self.tool_manager,
+            tool_executor=self.tool_executor,
         )
 
         logger.debug(f"Loaded service context with cache: {character_config}")
@@ -291,9 +313,14 @@ class ServiceContext:
             self.tool_adapter = ToolAdapter(server_registery=self.mcp_server_registery)
 
         # Initialize MCP Components before initializing Agent
+        basic_memory_settings = (
+            config.character_config.agent_config.agent_settings.basic_memory_agent
+        )
         await self._init_mcp_components(
-            config.character_config.agent_config.agent_settings.basic_memory_agent.use_mcpp,
-            config.character_config.agent_config.agent_settings.basic_memory_agent.mcp_enabled_servers,
+            basic_memory_settings.use_mcpp,
+            basic_memory_settings.mcp_enabled_servers,
+            basic_memory_settings.mcp_max_concurrent_tools,
+            basic_memory_settings.mcp_tool_timeout,
         )
 
         # init agent from character config
@@ -520,7 +547,7 @@ class ServiceContext:
 
                 # Send responses to client
                 await websocket.send_text(
-                    json.dumps(
+                    json_codec.dumps(
                         {
                             "type": "set-model-and-conf",
                             "model_info": self.live2d_model.model_info,
@@ -531,7 +558,7 @@ class ServiceContext:
                 )
 
                 await websocket.send_text(
-                    json.dumps(
+                    json_codec.dumps(
                         {
                             "type": "config-switched",
                             "message": f"Switched to config: {config_file_name}",
@@ -549,7 +576,7 @@ class ServiceContext:
             logger.error(f"Error switching configuration: {e}")
             logger.debug(self)
             await websocket.send_text(
-                json.dumps(
+                json_codec.dumps(
                     {
                         "type": "error",
                         "message": f"Error switching configuration: {str(e)}",
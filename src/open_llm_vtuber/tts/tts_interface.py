@@ -1,16 +1,18 @@
 import abc
 import os
-import asyncio
 
 from loguru import logger
 
+from ..utils.executor_pool import run_in_pool
+
 
 class TTSInterface(metaclass=abc.ABCMeta):
     async def async_generate_audio(self, text: str, file_name_no_ext=None) -> str:
         """
         Asynchronously generate speech audio file using TTS.
 
-        By default, this runs the synchronous generate_audio in a coroutine.
+        By default, this runs the synchronous generate_audio in the dedicated,
+        bounded TTS executor pool.
         Subclasses can override this method to provide true async implementation.
 
         text: str
@@ -22,7 +24,7 @@ class TTSInterface(metaclass=abc.ABCMeta):
         str: the path to the generated audio file
 
         """
-        return await asyncio.to_thread(self.generate_audio, text, file_name_no_ext)
+        return await run_in_pool("tts", self.generate_audio, text, file_name_no_ext)
 
     @abc.abstractmethod
     def generate_audio(self, text: str, file_name_no_ext=None) -> str:
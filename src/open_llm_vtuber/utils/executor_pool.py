@@ -0,0 +1,272 @@
+"""
+Bounded thread pools for blocking inference work.
+
+ASR, TTS and in-process LLM backends are synchronous and CPU/GPU heavy. Running
+them on the default asyncio executor lets one busy stage starve every other
+stage, so each engine category gets its own sized pool with admission control
+(a bounded wait queue and a queue timeout) and basic queue metrics.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Literal, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+PoolCategory = Literal["asr", "tts", "llm_local"]
+
+# Used until `configure_executor_pools` is called with the system config.
+DEFAULT_POOL_SETTINGS: Dict[str, Dict[str, Any]] = {
+    "asr": {"max_workers": 1, "max_queue_size": 8, "queue_timeout": 30.0},
+    "tts": {"max_workers": 2, "max_queue_size": 32, "queue_timeout": 60.0},
+    "llm_local": {"max_workers": 1, "max_queue_size": 4, "queue_timeout": 120.0},
+}
+
+
+class PoolOverloadedError(RuntimeError):
+    """Raised when a pool refuses or gives up on a job before it starts."""
+
+
+class PoolQueueFullError(PoolOverloadedError):
+    """Raised when the wait queue of a pool is already full."""
+
+
+class PoolQueueTimeoutError(PoolOverloadedError):
+    """Raised when a job waited longer than the pool's queue timeout."""
+
+
+class BoundedExecutor:
+    """A fixed-size thread pool with a bounded, timed wait queue.
+
+    Jobs wait for a free worker on the event loop (not inside the thread pool),
+    so a job that is rejected or times out never occupies a worker thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_queue_size: int,
+        queue_timeout: float | None = None,
+    ):
+        """
+        Args:
+            name: Pool name, used in logs and metrics.
+            max_workers: Number of worker threads.
+            max_queue_size: Maximum number of jobs waiting for a worker.
+                0 means jobs are rejected whenever all workers are busy.
+            queue_timeout: Seconds a job may wait for a worker before it is
+                rejected. None waits forever.
+        """
+        if max_workers < 1:
+            raise ValueError(f"Pool '{name}': max_workers must be at least 1")
+        if max_queue_size < 0:
+            raise ValueError(f"Pool '{name}': max_queue_size must not be negative")
+
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-worker"
+        )
+        # The semaphore is bound to the loop that first uses it, so it is
+        # recreated if the pool is used from a different event loop.
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._total_run_time = 0.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking function in the pool and await its result.
+
+        Args:
+            func: The synchronous function to run.
+            *args: Positional arguments for `func`.
+            **kwargs: Keyword arguments for `func`.
+
+        Returns:
+            The return value of `func`.
+
+        Raises:
+            PoolQueueFullError: If the wait queue is full.
+            PoolQueueTimeoutError: If no worker became free within `queue_timeout`.
+        """
+        semaphore = self._get_semaphore()
+        self._submitted += 1
+
+        if self._running + self._queued >= self.max_workers + self.max_queue_size:
+            self._rejected += 1
+            logger.warning(
+                f"Executor pool '{self.name}' is full "
+                f"({self._running} running, {self._queued} queued). Rejecting job."
+            )
+            raise PoolQueueFullError(
+                f"The {self.name} worker pool is overloaded, please try again later."
+            )
+
+        enqueued_at = time.perf_counter()
+        self._queued += 1
+        try:
+            if semaphore.locked():
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+            else:
+                await semaphore.acquire()
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            logger.warning(
+                f"Job waited more than {self.queue_timeout}s for executor pool "
+                f"'{self.name}'. Giving up."
+            )
+            raise PoolQueueTimeoutError(
+                f"Timed out waiting for a free {self.name} worker."
+            ) from None
+        finally:
+            self._queued -= 1
+
+        wait_time = time.perf_counter() - enqueued_at
+        self._total_wait_time += wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
+        if wait_time > 1.0:
+            logger.debug(f"Job waited {wait_time:.2f}s for pool '{self.name}'.")
+
+        self._running += 1
+        started_at = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        def _finish(future: Future) -> None:
+            self._total_run_time += time.perf_counter() - started_at
+            self._running -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+            semaphore.release()
+
+        def _on_done(future: Future) -> None:
+            # Called from the worker thread once the job really finishes, even
+            # if the awaiting coroutine was cancelled, so a worker slot is only
+            # handed to the next job when the thread is actually free.
+            try:
+                loop.call_soon_threadsafe(_finish, future)
+            except RuntimeError:
+                pass  # The event loop is already closed
+
+        try:
+            future = self._executor.submit(func, *args, **kwargs)
+        except BaseException:
+            self._running -= 1
+            semaphore.release()
+            raise
+        future.add_done_callback(_on_done)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the pool's queue and timing metrics."""
+        started = self._submitted - self._rejected - self._timed_out - self._queued
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "queue_timeout": self.queue_timeout,
+            "running": self._running,
+            "queue_length": self._queued,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+            "avg_wait_time": self._total_wait_time / started if started else 0.0,
+            "max_wait_time": self._max_wait_time,
+            "avg_run_time": (
+                self._total_run_time / (self._completed + self._failed)
+                if self._completed + self._failed
+                else 0.0
+            ),
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Shut down the worker threads.
+
+        Args:
+            wait: Whether to block until running jobs finish.
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_pools: Dict[str, BoundedExecutor] = {}
+
+
+def configure_executor_pools(pool_settings: Dict[str, Dict[str, Any]]) -> None:
+    """(Re)create the process-wide executor pools.
+
+    Args:
+        pool_settings: Mapping of pool category to the keyword arguments of
+            `BoundedExecutor` (max_workers, max_queue_size, queue_timeout).
+            Categories that are left out keep their default settings.
+    """
+    for category, defaults in DEFAULT_POOL_SETTINGS.items():
+        settings = {**defaults, **(pool_settings.get(category) or {})}
+        old_pool = _pools.get(category)
+        _pools[category] = BoundedExecutor(name=category, **settings)
+        if old_pool:
+            old_pool.shutdown(wait=False)
+        logger.info(
+            f"Executor pool '{category}': {settings['max_workers']} workers, "
+            f"queue size {settings['max_queue_size']}, "
+            f"queue timeout {settings['queue_timeout']}s"
+        )
+
+
+def get_executor_pool(category: PoolCategory) -> BoundedExecutor:
+    """Get the executor pool for an engine category, creating it with default
+    settings if the pools have not been configured yet."""
+    pool = _pools.get(category)
+    if pool is None:
+        if category not in DEFAULT_POOL_SETTINGS:
+            raise ValueError(f"Unknown executor pool category: {category}")
+        pool = BoundedExecutor(name=category, **DEFAULT_POOL_SETTINGS[category])
+        _pools[category] = pool
+    return pool
+
+
+async def run_in_pool(
+    category: PoolCategory, func: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Run a blocking function in the executor pool of the given category.
+
+    Args:
+        category: The engine category ("asr", "tts" or "llm_local").
+        func: The synchronous function to run.
+        *args: Positional arguments for `func`.
+        **kwargs: Keyword arguments for `func`.
+
+    Returns:
+        The return value of `func`.
+    """
+    return await get_executor_pool(category).run(func, *args, **kwargs)
+
+
+def get_executor_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the metrics of every executor pool that has been created."""
+    return {category: pool.stats() for category, pool in _pools.items()}
@@ -0,0 +1,142 @@
+"""
+JSON encoding and decoding of websocket messages.
+
+Every message to and from the frontend is JSON, and audio messages carry
+large base64 strings, volume lists and, from the microphone, long lists of
+samples. `dumps` and `loads` use the fastest backend installed:
+
+- "orjson" (`pip install orjson`)
+- "msgspec" (`pip install msgspec`)
+- "json", the standard library, always available
+
+The standard library backend writes exactly what `json.dumps` always did. The
+others write compact JSON without escaping non-ASCII characters, which any
+JSON parser reads the same. Another backend can be added with
+`register_json_backend` and selected with `use_json_backend`.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class JSONBackend:
+    name: str
+    dumps: Callable[[Any], str]
+    loads: Callable[[str | bytes], Any]
+
+
+def _stdlib_backend() -> JSONBackend:
+    # Default arguments take the fastest path of the C encoder
+    return JSONBackend("json", json.dumps, json.loads)
+
+
+def _orjson_backend() -> JSONBackend:
+    import orjson
+
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=options).decode("utf-8")
+
+    # orjson.JSONDecodeError is a json.JSONDecodeError
+    return JSONBackend("orjson", dumps, orjson.loads)
+
+
+def _msgspec_backend() -> JSONBackend:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj: Any) -> str:
+        return encoder.encode(obj).decode("utf-8")
+
+    def loads(data: str | bytes) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            # Callers catch the error of the standard library
+            doc = data if isinstance(data, str) else data.decode("utf-8", "replace")
+            raise json.JSONDecodeError(str(e), doc, 0) from None
+
+    return JSONBackend("msgspec", dumps, loads)
+
+
+# Tried in this order by "auto"
+_factories: Dict[str, Callable[[], JSONBackend]] = {
+    "orjson": _orjson_backend,
+    "msgspec": _msgspec_backend,
+    "json": _stdlib_backend,
+}
+
+_backend: JSONBackend = _stdlib_backend()
+
+
+def register_json_backend(
+    name: str,
+    dumps: Callable[[Any], str],
+    loads: Callable[[str | bytes], Any],
+) -> None:
+    """Make a JSON library available to `use_json_backend`.
+
+    Args:
+        name: Name of the backend.
+        dumps: Encodes an object to a JSON string.
+        loads: Decodes a JSON string or bytes. Must raise json.JSONDecodeError
+            on invalid input.
+    """
+    backend = JSONBackend(name, dumps, loads)
+    _factories[name] = lambda: backend
+
+
+def use_json_backend(name: str = "auto") -> str:
+    """Select the JSON backend by name, or the fastest installed with "auto".
+
+    Returns:
+        The name of the selected backend.
+
+    Raises:
+        ImportError: If the named backend is not installed.
+        ValueError: If no backend has this name.
+    """
+    global _backend
+
+    if name == "auto":
+        for candidate in _factories:
+            try:
+                _backend = _factories[candidate]()
+                break
+            except ImportError:
+                continue
+    elif name in _factories:
+        _backend = _factories[name]()
+    else:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    logger.debug(f"Websocket JSON backend: {_backend.name}")
+    return _backend.name
+
+
+def get_json_backend() -> str:
+    """Return the name of the JSON backend in use."""
+    return _backend.name
+
+
+def dumps(obj: Any) -> str:
+    """Encode a message as compact JSON text."""
+    return _backend.dumps(obj)
+
+
+def loads(data: str | bytes) -> Any:
+    """Decode a JSON message.
+
+    Raises:
+        json.JSONDecodeError: If the data is not valid JSON.
+    """
+    return _backend.loads(data)
+
+
+use_json_backend()
@@ -0,0 +1,103 @@
+"""
+Incremental reading of a file field of a multipart/form-data body.
+
+`Request.form()` spools the whole upload to a temporary file before the route
+sees any of it. `MultipartFileReader` is fed the body as it arrives and hands
+back the bytes of one file field right away, so an upload can be processed
+while it is still being received. The other fields are skipped.
+"""
+
+from typing import List
+
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+class MultipartFileReader:
+    """Extracts the content of one field from a streamed multipart body."""
+
+    def __init__(self, content_type: str, field_name: str = "file") -> None:
+        """
+        Args:
+            content_type: The Content-Type header of the request, with the
+                multipart boundary.
+            field_name: Name of the form field to extract.
+
+        Raises:
+            ValueError: If the content type has no multipart boundary.
+        """
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise ValueError("Missing boundary in multipart/form-data content type")
+
+        self.field_name = field_name
+        self.filename: str | None = None
+        self.found = False
+
+        self._in_field = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._chunks: List[bytes] = []
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Parse the next bytes of the body.
+
+        Returns:
+            The bytes of the field found in `data`, possibly none.
+
+        Raises:
+            ValueError: If the body is not valid multipart data.
+        """
+        try:
+            self._parser.write(data)
+        except FormParserError as e:
+            raise ValueError(f"Invalid multipart/form-data body: {e}") from None
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        # Only the first field of that name is read
+        self._in_field = name == self.field_name and not self.found
+        if self._in_field:
+            self.found = True
+            filename = options.get(b"filename")
+            if filename is not None:
+                self.filename = filename.decode("utf-8", "replace")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field:
+            self._chunks.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_field = False
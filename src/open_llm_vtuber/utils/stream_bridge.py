@@ -0,0 +1,127 @@
+"""
+Bridge from synchronous streaming iterators to async iterators.
+
+Some backends (llama.cpp, the Letta client) only offer blocking generators.
+Iterating them in a coroutine runs every step of inference or network I/O on
+the event loop thread and freezes websocket I/O for all sessions. The bridge
+runs the iterator in a producer thread that hands items to the event loop
+through a bounded buffer.
+"""
+
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, Iterable, TypeVar
+
+from loguru import logger
+
+from .executor_pool import PoolCategory, run_in_pool
+
+T = TypeVar("T")
+
+_ITEM = "item"
+_END = "end"
+_ERROR = "error"
+
+# How often a producer blocked on a full buffer checks for cancellation
+_STOP_POLL_INTERVAL = 0.1
+
+
+class _ProducerStopped(Exception):
+    """Raised inside the producer thread when the consumer went away."""
+
+
+async def iterate_in_thread(
+    make_iterable: Callable[[], Iterable[T]],
+    max_buffered: int = 32,
+    pool: PoolCategory | None = None,
+) -> AsyncIterator[T]:
+    """Iterate a blocking iterable in a worker thread without blocking the loop.
+
+    The producer thread pauses once `max_buffered` items are waiting to be
+    consumed. When the consumer stops iterating (e.g. the conversation task is
+    cancelled on interrupt), the producer stops at its next item and the
+    iterator is closed, which ends generation for generator-based backends.
+
+    Args:
+        make_iterable: Called in the worker thread to create the iterable, so
+            that any blocking setup also stays off the event loop.
+        max_buffered: Maximum number of items produced ahead of the consumer.
+        pool: Executor pool to produce in. The producer then holds a worker of
+            that pool for the whole stream, which bounds concurrent
+            generations. None runs it in a dedicated daemon thread.
+
+    Yields:
+        The items of the iterable, in order.
+
+    Raises:
+        Any exception raised by `make_iterable` or the iteration.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = threading.Semaphore(max_buffered)
+    stop = threading.Event()
+
+    def send(kind: str, value=None) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (kind, value))
+        except RuntimeError:
+            # The event loop is closed, nobody is listening anymore
+            stop.set()
+            raise _ProducerStopped() from None
+
+    def produce() -> None:
+        iterator = None
+        try:
+            # A job that waited in the pool may have been abandoned meanwhile,
+            # and creating the iterable can already run inference (prefill)
+            if stop.is_set():
+                raise _ProducerStopped()
+            iterator = iter(make_iterable())
+            for item in iterator:
+                while not slots.acquire(timeout=_STOP_POLL_INTERVAL):
+                    if stop.is_set():
+                        raise _ProducerStopped()
+                if stop.is_set():
+                    raise _ProducerStopped()
+                send(_ITEM, item)
+            send(_END)
+        except _ProducerStopped:
+            pass
+        except BaseException as e:
+            if not stop.is_set():
+                send(_ERROR, e)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    logger.debug(f"Error closing the source iterator: {e}")
+
+    producer: asyncio.Future | None = None
+    if pool is None:
+        threading.Thread(target=produce, name="stream-bridge", daemon=True).start()
+    else:
+        producer = asyncio.ensure_future(run_in_pool(pool, produce))
+
+        def _on_producer_done(future: asyncio.Future) -> None:
+            # The pool refused the job (queue full / timeout) before it started
+            if not future.cancelled() and future.exception() is not None:
+                queue.put_nowait((_ERROR, future.exception()))
+
+        producer.add_done_callback(_on_producer_done)
+
+    try:
+        while True:
+            kind, value = await queue.get()
+            if kind == _END:
+                return
+            if kind == _ERROR:
+                raise value
+            slots.release()
+            yield value
+    finally:
+        stop.set()
+        if producer is not None:
+            # Gives up the job if it is still waiting for a worker of the pool
+            producer.cancel()
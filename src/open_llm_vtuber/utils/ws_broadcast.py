@@ -0,0 +1,52 @@
+"""
+Sending one message to several websocket clients.
+
+The message is encoded once by the caller and sent to every recipient
+concurrently, each with its own timeout. A slow or broken client only
+delays and fails its own send.
+"""
+
+import asyncio
+from typing import Dict, Mapping
+
+from fastapi import WebSocket
+
+# Seconds a broadcast waits for one recipient
+BROADCAST_SEND_TIMEOUT = 10.0
+
+
+async def send_text_to_all(
+    connections: Mapping[str, WebSocket],
+    text: str,
+    timeout: float = BROADCAST_SEND_TIMEOUT,
+) -> Dict[str, BaseException]:
+    """Send a text frame to every websocket concurrently.
+
+    Args:
+        connections: Recipients by client uid.
+        text: The encoded message.
+        timeout: Seconds to wait for each recipient.
+
+    Returns:
+        The failed sends by client uid: the exception raised, or
+        asyncio.TimeoutError if the recipient was too slow.
+    """
+    if not connections:
+        return {}
+    uids = list(connections)
+    results = await asyncio.gather(
+        *(asyncio.wait_for(connections[uid].send_text(text), timeout) for uid in uids),
+        return_exceptions=True,
+    )
+    return {
+        uid: result
+        for uid, result in zip(uids, results)
+        if isinstance(result, BaseException)
+    }
+
+
+def describe_send_error(error: BaseException) -> str:
+    """Describe a failed send of `send_text_to_all` for the log."""
+    if isinstance(error, asyncio.TimeoutError):
+        return "timed out"
+    return f"{type(error).__name__}: {error}"
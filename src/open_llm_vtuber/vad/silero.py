@@ -19,6 +19,7 @@ class SileroVADConfig(BaseModel):
     required_hits: int = 3  # 3 * (0.032) = 0.1s
     required_misses: int = 24  # 24 * (0.032) = 0.8s
     smoothing_window: int = 5
+    speculative_misses: int = 0  # 0 disables speculative start
 
 
 class VADEngine(VADInterface):
@@ -31,6 +32,7 @@ class VADEngine(VADInterface):
         required_hits: int = 3,
         required_misses: int = 24,
         smoothing_window: int = 5,
+        speculative_misses: int = 0,
     ):
         self.config = SileroVADConfig(
             orig_sr=orig_sr,
@@ -40,6 +42,7 @@ class VADEngine(VADInterface):
             required_hits=required_hits,
             required_misses=required_misses,
             smoothing_window=smoothing_window,
+            speculative_misses=speculative_misses or 0,
         )
         self.model = self.load_vad_model()
         self.state = StateMachine(self.config)
@@ -90,12 +93,18 @@ class StateMachine:
         self.required_hits = config.required_hits
         self.required_misses = config.required_misses
         self.smoothing_window = config.smoothing_window
+        self.speculative_misses = config.speculative_misses
 
         self.probs = []
         self.dbs = []
         self.bytes = bytearray()
         self.miss_count = 0
         self.hit_count = 0
+        # Consecutive silent chunks since the last speech chunk, across the
+        # ACTIVE and INACTIVE states, and whether a speculative utterance was
+        # already emitted for this stretch of silence.
+        self.silence_count = 0
+        self.speculated = False
 
         self.prob_window = deque(maxlen=self.smoothing_window)
         self.db_window = deque(maxlen=self.smoothing_window)
@@ -154,8 +163,10 @@ class StateMachine:
                 and smoothed_db >= self.db_threshold
             ):
                 self.miss_count = 0
+                yield from self.cancel_speculation()
             else:
                 self.miss_count += 1
+                yield from self.speculate()
                 if self.miss_count >= self.required_misses:
                     self.state = State.INACTIVE
                     self.miss_count = 0
@@ -167,6 +178,7 @@ class StateMachine:
                 and smoothed_db >= self.db_threshold
             ):
                 self.hit_count += 1
+                yield from self.cancel_speculation()
                 if self.hit_count >= self.required_hits:
                     self.state = State.ACTIVE
                     self.hit_count = 0
@@ -174,6 +186,7 @@ class StateMachine:
             else:
                 self.hit_count = 0
                 self.miss_count += 1
+                yield from self.speculate()
                 if self.miss_count >= self.required_misses:
                     self.state = State.IDLE
                     self.miss_count = 0
@@ -182,8 +195,33 @@ class StateMachine:
                         pre_bytes = b"".join(self.pre_buffer)
                         yield self.probs, self.dbs, pre_bytes + self.bytes
                         self.reset_buffers()
+                    else:
+                        yield from self.cancel_speculation()
+                    self.silence_count = 0
+                    self.speculated = False
                     self.pre_buffer.clear()
 
+    def speculate(self):
+        """Emit the speech so far once the trailing silence reaches
+        `speculative_misses` chunks, so the caller can start the LLM early."""
+        self.silence_count += 1
+        if (
+            self.speculative_misses > 0
+            and not self.speculated
+            and self.silence_count >= self.speculative_misses
+            and len(self.probs) > 30
+        ):
+            self.speculated = True
+            pre_bytes = b"".join(self.pre_buffer)
+            yield [], [], b"<|SPECULATE|>" + pre_bytes + bytes(self.bytes)
+
+    def cancel_speculation(self):
+        """Withdraw the speculative utterance because the user kept talking."""
+        self.silence_count = 0
+        if self.speculated:
+            self.speculated = False
+            yield [], [], b"<|SPECULATE_CANCEL|>"
+
     def get_result(self, input_num, chunk_np):
         yield from self.process(input_num, chunk_np)
 
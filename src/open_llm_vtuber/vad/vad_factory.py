@@ -18,4 +18,5 @@ class VADFactory:
                 kwargs.get("required_hits"),
                 kwargs.get("required_misses"),
                 kwargs.get("smoothing_window"),
+                kwargs.get("speculative_misses", 0),
             )
@@ -2,6 +2,7 @@ from typing import Dict, List, Optional, Callable, TypedDict
 from fastapi import WebSocket, WebSocketDisconnect
 import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 import numpy as np
 from loguru import logger
@@ -14,12 +15,17 @@ from .chat_group import (
     broadcast_to_group,
 )
 from .message_handler import message_handler
+from .client_inbox import ClientInbox
 from .utils.stream_audio import prepare_audio_payload
+from .utils import json_codec
 from .chat_history_manager import (
     create_new_history,
     get_history,
     delete_history,
     get_history_list,
+    get_history_page,
+    run_history_io,
+    search_history,
 )
 from .config_manager.utils import scan_config_alts_directory, scan_bg_directory
 from .conversations.conversation_handler import (
@@ -27,6 +33,23 @@ from .conversations.conversation_handler import (
     handle_group_interrupt,
     handle_individual_interrupt,
 )
+from .conversations.speculative_turn import SpeculativeTurn
+
+
+# Largest page of messages a client can request at once
+MAX_HISTORY_PAGE_SIZE = 500
+# Largest page of search hits a client can request at once
+MAX_SEARCH_PAGE_SIZE = 100
+
+
+# One thread, as the engine keeps the speech state of the stream. Each client
+# has at most one frame in it, since its audio lane waits for the result.
+_vad_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vad-worker")
+
+
+def _detect_speech(context: ServiceContext, chunk: List[float]) -> List[bytes]:
+    """Run VAD on an audio frame, in a worker thread"""
+    return list(context.vad_engine.detect_speech(chunk))
 
 
 class MessageType(Enum):
@@ -38,6 +61,8 @@ class MessageType(Enum):
         "fetch-and-set-history",
         "create-new-history",
         "delete-history",
+        "fetch-history-page",
+        "search-history",
     ]
     CONVERSATION = ["mic-audio-end", "text-input", "ai-speak-signal"]
     CONFIG = ["fetch-configs", "switch-config"]
@@ -54,6 +79,10 @@ class WSMessage(TypedDict, total=False):
     audio: Optional[List[float]]
     images: Optional[List[str]]
     history_uid: Optional[str]
+    limit: Optional[int]
+    before: Optional[int]
+    query: Optional[str]
+    offset: Optional[int]
     file: Optional[str]
     display_text: Optional[dict]
 
@@ -81,6 +110,8 @@ class WebSocketHandler:
             "request-group-info": self._handle_group_info,
             "fetch-history-list": self._handle_history_list_request,
             "fetch-and-set-history": self._handle_fetch_history,
+            "fetch-history-page": self._handle_fetch_history_page,
+            "search-history": self._handle_search_history,
             "create-new-history": self._handle_create_history,
             "delete-history": self._handle_delete_history,
             "interrupt-signal": self._handle_interrupt,
@@ -154,11 +185,11 @@ class WebSocketHandler:
     ):
         """Send initial connection messages to the client"""
         await websocket.send_text(
-            json.dumps({"type": "full-text", "text": "Connection established"})
+            json_codec.dumps({"type": "full-text", "text": "Connection established"})
         )
 
         await websocket.send_text(
-            json.dumps(
+            json_codec.dumps(
                 {
                     "type": "set-model-and-conf",
                     "model_info": session_service_context.live2d_model.model_info,
@@ -173,7 +204,9 @@ class WebSocketHandler:
         await self.send_group_update(websocket, client_uid)
 
         # Start microphone
-        await websocket.send_text(json.dumps({"type": "control", "text": "start-mic"}))
+        await websocket.send_text(
+            json_codec.dumps({"type": "control", "text": "start-mic"})
+        )
 
     async def _init_service_context(
         self, send_text: Callable, client_uid: str
@@ -211,12 +244,27 @@ class WebSocketHandler:
             websocket: The WebSocket connection
             client_uid: Unique identifier for the client
         """
+        inbox = ClientInbox(
+            client_uid,
+            lambda data: self._handle_queued_message(websocket, client_uid, data),
+        )
         try:
             while True:
+                # Only reading here: the messages are handled by the lanes of
+                # the inbox, so a slow handler never keeps the next one unread
                 try:
-                    data = await websocket.receive_json()
+                    data = json_codec.loads(await websocket.receive_text())
                     message_handler.handle_message(client_uid, data)
-                    await self._route_message(websocket, client_uid, data)
+                    if not inbox.put(data):
+                        await websocket.send_text(
+                            json_codec.dumps(
+                                {
+                                    "type": "error",
+                                    "message": "Too many requests pending, "
+                                    f"'{data.get('type')}' was dropped.",
+                                }
+                            )
+                        )
                 except WebSocketDisconnect:
                     raise
                 except json.JSONDecodeError:
@@ -225,7 +273,7 @@ class WebSocketHandler:
                 except Exception as e:
                     logger.error(f"Error processing message: {e}")
                     await websocket.send_text(
-                        json.dumps({"type": "error", "message": str(e)})
+                        json_codec.dumps({"type": "error", "message": str(e)})
                     )
                     continue
 
@@ -235,6 +283,20 @@ class WebSocketHandler:
         except Exception as e:
             logger.error(f"Fatal error in WebSocket communication: {e}")
             raise
+        finally:
+            await inbox.aclose()
+
+    async def _handle_queued_message(
+        self, websocket: WebSocket, client_uid: str, data: WSMessage
+    ) -> None:
+        """Handle a message taken from one of the client's inbox lanes"""
+        try:
+            await self._route_message(websocket, client_uid, data)
+        except Exception as e:
+            logger.error(f"Error processing message: {e}")
+            await websocket.send_text(
+                json_codec.dumps({"type": "error", "message": str(e)})
+            )
 
     async def _route_message(
         self, websocket: WebSocket, client_uid: str, data: WSMessage
@@ -347,7 +409,7 @@ class WebSocketHandler:
         if group:
             current_members = self.chat_group_manager.get_group_members(client_uid)
             await websocket.send_text(
-                json.dumps(
+                json_codec.dumps(
                     {
                         "type": "group-update",
                         "members": current_members,
@@ -357,7 +419,7 @@ class WebSocketHandler:
             )
         else:
             await websocket.send_text(
-                json.dumps(
+                json_codec.dumps(
                     {
                         "type": "group-update",
                         "members": [],
@@ -396,9 +458,11 @@ class WebSocketHandler:
     ) -> None:
         """Handle request for chat history list"""
         context = self.client_contexts[client_uid]
-        histories = get_history_list(context.character_config.conf_uid)
+        histories = await run_history_io(
+            get_history_list, context.character_config.conf_uid
+        )
         await websocket.send_text(
-            json.dumps({"type": "history-list", "histories": histories})
+            json_codec.dumps({"type": "history-list", "histories": histories})
         )
 
     async def _handle_fetch_history(
@@ -412,21 +476,112 @@ class WebSocketHandler:
         context = self.client_contexts[client_uid]
         # Update history_uid in service context
         context.history_uid = history_uid
-        context.agent_engine.set_memory_from_history(
+        await context.agent_engine.set_memory_from_history(
             conf_uid=context.character_config.conf_uid,
             history_uid=history_uid,
         )
 
-        messages = [
-            msg
-            for msg in get_history(
-                context.character_config.conf_uid,
-                history_uid,
+        if data.get("limit") is None:
+            # Clients without pagination get the whole history
+            history = await run_history_io(
+                get_history, context.character_config.conf_uid, history_uid
+            )
+            cursor = None
+        else:
+            history, cursor = await self._read_history_page(context, data)
+        messages = [msg for msg in history if msg["role"] != "system"]
+        await websocket.send_text(
+            json_codec.dumps(
+                {
+                    "type": "history-data",
+                    "messages": messages,
+                    "cursor": cursor,
+                    "has_more": cursor is not None,
+                }
+            )
+        )
+
+    async def _read_history_page(
+        self, context: ServiceContext, data: WSMessage
+    ) -> tuple[list, int | None]:
+        """Read the page of messages a client asked for, newest page first"""
+        limit = data.get("limit")
+        before = data.get("before")
+        if not isinstance(limit, int) or limit < 1:
+            limit = MAX_HISTORY_PAGE_SIZE
+        if not isinstance(before, int) or before < 0:
+            before = None
+        return await run_history_io(
+            get_history_page,
+            context.character_config.conf_uid,
+            data["history_uid"],
+            min(limit, MAX_HISTORY_PAGE_SIZE),
+            before,
+        )
+
+    async def _handle_fetch_history_page(
+        self, websocket: WebSocket, client_uid: str, data: WSMessage
+    ) -> None:
+        """Handle fetching older messages of a history, one page at a time
+
+        The client sends the cursor of the previous page as `before`.
+        """
+        history_uid = data.get("history_uid")
+        if not history_uid:
+            return
+
+        context = self.client_contexts[client_uid]
+        history, cursor = await self._read_history_page(context, data)
+        await websocket.send_text(
+            json_codec.dumps(
+                {
+                    "type": "history-page",
+                    "history_uid": history_uid,
+                    "messages": [msg for msg in history if msg["role"] != "system"],
+                    "cursor": cursor,
+                    "has_more": cursor is not None,
+                }
             )
-            if msg["role"] != "system"
-        ]
+        )
+
+    async def _handle_search_history(
+        self, websocket: WebSocket, client_uid: str, data: WSMessage
+    ) -> None:
+        """Handle a full-text search of the histories of the current character
+
+        Hits are ranked by relevance. The client asks for the following
+        pages with `offset`, and can restrict the search to `history_uid`.
+        """
+        query = data.get("query")
+        if not isinstance(query, str):
+            return
+
+        limit = data.get("limit")
+        offset = data.get("offset")
+        if not isinstance(limit, int) or limit < 1:
+            limit = 20
+        if not isinstance(offset, int) or offset < 0:
+            offset = 0
+
+        context = self.client_contexts[client_uid]
+        hits, has_more = await run_history_io(
+            search_history,
+            context.character_config.conf_uid,
+            query,
+            min(limit, MAX_SEARCH_PAGE_SIZE),
+            offset,
+            data.get("history_uid") or None,
+        )
         await websocket.send_text(
-            json.dumps({"type": "history-data", "messages": messages})
+            json_codec.dumps(
+                {
+                    "type": "history-search-results",
+                    "query": query,
+                    "results": hits,
+                    "offset": offset,
+                    "has_more": has_more,
+                }
+            )
         )
 
     async def _handle_create_history(
@@ -434,15 +589,17 @@ class WebSocketHandler:
     ) -> None:
         """Handle creation of new chat history"""
         context = self.client_contexts[client_uid]
-        history_uid = create_new_history(context.character_config.conf_uid)
+        history_uid = await run_history_io(
+            create_new_history, context.character_config.conf_uid
+        )
         if history_uid:
             context.history_uid = history_uid
-            context.agent_engine.set_memory_from_history(
+            await context.agent_engine.set_memory_from_history(
                 conf_uid=context.character_config.conf_uid,
                 history_uid=history_uid,
             )
             await websocket.send_text(
-                json.dumps(
+                json_codec.dumps(
                     {
                         "type": "new-history-created",
                         "history_uid": history_uid,
@@ -459,12 +616,11 @@ class WebSocketHandler:
             return
 
         context = self.client_contexts[client_uid]
-        success = delete_history(
-            context.character_config.conf_uid,
-            history_uid,
+        success = await run_history_io(
+            delete_history, context.character_config.conf_uid, history_uid
         )
         await websocket.send_text(
-            json.dumps(
+            json_codec.dumps(
                 {
                     "type": "history-deleted",
                     "success": success,
@@ -493,13 +649,31 @@ class WebSocketHandler:
         context = self.client_contexts[client_uid]
         chunk = data.get("audio", [])
         if chunk:
-            for audio_bytes in context.vad_engine.detect_speech(chunk):
+            # VAD inference runs off the event loop. Every frame handed to VAD
+            # is processed: the engine keeps the state of the stream, so when
+            # VAD falls behind, the audio lane drops whole frames before it.
+            results = await asyncio.get_running_loop().run_in_executor(
+                _vad_executor, _detect_speech, context, chunk
+            )
+            for audio_bytes in results:
                 if audio_bytes == b"<|PAUSE|>":
                     await websocket.send_text(
-                        json.dumps({"type": "control", "text": "interrupt"})
+                        json_codec.dumps({"type": "control", "text": "interrupt"})
                     )
                 elif audio_bytes == b"<|RESUME|>":
                     pass
+                elif audio_bytes.startswith(b"<|SPECULATE|>"):
+                    # Trailing silence: start the LLM before the utterance is final
+                    await self._start_speculative_turn(
+                        client_uid,
+                        np.frombuffer(
+                            audio_bytes[len(b"<|SPECULATE|>") :], dtype=np.int16
+                        ).astype(np.float32),
+                    )
+                elif audio_bytes == b"<|SPECULATE_CANCEL|>":
+                    if context.speculative_turn:
+                        await context.speculative_turn.cancel()
+                        context.speculative_turn = None
                 elif len(audio_bytes) > 1024:
                     # Detected audio activity (voice)
                     self.received_data_buffers[client_uid] = np.append(
@@ -507,9 +681,31 @@ class WebSocketHandler:
                         np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32),
                     )
                     await websocket.send_text(
-                        json.dumps({"type": "control", "text": "mic-audio-end"})
+                        json_codec.dumps({"type": "control", "text": "mic-audio-end"})
                     )
 
+    async def _start_speculative_turn(self, client_uid: str, audio: np.ndarray) -> None:
+        """Start a speculative agent turn on the speech heard so far"""
+        context = self.client_contexts[client_uid]
+        if context.speculative_turn:
+            await context.speculative_turn.cancel()
+            context.speculative_turn = None
+
+        # Group turns are shared by several agents and cannot be rolled back
+        group = self.chat_group_manager.get_client_group(client_uid)
+        if (group and len(group.members) > 1) or not SpeculativeTurn.is_supported(
+            context
+        ):
+            return
+
+        task = self.current_conversation_tasks.get(client_uid)
+        if task and not task.done():
+            # The previous response is still being delivered
+            return
+
+        context.speculative_turn = SpeculativeTurn(context, audio)
+        context.speculative_turn.start()
+
     async def _handle_conversation_trigger(
         self, websocket: WebSocket, client_uid: str, data: WSMessage
     ) -> None:
@@ -535,7 +731,7 @@ class WebSocketHandler:
         context = self.client_contexts[client_uid]
         config_files = scan_config_alts_directory(context.system_config.config_alts_dir)
         await websocket.send_text(
-            json.dumps({"type": "config-files", "configs": config_files})
+            json_codec.dumps({"type": "config-files", "configs": config_files})
         )
 
     async def _handle_config_switch(
@@ -553,7 +749,7 @@ class WebSocketHandler:
         """Handle fetching available background images"""
         bg_files = scan_bg_directory()
         await websocket.send_text(
-            json.dumps({"type": "background-files", "files": bg_files})
+            json_codec.dumps({"type": "background-files", "files": bg_files})
         )
 
     async def _handle_audio_play_start(
@@ -591,7 +787,7 @@ class WebSocketHandler:
             context = self.default_context_cache
 
         await websocket.send_text(
-            json.dumps(
+            json_codec.dumps(
                 {
                     "type": "set-model-and-conf",
                     "model_info": context.live2d_model.model_info,
@@ -607,6 +803,6 @@ class WebSocketHandler:
     ) -> None:
         """Handle heartbeat messages from clients"""
         try:
-            await websocket.send_json({"type": "heartbeat-ack"})
+            await websocket.send_text(json_codec.dumps({"type": "heartbeat-ack"}))
         except Exception as e:
             logger.error(f"Error sending heartbeat acknowledgment: {e}")
@@ -0,0 +1,58 @@
+"""Shared fixtures of the test suite."""
+
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from scripts.mock_llm_server import MockLLM, MockSettings, create_app
+
+
+@pytest.fixture
+def mock_llm_server():
+    """Start mock LLM servers (scripts/mock_llm_server.py) on free local ports.
+
+    Call the fixture with `MockSettings` fields to start a server. It returns
+    the base URL of the server and its `MockLLM`, whose settings can be
+    changed while it runs and whose `stats` count the streams.
+    """
+    servers = []
+
+    def start(**settings):
+        mock = MockLLM(MockSettings(**settings), seed=0)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        server = uvicorn.Server(
+            uvicorn.Config(create_app(mock), log_level="warning", lifespan="off")
+        )
+        thread = threading.Thread(
+            target=server.run, kwargs={"sockets": [sock]}, daemon=True
+        )
+        thread.start()
+        deadline = time.monotonic() + 5
+        while not server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Mock LLM server did not start")
+            time.sleep(0.01)
+        servers.append((server, thread, sock))
+        return f"http://127.0.0.1:{port}", mock
+
+    yield start
+
+    for server, thread, sock in servers:
+        server.should_exit = True
+        thread.join(timeout=5)
+        sock.close()
+
+
+@pytest.fixture
+def closed_port_url():
+    """URL of a local port nothing listens on."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
@@ -0,0 +1,28 @@
+"""The chat history writer thread (chat_history_writer.HistoryWriter)."""
+
+import threading
+import time
+
+from src.open_llm_vtuber.chat_history_writer import HistoryWriter
+
+
+def test_jobs_queued_behind_close_still_run():
+    writer = HistoryWriter(name="test-history-writer")
+    written = []
+    release = threading.Event()
+
+    # Keeps the thread busy so the stop and the jobs after it share a batch
+    blocker = writer.submit(release.wait, 5)
+    closer = threading.Thread(target=writer.close)
+    closer.start()
+    while writer.stats()["queued"] < 1:
+        time.sleep(0.001)
+    writer.append("h", "late", lambda key, records: written.extend(records))
+    late_call = writer.submit(lambda: "done")
+    release.set()
+
+    closer.join(5)
+    assert blocker.result(1) is True
+    assert late_call.result(1) == "done"
+    assert written == ["late"]
+    assert not writer._thread.is_alive()
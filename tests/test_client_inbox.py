@@ -0,0 +1,198 @@
+"""Receive lanes of the websocket clients (client_inbox and the receive loop)."""
+
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+from fastapi import WebSocketDisconnect
+
+from src.open_llm_vtuber.client_inbox import ClientInbox, message_lane
+from src.open_llm_vtuber.websocket_handler import WebSocketHandler
+
+# Seconds of VAD inference per raw audio frame in the simulated client
+VAD_FRAME_TIME = 0.02
+
+
+class SlowVAD:
+    """A VAD engine that blocks like model inference does."""
+
+    def detect_speech(self, chunk):
+        time.sleep(VAD_FRAME_TIME)
+        if chunk[0] == 9:
+            yield b"<|PAUSE|>"
+
+
+class FakeContext:
+    vad_engine = SlowVAD()
+
+
+class FakeWebSocket:
+    """Replays client messages, with float entries as pauses in seconds, then
+    disconnects."""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+
+    async def receive_text(self):
+        while self.messages and isinstance(self.messages[0], float):
+            await asyncio.sleep(self.messages.pop(0))
+        if not self.messages:
+            raise WebSocketDisconnect()
+        return json.dumps(self.messages.pop(0))
+
+    async def send_text(self, text):
+        self.sent.append((time.perf_counter(), json.loads(text)))
+
+
+def make_handler():
+    handler = WebSocketHandler.__new__(WebSocketHandler)
+    handler.client_contexts = {"client": FakeContext()}
+    handler.received_data_buffers = {"client": np.array([])}
+    handler.current_conversation_tasks = {}
+    return handler
+
+
+def raw_frame(first_sample=0):
+    return {"type": "raw-audio-data", "audio": [first_sample] + [0] * 511}
+
+
+def test_message_lanes():
+    assert message_lane("interrupt-signal") == "control"
+    assert message_lane("heartbeat") == "control"
+    assert message_lane("raw-audio-data") == "audio"
+    assert message_lane("mic-audio-end") == "audio"
+    assert message_lane("fetch-history-list") == "general"
+    assert message_lane(None) == "general"
+
+
+def test_interrupt_is_not_delayed_by_vad_or_history_loads():
+    handler = make_handler()
+    interrupted_at = []
+
+    async def interrupt(websocket, client_uid, data):
+        interrupted_at.append(time.perf_counter())
+
+    async def slow_history(websocket, client_uid, data):
+        await asyncio.sleep(1.0)
+        await websocket.send_text(json.dumps({"type": "history-list"}))
+
+    handler._message_handlers = {
+        "raw-audio-data": handler._handle_raw_audio_data,
+        "interrupt-signal": interrupt,
+        "heartbeat": handler._handle_heartbeat,
+        "fetch-history-list": slow_history,
+    }
+    # About 6 s of VAD work and a 1 s history load ahead of the interrupt
+    frames = [raw_frame() for _ in range(300)]
+    websocket = FakeWebSocket(
+        [{"type": "fetch-history-list"}, *frames, 0.1]
+        + [{"type": "interrupt-signal"}, {"type": "heartbeat"}, 1.5]
+    )
+
+    async def run():
+        started = time.perf_counter()
+        with pytest.raises(WebSocketDisconnect):
+            await handler.handle_websocket_communication(websocket, "client")
+        return started
+
+    started = asyncio.run(run())
+
+    assert interrupted_at and interrupted_at[0] - started < 0.5
+    sent = {message["type"]: at - started for at, message in websocket.sent}
+    assert sent["heartbeat-ack"] < 0.5
+    assert sent["history-list"] < 1.5
+
+
+def test_raw_frames_are_dropped_whole_and_oldest_first():
+    handled = []
+
+    async def run():
+        blocker = asyncio.Event()
+
+        async def handle(data):
+            handled.append(data["audio"][0])
+            await blocker.wait()
+
+        inbox = ClientInbox("client", handle, max_audio_frames=4)
+        for i in range(10):
+            inbox.put({"type": "raw-audio-data", "audio": [i, 0, 0]})
+            await asyncio.sleep(0)
+        blocker.set()
+        await asyncio.sleep(0.05)
+        stats = inbox.stats()
+        await inbox.aclose()
+        return stats
+
+    stats = asyncio.run(run())
+    # Frame 0 was being handled, 1-5 were dropped, the newest 4 were kept
+    assert handled == [0, 6, 7, 8, 9]
+    assert stats["audio_dropped"] == 5
+
+
+def test_mic_frames_are_coalesced_without_losing_samples():
+    handler = make_handler()
+    handler._message_handlers = {"mic-audio-data": handler._handle_audio_data}
+
+    async def run():
+        inbox = ClientInbox(
+            "client", lambda data: handler._route_message(None, "client", data)
+        )
+        for i in range(20):
+            inbox.put({"type": "mic-audio-data", "audio": [float(i)] * 10})
+        await asyncio.sleep(0.05)
+        stats = inbox.stats()
+        await inbox.aclose()
+        return stats
+
+    stats = asyncio.run(run())
+    buffer = handler.received_data_buffers["client"]
+    assert len(buffer) == 200
+    assert list(buffer[::10]) == [float(i) for i in range(20)]
+    assert stats["audio_coalesced"] > 0
+
+
+def test_mic_audio_end_is_handled_after_the_frames_before_it():
+    order = []
+
+    async def run():
+        async def handle(data):
+            await asyncio.sleep(0.01)
+            order.append(data["type"])
+
+        inbox = ClientInbox("client", handle)
+        inbox.put({"type": "mic-audio-data", "audio": [0.0]})
+        inbox.put({"type": "mic-audio-data", "audio": [0.0]})
+        inbox.put({"type": "mic-audio-end"})
+        inbox.put({"type": "heartbeat"})
+        await asyncio.sleep(0.1)
+        await inbox.aclose()
+
+    asyncio.run(run())
+    assert order.index("mic-audio-end") > order.index("mic-audio-data")
+    assert order[0] == "heartbeat"
+
+
+def test_general_messages_past_the_limit_are_rejected():
+    async def run():
+        blocker = asyncio.Event()
+
+        async def handle(data):
+            await blocker.wait()
+
+        inbox = ClientInbox("client", handle, max_pending_messages=2)
+        inbox.put({"type": "fetch-configs"})
+        await asyncio.sleep(0)  # The first one is being handled
+        accepted = [inbox.put({"type": "fetch-configs"}) for _ in range(3)]
+        # Control messages are never rejected
+        control = inbox.put({"type": "heartbeat"})
+        stats = inbox.stats()
+        await inbox.aclose()
+        return accepted, control, stats
+
+    accepted, control, stats = asyncio.run(run())
+    assert accepted == [True, True, False]
+    assert control
+    assert stats["rejected"] == 1
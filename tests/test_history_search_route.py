@@ -0,0 +1,56 @@
+"""The /history/search route of the web tool routes."""
+
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.open_llm_vtuber.chat_history_manager import (
+    create_new_history,
+    store_message,
+)
+from src.open_llm_vtuber.routes import init_webtool_routes
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    app = FastAPI()
+    app.include_router(init_webtool_routes(default_context_cache=None))
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.parametrize("conf_uid", ["..", "a/b", "../etc", "bad\x00uid"])
+def test_invalid_conf_uid_is_rejected(client, conf_uid):
+    response = client.get("/history/search", params={"q": "hi", "conf_uid": conf_uid})
+    assert response.status_code == 400
+    assert not os.path.exists("chat_history")
+
+
+def test_invalid_history_uid_is_rejected(client):
+    response = client.get(
+        "/history/search",
+        params={"q": "hi", "conf_uid": "alice", "history_uid": "../x"},
+    )
+    assert response.status_code == 400
+
+
+def test_character_without_history_creates_nothing(client):
+    response = client.get("/history/search", params={"q": "hi", "conf_uid": "nobody"})
+    assert response.status_code == 200
+    assert response.json()["results"] == []
+    assert not os.path.exists(os.path.join("chat_history", "nobody"))
+
+
+def test_search_finds_stored_message(client):
+    history_uid = create_new_history("alice")
+    store_message("alice", history_uid, "human", "the weather in Lisbon")
+    response = client.get(
+        "/history/search", params={"q": "Lisbon", "conf_uid": "alice"}
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 1
+    assert results[0]["history_uid"] == history_uid
@@ -0,0 +1,76 @@
+"""Tool-call JSON detection in streamed LLM output (StreamJSONDetector)."""
+
+import json
+
+import pytest
+
+from src.open_llm_vtuber.mcpp.json_detector import StreamJSONDetector
+
+TOOL_CALL = {"mcp_server": "time", "tool": "get_time", "arguments": {"tz": "UTC"}}
+
+
+def feed(chunks):
+    detector = StreamJSONDetector()
+    found = [obj for chunk in chunks for obj in detector.process_chunk(chunk)]
+    assert found == detector.get_all_jsons()
+    return found, detector
+
+
+def split(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_braces_inside_strings():
+    obj = {"tool": "search", "arguments": {"query": "} not the end {"}}
+    found, detector = feed([f"Let me look. {json.dumps(obj)} Done."])
+    assert found == [obj]
+    assert detector.buffer == ""
+
+
+def test_escaped_quotes():
+    obj = {"tool": "say", "arguments": {"text": 'a "quoted" }{ \\ word'}}
+    text = json.dumps(obj)
+    assert '\\"' in text and "\\\\" in text
+    assert feed([text])[0] == [obj]
+    # The backslash and the quote it escapes in separate chunks
+    backslash = text.index("\\")
+    assert feed([text[: backslash + 1], text[backslash + 1 :]])[0] == [obj]
+
+
+def test_stray_brace_in_prose():
+    found, _ = feed(['Sure :{ let me check. {"tool": "time", "arguments": {}}'])
+    assert found == [{"tool": "time", "arguments": {}}]
+
+
+def test_stray_brace_split_from_the_tool_call():
+    text = f"Hmm {{ well, ok }} and {{ then {json.dumps(TOOL_CALL)} bye }}"
+    for size in (1, 3, 7, len(text)):
+        assert feed(split(text, size))[0] == [TOOL_CALL]
+
+
+def test_balanced_span_that_does_not_parse():
+    # Only JSON characters, so the span is read to its end before it fails
+    found, _ = feed([f"{{1, 2, {json.dumps(TOOL_CALL)}}} {json.dumps(TOOL_CALL)}"])
+    assert found == [TOOL_CALL, TOOL_CALL]
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 16])
+def test_objects_split_across_chunks(size):
+    second = {"another": "json", "nested": {"key": [1, 2, {"deep": True}]}}
+    text = f"Plain text {json.dumps(TOOL_CALL)} between {json.dumps(second)} end"
+    found, detector = feed(split(text, size))
+    assert found == [TOOL_CALL, second]
+    assert detector.buffer == ""
+
+
+def test_incomplete_object_is_kept_until_reset():
+    detector = StreamJSONDetector()
+    assert detector.process_chunk('text {"tool": "ti') == []
+    assert detector.buffer == '{"tool": "ti'
+    assert detector.process_chunk('me"}') == [{"tool": "time"}]
+
+    detector.process_chunk('{"tool": ')
+    detector.reset()
+    assert detector.buffer == ""
+    assert detector.get_all_jsons() == []
+    assert detector.process_chunk('"x"} {"a": 1}') == [{"a": 1}]
@@ -0,0 +1,118 @@
+"""RouterLLM over OpenAI-compatible backends served by local mock servers."""
+
+import asyncio
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from src.open_llm_vtuber.config_manager.stateless_llm import RouterLLMConfig
+from src.open_llm_vtuber.agent.stateless_llm.openai_compatible_llm import AsyncLLM
+from src.open_llm_vtuber.agent.stateless_llm.router_llm import (
+    ERROR_CHUNK_PREFIX,
+    RouterLLM,
+)
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def backend(base_url: str) -> AsyncLLM:
+    return AsyncLLM(model="mock", base_url=f"{base_url}/v1", llm_api_key="test")
+
+
+def complete(router: RouterLLM) -> str:
+    async def run():
+        return "".join([chunk async for chunk in router.chat_completion(MESSAGES)])
+
+    return asyncio.run(run())
+
+
+def test_fails_over_on_connection_error(mock_llm_server, closed_port_url):
+    base_url, mock = mock_llm_server(ttft=0.01, tokens_per_second=0)
+    router = RouterLLM({"down": backend(closed_port_url), "up": backend(base_url)})
+
+    assert complete(router) == "".join(mock.reply_tokens())
+
+    stats = router.stats()
+    assert stats["down"]["failures"] == 1
+    assert stats["up"]["requests"] == 1
+    assert stats["up"]["failures"] == 0
+
+
+def test_fails_over_on_error_chunk(mock_llm_server):
+    # 400 is not retried by the OpenAI client and comes back as an error chunk
+    failing_url, _ = mock_llm_server(failure_rate=1.0, failure_status=400)
+    base_url, mock = mock_llm_server(ttft=0.01, tokens_per_second=0)
+    router = RouterLLM({"failing": backend(failing_url), "up": backend(base_url)})
+
+    assert complete(router) == "".join(mock.reply_tokens())
+    assert router.stats()["failing"]["failures"] == 1
+
+
+def test_passes_on_the_error_chunk_when_every_backend_fails(mock_llm_server):
+    first_url, _ = mock_llm_server(failure_rate=1.0, failure_status=400)
+    second_url, _ = mock_llm_server(failure_rate=1.0, failure_status=400)
+    router = RouterLLM({"a": backend(first_url), "b": backend(second_url)})
+
+    assert complete(router).startswith(ERROR_CHUNK_PREFIX)
+
+
+def test_hedges_on_the_next_backend(mock_llm_server):
+    slow_url, slow = mock_llm_server(ttft=1.5, tokens_per_second=0)
+    fast_url, fast = mock_llm_server(ttft=0.05, tokens_per_second=0)
+    router = RouterLLM(
+        {"slow": backend(slow_url), "fast": backend(fast_url)}, hedge_delay=0.2
+    )
+
+    started = time.monotonic()
+    assert complete(router) == "".join(fast.reply_tokens())
+    assert time.monotonic() - started < 1.0
+
+    stats = router.stats()
+    assert stats["slow"]["requests"] == 1
+    assert stats["fast"]["hedges"] == 1
+    assert stats["fast"]["hedges_won"] == 1
+    # The losing request was cancelled before it produced anything
+    deadline = time.monotonic() + 3
+    while slow.stats["active_streams"] and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert slow.stats["active_streams"] == 0
+    assert slow.stats["completed"] == 0
+
+
+def test_cooldown_and_recovery(mock_llm_server):
+    flaky_url, flaky = mock_llm_server(
+        ttft=0.01, tokens_per_second=0, failure_rate=1.0, failure_status=400
+    )
+    healthy_url, _ = mock_llm_server(ttft=0.01, tokens_per_second=0)
+    router = RouterLLM(
+        {"flaky": backend(flaky_url), "healthy": backend(healthy_url)},
+        failure_threshold=1,
+        cooldown=0.5,
+        stats_max_age=0.5,
+    )
+
+    complete(router)
+    stats = router.stats()
+    assert stats["flaky"]["failures"] == 1
+    assert stats["flaky"]["cooling_down"]
+
+    # While cooling down, the failing backend is not tried first anymore
+    complete(router)
+    stats = router.stats()
+    assert stats["flaky"]["requests"] == 1
+    assert stats["healthy"]["requests"] == 2
+
+    # Once the cooldown is over and its failures expired, it is measured again
+    flaky.settings.failure_rate = 0.0
+    time.sleep(0.6)
+    assert complete(router) == "".join(flaky.reply_tokens())
+    stats = router.stats()
+    assert stats["flaky"]["requests"] == 2
+    assert stats["flaky"]["failures"] == 1
+    assert not stats["flaky"]["cooling_down"]
+
+
+def test_config_rejects_a_backend_listed_twice():
+    with pytest.raises(ValidationError, match="more than once"):
+        RouterLLMConfig(backends=["ollama_llm", "ollama_llm"])
@@ -0,0 +1,98 @@
+"""AsyncLLMWithTemplate against a local llama.cpp stand-in that streams slowly."""
+
+import asyncio
+import time
+
+from src.open_llm_vtuber.agent.stateless_llm.stateless_llm_with_template import (
+    AsyncLLMWithTemplate,
+)
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def make_llm(base_url: str) -> AsyncLLMWithTemplate:
+    return AsyncLLMWithTemplate(
+        model="mock", base_url=f"{base_url}/completion", template="CHATML"
+    )
+
+
+def wait_for_streams_to_end(mock, timeout: float = 3.0) -> None:
+    deadline = time.monotonic() + timeout
+    while mock.stats["active_streams"] and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
+def test_event_loop_stays_responsive_while_streaming(mock_llm_server):
+    base_url, mock = mock_llm_server(ttft=0.1, tokens_per_second=10, response_tokens=8)
+    llm = make_llm(base_url)
+
+    async def run():
+        gaps = []
+        done = asyncio.Event()
+
+        async def ticker():
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        tick_task = asyncio.create_task(ticker())
+        tokens = [token async for token in llm.chat_completion(MESSAGES)]
+        done.set()
+        await tick_task
+        return tokens, gaps
+
+    tokens, gaps = asyncio.run(run())
+
+    assert "".join(tokens) == "".join(mock.reply_tokens())
+    # The stream took about a second; a blocking read would stall the loop
+    # for a whole token interval (100 ms) at a time
+    assert len(gaps) > 50
+    assert max(gaps) < 0.08
+
+
+def test_aclose_closes_the_connection(mock_llm_server):
+    base_url, mock = mock_llm_server(
+        ttft=0.05, tokens_per_second=20, response_tokens=100
+    )
+    llm = make_llm(base_url)
+
+    async def run():
+        stream = llm.chat_completion(MESSAGES)
+        received = [await stream.__anext__() for _ in range(3)]
+        await stream.aclose()
+        return received
+
+    assert len(asyncio.run(run())) == 3
+    wait_for_streams_to_end(mock)
+    assert mock.stats["active_streams"] == 0
+    assert mock.stats["completed"] == 0
+
+
+def test_cancel_closes_the_connection(mock_llm_server):
+    base_url, mock = mock_llm_server(
+        ttft=0.05, tokens_per_second=20, response_tokens=100
+    )
+    llm = make_llm(base_url)
+
+    async def run():
+        received = []
+
+        async def consume():
+            async for token in llm.chat_completion(MESSAGES):
+                received.append(token)
+
+        task = asyncio.create_task(consume())
+        while len(received) < 3:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert task.cancelled()
+        return received
+
+    assert len(asyncio.run(run())) >= 3
+    wait_for_streams_to_end(mock)
+    assert mock.stats["active_streams"] == 0
+    assert mock.stats["completed"] == 0
@@ -0,0 +1,61 @@
+"""The /stats route of the web tool routes."""
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from src.open_llm_vtuber.client_inbox import ClientInbox
+from src.open_llm_vtuber.routes import init_webtool_routes
+from src.open_llm_vtuber.send_queue import QueuedWebSocket
+from src.open_llm_vtuber.utils.executor_pool import run_in_pool
+
+
+class FakeWebSocket:
+    async def send_text(self, text):
+        pass
+
+    async def close(self, *args, **kwargs):
+        pass
+
+
+async def noop(data):
+    pass
+
+
+def test_stats_route_reports_live_clients():
+    app = FastAPI()
+    app.include_router(init_webtool_routes(default_context_cache=None))
+
+    async def scenario():
+        await run_in_pool("tts", sum, [1, 2])
+        websocket = QueuedWebSocket(FakeWebSocket(), "stats-client")
+        inbox = ClientInbox("stats-client", noop)
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                response = await client.get("/stats")
+        finally:
+            await inbox.aclose()
+            await websocket.close()
+        return response
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["type"] == "stats"
+    assert "stats-client" in stats["send_queues"]
+    assert "stats-client" in stats["receive_queues"]
+    assert "tts" in stats["executor_pools"]
+    for key in (
+        "prompt_cache",
+        "llm_routers",
+        "speculative_turns",
+        "chat_history_writer",
+        "mcp_servers",
+        "mcp_tool_catalog",
+        "mcp_tool_results",
+    ):
+        assert key in stats